@@ -1,39 +1,57 @@
+import os
 import random
+import sys
 import tkinter as tk
 from tkinter import messagebox, simpledialog, ttk, colorchooser
+from monopoly_boards import load_board
+from monopoly_bots import ExpectimaxBot
+from monopoly_engine import Game, create_random_tiles
+from monopoly_journal import GameJournal, resume, save_path
+from monopoly_odds import OddsEstimator
+from monopoly_renderer import BoardRenderer, ResizeScheduler, TokenAnimator
+from monopoly_widgets import AutoPlayer, EventLog
+
+BOT_COLORS = ("red", "blue", "green", "yellow")
+# Pause before a computer player rolls, so its moves can be followed
+BOT_TURN_DELAY = 600
+
+# Running games are journaled here so they can be resumed after quitting
+SAVE_PATH = save_path("monopoly_sp.journal")
 
 class MonopolyGame:
-    def __init__(self, root):
+    def __init__(self, root, seed=None, board_file=None):
         self.root = root
-        self.root.title("Monopoly Game")
+        self.board_file = board_file
+        
+        # Every random draw of this game comes from one seeded generator,
+        # so replaying the same seed and moves reproduces the same game
+        self.seed = random.randrange(2**32) if seed is None else seed
+        self.rng = random.Random(self.seed)
+        self.root.title(f"Monopoly Game (seed {self.seed})")
         self.root.geometry("1200x800")
         self.root.minsize(1000, 700)
         self.root.configure(bg="#2E2E2E")
         
         # Game State
-        self.players = []
         self.game_started = False
-        self.current_player = 0
-        self.visited = set()
+        self.bot_turn = None
         self.selected_tile = None
         
         # Initialize Board
         self.tiles = self.create_initial_tiles()
+        self.game = Game(self.tiles, self.rng)
+        
+        # Win chances are estimated in a worker process, stopped by quit_game
+        self.odds = OddsEstimator(self.root, self.show_odds)
+        self.root.protocol("WM_DELETE_WINDOW", self.quit_game)
         
         # Start Screen
         self.create_start_screen()
 
     def create_initial_tiles(self):
-        tiles = []
-        for i in range(24):
-            tiles.append({
-                'color': "#%06x" % random.randint(0, 0xFFFFFF),
-                'value': random.randint(10, 200) if i not in {0, 6, 12, 18} else 0,
-                'text': f"Tile {i+1}",
-                'hyperlink': f"https://tile{i+1}.com",
-                'position': i
-            })
-        return tiles
+        if self.board_file:
+            return load_board(self.board_file)
+        return create_random_tiles(self.rng)
 
     def create_start_screen(self):
         self.start_frame = tk.Frame(self.root, bg="#3E3E3E")
@@ -49,11 +67,29 @@ class MonopolyGame:
                                   bg="#4CAF50", fg="white", **btn_style)
         self.start_btn.pack(pady=10)
         
+        if os.path.exists(SAVE_PATH):
+            self.resume_btn = tk.Button(self.start_frame, text="Resume Game", command=self.resume_game,
+                                       bg="#FF9800", fg="white", **btn_style)
+            self.resume_btn.pack(pady=10)
+        
         self.add_player_btn = tk.Button(self.start_frame, text="Add Player", command=self.add_player,
                                        bg="#2196F3", fg="white", **btn_style)
         self.add_player_btn.pack(pady=10)
         
-        self.quit_btn = tk.Button(self.start_frame, text="Quit Game", command=self.root.destroy,
+        self.add_bot_btn = tk.Button(self.start_frame, text="Add Computer", command=self.add_bot,
+                                    bg="#607D8B", fg="white", **btn_style)
+        self.add_bot_btn.pack(pady=10)
+        
+        # House rule: every player may throw away this many rolls per game
+        rerolls_frame = tk.Frame(self.start_frame, bg="#3E3E3E")
+        rerolls_frame.pack(pady=10)
+        tk.Label(rerolls_frame, text="Re-rolls per player:", font=("Arial", 14),
+                 bg="#3E3E3E", fg="white").pack(side=tk.LEFT)
+        self.rerolls_var = tk.IntVar(value=0)
+        tk.Spinbox(rerolls_frame, from_=0, to=9, width=3, textvariable=self.rerolls_var,
+                   font=("Arial", 14)).pack(side=tk.LEFT, padx=5)
+        
+        self.quit_btn = tk.Button(self.start_frame, text="Quit Game", command=self.quit_game,
                                  bg="#F44336", fg="white", **btn_style)
         self.quit_btn.pack(pady=10)
 
@@ -67,6 +103,7 @@ class MonopolyGame:
         # Board Canvas
         self.canvas = tk.Canvas(self.main_frame, bg="white", highlightthickness=0)
         self.canvas.grid(row=0, column=0, sticky="nsew", padx=20, pady=20)
+        self.renderer = self.create_renderer()
         
         # Control Panel
         control_frame = tk.Frame(self.main_frame, bg="#3E3E3E")
@@ -84,9 +121,39 @@ class MonopolyGame:
         self.create_game_controls(control_frame)
         
         # Bind events
+        self.resize = ResizeScheduler(self.canvas, self.draw_board,
+                                      preview=lambda factor: self.renderer.preview_scale(factor))
         self.canvas.bind("<Configure>", self.on_resize)
         self.canvas.bind("<Button-1>", self.select_tile)
 
+    def create_renderer(self, sprites=False):
+        labels = [
+            {'key': "name", 'dy': -15, 'size': 10, 'fill': "black",
+             'text': lambda idx: self.tiles[idx]['text']},
+            {'key': "link", 'dy': 5, 'size': 8, 'fill': "blue",
+             'text': lambda idx: self.tiles[idx]['hyperlink']},
+            {'key': "value", 'dy': 20, 'size': 8, 'fill': "black",
+             'text': lambda idx: f"Value: {self.tiles[idx]['value']}"},
+        ]
+        tile_fill = lambda idx: self.tiles[idx]['color']
+        if sprites:
+            # Sprite tiles need Pillow, which the default renderer does not
+            from monopoly_atlas import SpriteRenderer
+            return SpriteRenderer(self.canvas, labels, tile_fill)
+        return BoardRenderer(self.canvas, labels, tile_fill)
+        
+    def toggle_sprites(self):
+        try:
+            renderer = self.create_renderer(self.sprite_mode.get())
+        except ImportError:
+            self.sprite_mode.set(False)
+            messagebox.showerror("Sprite Tiles", "Sprite tiles need the Pillow package.")
+            return
+        self.animator.clear()
+        self.canvas.delete("all")
+        self.renderer = self.animator.renderer = renderer
+        self.draw_board()
+        
     def create_tile_edit_panel(self, parent):
         edit_frame = tk.LabelFrame(parent, text="Tile Properties", font=("Arial", 12, "bold"),
                                   bg="#3E3E3E", fg="white")
@@ -118,26 +185,85 @@ class MonopolyGame:
                                    bg="#3E3E3E", fg="white")
         self.score_label.pack(pady=10)
         
+        self.odds_label = tk.Label(parent, text="Win chances:\n", font=("Arial", 12),
+                                  bg="#3E3E3E", fg="white")
+        self.odds_label.pack(pady=5)
+        
         self.roll_btn = tk.Button(parent, text="Roll Dice", command=self.roll_dice_turn,
                                  font=("Arial", 14), bg="#2196F3", fg="white")
         self.roll_btn.pack(pady=20)
         
-        quit_btn = tk.Button(parent, text="Quit Game", command=self.root.destroy,
+        self.auto_btn = tk.Button(parent, text="Auto Play", command=self.toggle_autoplay,
+                                 font=("Arial", 12), bg="#757575", fg="white")
+        self.auto_btn.pack(pady=5)
+        
+        self.speed_scale = tk.Scale(parent, from_=0, to=60, orient=tk.HORIZONTAL,
+                                    label="Turns/s (0 = max)", command=self.set_autoplay_speed,
+                                    bg="#3E3E3E", fg="white", highlightthickness=0)
+        self.speed_scale.set(2)
+        self.speed_scale.pack(pady=5, fill=tk.X)
+        
+        self.rate_label = tk.Label(parent, text="Turns/s: 0.0", font=("Arial", 12),
+                                  bg="#3E3E3E", fg="white")
+        self.rate_label.pack(pady=5)
+        
+        self.sprite_mode = tk.BooleanVar(value=False)
+        tk.Checkbutton(parent, text="Sprite tiles", variable=self.sprite_mode,
+                       command=self.toggle_sprites, font=("Arial", 12), bg="#3E3E3E",
+                       fg="white", selectcolor="#2E2E2E").pack(pady=5)
+        
+        self.log = EventLog(parent, bg="#2E2E2E", fg="white")
+        self.log.pack(pady=10, fill=tk.BOTH, expand=True)
+        self.autoplay = AutoPlayer(self.root, self.roll_dice_turn, on_rate=self.show_turn_rate)
+        self.animator = TokenAnimator(self.renderer, self.root)
+        
+        quit_btn = tk.Button(parent, text="Quit Game", command=self.quit_game,
                             font=("Arial", 12), bg="#F44336", fg="white")
         quit_btn.pack(side=tk.BOTTOM, pady=20)
 
     def on_resize(self, event):
-        self.draw_board()
+        self.resize.on_configure(event)
 
     def start_game(self):
-        if len(self.players) < 1:
+        if len(self.game.players) < 1:
             messagebox.showwarning("Players Needed", "Add at least 1 player to start!")
             return
+        try:
+            rerolls = max(0, self.rerolls_var.get())
+        except tk.TclError:
+            rerolls = 0
+        self.game.set_rerolls(rerolls)
+        GameJournal.create(SAVE_PATH, self.game, seed=self.seed)
+        self.game_started = True
+        self.create_game_ui()
+        self.schedule_bot_turn()
+
+    def resume_game(self):
+        try:
+            self.game = resume(SAVE_PATH)
+        except (OSError, ValueError) as e:
+            messagebox.showerror("Resume Failed", f"Could not load the saved game: {e}")
+            return
+        if not self.game.players or self.game.is_over():
+            if self.game.players:
+                self.game.journal.finish()
+            else:
+                self.game.journal.discard()
+            self.resume_btn.destroy()
+            messagebox.showinfo("Resume", "The saved game has no players or is already over.")
+            return
+        # Show the seed the saved game was started with, not this window's
+        if self.game.journal.seed is not None:
+            self.seed = self.game.journal.seed
+            self.root.title(f"Monopoly Game (seed {self.seed})")
+        self.tiles = self.game.tiles
         self.game_started = True
         self.create_game_ui()
+        self.update_scores()
+        self.schedule_bot_turn()
 
     def add_player(self):
-        if len(self.players) >= 4:
+        if len(self.game.players) >= 4:
             messagebox.showinfo("Max Players", "Maximum 4 players allowed!")
             return
             
@@ -148,78 +274,26 @@ class MonopolyGame:
                                                    minvalue=0, maxvalue=1000)
             color = simpledialog.askstring("Player Color", "Choose color (red, blue, green, yellow):")
             
-            self.players.append({
-                'name': name,
-                'score': initial_score or 0,
-                'color': color or "white",
-                'position': 0,
-                'started': False
-            })
+            self.game.add_player(name, initial_score or 0, color or "white")
 
+    def add_bot(self):
+        if len(self.game.players) >= 4:
+            messagebox.showinfo("Max Players", "Maximum 4 players allowed!")
+            return
+        seat = len(self.game.players)
+        self.game.add_player(f"Computer {seat+1}", 0, BOT_COLORS[seat], ExpectimaxBot())
+        
     def draw_board(self):
-        self.canvas.delete("all")
         w = self.canvas.winfo_width()
         h = self.canvas.winfo_height()
         tile_size = min(w//8, h//8)
-        
-        positions = []
-        for row in range(6, -1, -1): positions.append((row, 6))
-        for col in range(5, -1, -1): positions.append((0, col))
-        for row in range(1, 7): positions.append((row, 0))
-        for col in range(1, 6): positions.append((6, col))
-        
-        for idx, (row, col) in enumerate(positions):
-            tile = self.tiles[idx]
-            x = col * tile_size + tile_size//2
-            y = row * tile_size + tile_size//2
-            
-            # Draw tile
-            self.canvas.create_rectangle(x-tile_size//2, y-tile_size//2,
-                                        x+tile_size//2, y+tile_size//2,
-                                        fill=tile['color'], outline="black")
-            
-            # Tile text
-            self.canvas.create_text(x, y-15, text=tile['text'],
-                                   font=("Arial", 10), fill="black")
-            
-            # Hyperlink
-            self.canvas.create_text(x, y+5, text=tile['hyperlink'], 
-                                   font=("Arial", 8), fill="blue")
-            
-            # Value
-            self.canvas.create_text(x, y+20, text=f"Value: {tile['value']}",
-                                   font=("Arial", 8), fill="black")
-            
-        # Draw players
-        for player in self.players:
-            if player['started']:
-                pos = player['position']
-                row, col = positions[pos]
-                x = col * tile_size + tile_size//2
-                y = row * tile_size + tile_size//2
-                self.canvas.create_oval(x-10, y-10, x+10, y+10,
-                                       fill=player['color'], outline="black")
+        self.renderer.layout(tile_size, self.game.players)
 
     def select_tile(self, event):
-        w = self.canvas.winfo_width()
-        h = self.canvas.winfo_height()
-        tile_size = min(w//8, h//8)
-        
-        col = (event.x) // tile_size
-        row = (event.y) // tile_size
-        
-        # Convert to perimeter position
-        positions = []
-        for r in range(6, -1, -1): positions.append((r, 6))
-        for c in range(5, -1, -1): positions.append((0, c))
-        for r in range(1, 7): positions.append((r, 0))
-        for c in range(1, 6): positions.append((6, c))
-        
-        for idx, (r, c) in enumerate(positions):
-            if r == row and c == col:
-                self.selected_tile = idx
-                self.update_edit_form()
-                break
+        idx = self.renderer.geometry.tile_at(event.x, event.y)
+        if idx is not None:
+            self.selected_tile = idx
+            self.update_edit_form()
 
     def update_edit_form(self):
         if self.selected_tile is None:
@@ -243,55 +317,74 @@ class MonopolyGame:
             return
             
         try:
-            self.tiles[self.selected_tile]['value'] = int(self.value_entry.get())
-            self.tiles[self.selected_tile]['text'] = self.text_entry.get()
-            self.tiles[self.selected_tile]['hyperlink'] = self.link_entry.get()
-            self.tiles[self.selected_tile]['color'] = self.color_btn.cget("bg")
-            self.draw_board()
+            self.game.edit_tile(self.selected_tile,
+                                value=int(self.value_entry.get()),
+                                text=self.text_entry.get(),
+                                hyperlink=self.link_entry.get(),
+                                color=self.color_btn.cget("bg"))
+            self.renderer.update_tile(self.selected_tile)
         except ValueError:
             messagebox.showerror("Invalid Input", "Value must be a number!")
 
     def roll_dice_turn(self):
         if not self.game_started: return
-        
-        player = self.players[self.current_player]
-        roll = random.randint(1, 6)
-        self.dice_label.config(text=f"Dice: {roll}")
-        
-        if not player['started']:
-            if roll == 1:
-                player['started'] = True
-                self.visited.update([0, 1])
-                player['position'] = 1
-                messagebox.showinfo("Started!", f"{player['name']} has started!")
-            else:
-                messagebox.showinfo("Roll Again", "Need 1 to start!")
+        if self.bot_turn is not None:
+            self.root.after_cancel(self.bot_turn)
+            self.bot_turn = None
+        
+        turn = self.game.step()
+        player = turn['player']
+        self.dice_label.config(text=f"Dice: {turn['roll']}")
+        
+        if turn['event'] == "started":
+            self.log.add(f"{player['name']} has started!")
+        elif turn['event'] == "wait":
+            self.log.add(f"{player['name']} rolled {turn['roll']}. Need 1 to start!")
         else:
-            new_pos = (player['position'] + roll) % 24
-            player['position'] = new_pos
-            self.visited.add(new_pos)
-            player['score'] += self.tiles[new_pos]['value']
-            
-            messagebox.showinfo("Moved", 
-                f"{player['name']} moved to {self.tiles[new_pos]['text']}\n" +
-                f"Score: +{self.tiles[new_pos]['value']}")
+            self.log.add(
+                f"{player['name']} moved to {self.tiles[turn['position']]['text']}\n" +
+                f"Score: +{self.tiles[turn['position']]['value']}")
             
         self.update_scores()
-        self.draw_board()
+        self.animator.move(turn['seat'], player)
         
-        if len(self.visited) >= 24:
+        if turn['game_over']:
+            self.autoplay.stop()
             self.declare_winner()
-            return
+            return False
+        self.schedule_bot_turn()
+        return True
             
-        self.current_player = (self.current_player + 1) % len(self.players)
+    def schedule_bot_turn(self):
+        """Let a computer player roll by itself when its turn comes"""
+        if (self.bot_turn is None and not self.autoplay.running
+                and self.game.current_player in self.game.policies):
+            self.bot_turn = self.root.after(BOT_TURN_DELAY, self.roll_dice_turn)
+            
+    def toggle_autoplay(self):
+        self.autoplay.toggle(self.speed_scale.get())
+        self.auto_btn.config(text="Stop" if self.autoplay.running else "Auto Play")
+        self.schedule_bot_turn()
+        
+    def set_autoplay_speed(self, value):
+        self.autoplay.rate = int(value)
+        
+    def show_turn_rate(self, rate):
+        frames = self.animator.stats()
+        self.rate_label.config(text=f"Turns/s: {rate:.1f}\nAnimation: {frames['fps']:.0f} fps, "
+                                    f"{frames['dropped']} dropped")
         
     def update_scores(self):
-        scores = "\n".join([f"{p['name']}: {p['score']}" for p in self.players])
+        scores = "\n".join([f"{p['name']}: {p['score']}" for p in self.game.players])
         self.score_label.config(text=f"Scores:\n{scores}")
+        self.odds.request(self.game)
+        
+    def show_odds(self, chances):
+        odds = "\n".join([f"{p['name']}: {chance:.0%}" for p, chance in zip(self.game.players, chances)])
+        self.odds_label.config(text=f"Win chances:\n{odds}")
         
     def declare_winner(self):
-        max_score = max(p['score'] for p in self.players)
-        winners = [p for p in self.players if p['score'] == max_score]
+        max_score, winners = self.game.winners()
         
         if len(winners) == 1:
             msg = f"Winner: {winners[0]['name']} with {max_score} points!"
@@ -299,10 +392,18 @@ class MonopolyGame:
             names = ", ".join([w['name'] for w in winners])
             msg = f"Tie between {names} with {max_score} points!"
             
+        if self.game.journal:
+            self.game.journal.finish()
         messagebox.showinfo("Game Over", msg)
+        self.quit_game()
+
+    def quit_game(self):
+        """Stop the win-odds worker, then close the window"""
+        self.odds.close()
         self.root.destroy()
 
 if __name__ == "__main__":
     root = tk.Tk()
-    game = MonopolyGame(root)
+    game = MonopolyGame(root, int(sys.argv[1]) if len(sys.argv) > 1 else None,
+                        sys.argv[2] if len(sys.argv) > 2 else None)
     root.mainloop()
\ No newline at end of file
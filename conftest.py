@@ -0,0 +1 @@
+# Makes the flat monopoly_* modules importable from tests/
@@ -1,7 +1,9 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
 import random
+import sys
 import webbrowser
+from functools import lru_cache
 
 # Global variables
 BOARD_SIZE = 7
@@ -9,6 +11,8 @@ TILE_SIZE = 80
 PLAYERS = []
 current_player = 0
 game_started = False
+# Source of every board value and dice roll, seeded in main()
+rng = random.Random()
 
 # Sample tile data (you can modify these)
 tile_data = {
@@ -22,25 +26,34 @@ def initialize_board():
     positions = get_perimeter_positions()
     for pos in positions:
         if pos != (BOARD_SIZE-1, BOARD_SIZE-1) and not is_corner(pos):
-            tile_data['values'][pos] = random.randint(10, 100)
+            tile_data['values'][pos] = rng.randint(10, 100)
             tile_data['links'][pos] = f"http://example.com/tile_{pos[0]}_{pos[1]}"
             tile_data['texts'][pos] = f"Tile {pos[0]},{pos[1]}"
 
 def is_corner(pos):
     """Check if position is a corner tile"""
-    corners = [(0,0), (0,BOARD_SIZE-1), (BOARD_SIZE-1,0), (BOARD_SIZE-1,BOARD_SIZE-1)]
-    return pos in corners
+    last = BOARD_SIZE-1
+    return pos[0] in (0, last) and pos[1] in (0, last)
 
-def get_perimeter_positions():
-    """Get all positions on the perimeter of the board"""
+@lru_cache(maxsize=None)
+def perimeter_index(size):
+    """Build the perimeter move order once per board size
+
+    Returns the positions in order and a dict mapping each position to its
+    index in that order.
+    """
     positions = []
-    for i in range(BOARD_SIZE):
+    for i in range(size):
         positions.append((0, i))  # Top row
-        positions.append((BOARD_SIZE-1, i))  # Bottom row
-        if i > 0 and i < BOARD_SIZE-1:  # Middle rows
+        positions.append((size-1, i))  # Bottom row
+        if i > 0 and i < size-1:  # Middle rows
             positions.append((i, 0))  # Left column
-            positions.append((i, BOARD_SIZE-1))  # Right column
-    return positions
+            positions.append((i, size-1))  # Right column
+    return tuple(positions), {pos: idx for idx, pos in enumerate(positions)}
+
+def get_perimeter_positions():
+    """Get all positions on the perimeter of the board"""
+    return perimeter_index(BOARD_SIZE)[0]
 
 def create_player(name):
     """Create a new player with initial position and score"""
@@ -49,7 +62,9 @@ def create_player(name):
             'name': name,
             'position': (BOARD_SIZE-1, BOARD_SIZE-1),
             'score': 0,
-            'visited': set([(BOARD_SIZE-1, BOARD_SIZE-1)])
+            'visited': set([(BOARD_SIZE-1, BOARD_SIZE-1)]),
+            # Non-corner tiles still to visit, so has_won needs no set scan
+            'remaining': len(get_perimeter_positions()) - 4
         })
         update_players_list()
         update_game_status()
@@ -63,7 +78,7 @@ def roll_dice():
         return
         
     if not game_started:
-        value = random.randint(1, 6)
+        value = rng.randint(1, 6)
         if value == 1:
             game_started = True
             update_game_status(f"{PLAYERS[current_player]['name']} rolled 1! Game starts!")
@@ -72,7 +87,7 @@ def roll_dice():
             next_player()
         return
     
-    value = random.randint(1, 6)
+    value = rng.randint(1, 6)
     move_player(value)
     update_board()
     update_game_status(f"{PLAYERS[current_player]['name']} rolled {value}")
@@ -85,14 +100,17 @@ def roll_dice():
 
 def move_player(steps):
     """Move the current player by given number of steps"""
-    positions = get_perimeter_positions()
-    current_pos = PLAYERS[current_player]['position']
-    current_idx = positions.index(current_pos)
+    positions, index = perimeter_index(BOARD_SIZE)
+    player = PLAYERS[current_player]
+    current_idx = index[player['position']]
     new_idx = (current_idx + steps) % len(positions)
     new_pos = positions[new_idx]
     
-    PLAYERS[current_player]['position'] = new_pos
-    PLAYERS[current_player]['visited'].add(new_pos)
+    player['position'] = new_pos
+    if new_pos not in player['visited']:
+        player['visited'].add(new_pos)
+        if not is_corner(new_pos):
+            player['remaining'] -= 1
     
     if new_pos in tile_data['values']:
         PLAYERS[current_player]['score'] += tile_data['values'][new_pos]
@@ -104,8 +122,7 @@ def next_player():
 
 def has_won():
     """Check if current player has visited all non-corner tiles"""
-    valid_positions = set(pos for pos in get_perimeter_positions() if not is_corner(pos))
-    return valid_positions.issubset(PLAYERS[current_player]['visited'])
+    return PLAYERS[current_player]['remaining'] == 0
 
 def end_game():
     """End the game and declare winner"""
@@ -131,21 +148,19 @@ def create_gui():
     control_frame.pack(side=tk.LEFT, padx=20, pady=20, fill=tk.BOTH)
     
     # Create board
-    for i in range(BOARD_SIZE):
-        for j in range(BOARD_SIZE):
-            pos = (i, j)
-            if pos in get_perimeter_positions():
-                if is_corner(pos):
-                    if pos == (BOARD_SIZE-1, BOARD_SIZE-1):
-                        text = "GO"
-                    else:
-                        text = ""
-                else:
-                    text = f"{tile_data['values'][pos]}\n{tile_data['texts'][pos]}"
-                
-                btn = tk.Button(board_frame, text=text, width=8, height=4,
-                              command=lambda p=pos: open_link(p))
-                btn.grid(row=i, column=j, padx=2, pady=2)
+    for pos in get_perimeter_positions():
+        i, j = pos
+        if is_corner(pos):
+            if pos == (BOARD_SIZE-1, BOARD_SIZE-1):
+                text = "GO"
+            else:
+                text = ""
+        else:
+            text = f"{tile_data['values'][pos]}\n{tile_data['texts'][pos]}"
+        
+        btn = tk.Button(board_frame, text=text, width=8, height=4,
+                      command=lambda p=pos: open_link(p))
+        btn.grid(row=i, column=j, padx=2, pady=2)
                 
     # Control panel
     # Add player section
@@ -198,11 +213,12 @@ def update_board():
     # on the board. For simplicity, we're not implementing it here
     pass
 
-def main():
+def main(seed=None):
     """Main function to start the game"""
+    rng.seed(seed)
     initialize_board()
     root = create_gui()
     root.mainloop()
 
 if __name__ == "__main__":
-    main()
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else None)
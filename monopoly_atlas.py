@@ -0,0 +1,228 @@
+"""Sprite-atlas rendering mode: one pre-rendered image item per tile.
+
+SpriteRenderer has the same interface as BoardRenderer but rasterises
+every tile (fill, outline and labels) into an image with Pillow and
+draws the board as one canvas image per tile instead of a rectangle and
+several text items. Images live in a TileAtlas keyed by the tile's
+content and size, so identical tiles share one image, a resize back to a
+known size re-rasterises nothing and a tile edit only rasterises that
+tile. Rendered label text is cached separately, since the same labels
+recur on tiles of different colours.
+
+Pillow is only needed for this mode.
+"""
+from collections import OrderedDict
+
+from PIL import Image, ImageDraw, ImageFont
+
+from monopoly_renderer import BoardRenderer
+from monopoly_textlayout import TextLayoutCache
+
+# TrueType fonts tried in order before Pillow's built-in font
+FONT_FILES = ("arial.ttf", "Arial.ttf", "DejaVuSans.ttf", "LiberationSans-Regular.ttf")
+
+
+class TileAtlas:
+    """LRU cache of rasterised tile images keyed by content and size
+
+    photo turns a Pillow image into something a canvas can show; by
+    default ImageTk.PhotoImage, which needs a Tk root.
+    """
+
+    def __init__(self, maxsize=4096, photo=None):
+        self.maxsize = maxsize
+        self.images = OrderedDict()
+        self.fonts = {}
+        self.masks = {}
+        self.text_layout = TextLayoutCache(measure=self._measure)
+        self.photo = photo or self._tk_photo
+        self.hits = 0
+        self.rasterised = 0
+        self.evictions = 0
+
+    @staticmethod
+    def _tk_photo(image):
+        from PIL import ImageTk
+        return ImageTk.PhotoImage(image)
+
+    def font(self, size):
+        font = self.fonts.get(size)
+        if font is None:
+            for name in FONT_FILES:
+                try:
+                    font = ImageFont.truetype(name, size)
+                    break
+                except OSError:
+                    pass
+            else:
+                font = ImageFont.load_default(size)
+            self.fonts[size] = font
+        return font
+
+    def _measure(self, family, size, text):
+        return self.font(size).getlength(text)
+
+    def text_mask(self, text, size):
+        """Rendered text as an "L" mask and its offset from the anchor point"""
+        key = (text, size)
+        mask = self.masks.get(key)
+        if mask is None:
+            # Label texts repeat across tiles far more than whole tiles do
+            if len(self.masks) >= self.maxsize * 4:
+                self.masks.clear()
+            # Draw centred on a scratch image big enough for any font, then crop
+            lines = text.split("\n")
+            width, height = 2 * size * (max(map(len, lines)) + 2), 4 * size * len(lines)
+            image = Image.new("L", (width, height))
+            ImageDraw.Draw(image).multiline_text((width // 2, height // 2), text, fill=255,
+                                                 font=self.font(size), anchor="mm", align="center")
+            box = image.getbbox() or (0, 0, 1, 1)
+            image = image.crop(box)
+            left, top = box[0] - width // 2, box[1] - height // 2
+            mask = self.masks[key] = (image, left, top)
+        return mask
+
+    def rasterise(self, tile_size, fill, labels):
+        """Draw one tile; labels are (text, font size, fill, dy) tuples"""
+        image = Image.new("RGB", (tile_size, tile_size), fill)
+        draw = ImageDraw.Draw(image)
+        draw.rectangle((0, 0, tile_size - 1, tile_size - 1), outline="black")
+        centre = tile_size // 2
+        for text, size, text_fill, dy in labels:
+            mask, left, top = self.text_mask(text, size)
+            image.paste(text_fill, (centre + left, centre + dy + top), mask)
+        return image
+
+    def sprite(self, tile_size, fill, labels):
+        key = (tile_size, fill, labels)
+        photo = self.images.get(key)
+        if photo is not None:
+            self.hits += 1
+            self.images.move_to_end(key)
+            return photo
+        photo = self.images[key] = self.photo(self.rasterise(tile_size, fill, labels))
+        self.rasterised += 1
+        if len(self.images) > self.maxsize:
+            self.images.popitem(last=False)
+            self.evictions += 1
+        return photo
+
+    def stats(self):
+        lookups = self.hits + self.rasterised
+        return {'hits': self.hits, 'rasterised': self.rasterised,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions, 'size': len(self.images)}
+
+
+class SpriteRenderer(BoardRenderer):
+    """BoardRenderer drawing each tile as a single image item
+
+    Image items carry the label keys as tags and are passed to on_label
+    once per label, so tag bindings and dispatchers keep working.
+    """
+
+    def __init__(self, canvas, labels, tile_fill, grid_size=7, on_label=None, atlas=None):
+        self.atlas = atlas or TileAtlas()
+        super().__init__(canvas, labels, tile_fill, grid_size, on_label,
+                         text_layout=self.atlas.text_layout)
+        # The image shown by each tile, kept referenced so Tk does not free it
+        self.sprites = []
+
+    def _sprite(self, idx):
+        labels = []
+        for label in self.labels:
+            font, text = self._label(label, idx)
+            labels.append((text, font[1], label['fill'], self._scaled(label['dy'])))
+        return self.atlas.sprite(max(1, self.tile_size), self.tile_fill(idx), tuple(labels))
+
+    def _create_tiles(self):
+        keys = tuple(label['key'] for label in self.labels)
+        for idx in range(len(self.geometry)):
+            x, y = self.geometry.centers[idx]
+            sprite = self._sprite(idx)
+            item = self.canvas.create_image(x, y, image=sprite,
+                                            tags=("tile", f"tile{idx}") + keys)
+            self.sprites.append(sprite)
+            self.tile_items.append((item, []))
+            if self.on_label:
+                for key in keys:
+                    self.on_label(idx, key, item)
+            self._count('created')
+
+    def _move_tiles(self):
+        for idx, (item, _) in enumerate(self.tile_items):
+            self.sprites[idx] = self._sprite(idx)
+            self.canvas.coords(item, *self.geometry.centers[idx])
+            self.canvas.itemconfigure(item, image=self.sprites[idx])
+            self._count('updated')
+
+    def update_tile(self, idx):
+        """Re-rasterise one tile after it was edited"""
+        self.begin_frame()
+        if idx < len(self.tile_items):
+            self.sprites[idx] = self._sprite(idx)
+            self.canvas.itemconfigure(self.tile_items[idx][0], image=self.sprites[idx])
+            self._count('updated')
+        return self.frame_stats
+
+
+def repaint_benchmark(root, grid_size=60, tile_sizes=(24, 28, 32, 28), rounds=5):
+    """Mean repaint time of BoardRenderer and SpriteRenderer on a large board
+
+    Each round lays the board out at every tile size and waits for Tk to
+    draw it. Needs a display.
+    """
+    import random
+    import time
+    import tkinter as tk
+
+    rng = random.Random(0)
+    n_tiles = 4 * (grid_size - 1)
+    tiles = [{'text': f"Tile {i+1}", 'value': rng.randint(10, 200),
+              'color': "#%06X" % rng.randint(0x404040, 0xFFFFFF)} for i in range(n_tiles)]
+    labels = [
+        {'key': "name", 'dy': -15, 'size': 10, 'fill': "black", 'text': lambda idx: tiles[idx]['text']},
+        {'key': "link", 'dy': 5, 'size': 8, 'fill': "blue", 'text': lambda idx: f"tile{idx+1}.com"},
+        {'key': "value", 'dy': 20, 'size': 8, 'fill': "black",
+         'text': lambda idx: f"Value: {tiles[idx]['value']}"},
+    ]
+    results = {}
+    for name, renderer_class in (("items", BoardRenderer), ("sprites", SpriteRenderer)):
+        canvas = tk.Canvas(root, width=grid_size * max(tile_sizes), height=grid_size * max(tile_sizes))
+        canvas.pack()
+        renderer = renderer_class(canvas, labels, lambda idx: tiles[idx]['color'], grid_size)
+        renderer.layout(tile_sizes[0])
+        root.update()
+        times = []
+        for _ in range(rounds):
+            for tile_size in tile_sizes:
+                start = time.perf_counter()
+                renderer.layout(tile_size)
+                root.update()
+                times.append(time.perf_counter() - start)
+        results[name] = {'tiles': n_tiles, 'canvas_items': len(canvas.find_all()),
+                         'mean_ms': 1000 * sum(times) / len(times)}
+        canvas.destroy()
+    return results
+
+
+if __name__ == "__main__":
+    import sys
+    import time
+
+    grid_size = int(sys.argv[1]) if len(sys.argv) > 1 else 60
+    try:
+        import tkinter as tk
+        root = tk.Tk()
+    except Exception as e:
+        print(f"No display ({e}), timing rasterisation only")
+        atlas = TileAtlas(photo=lambda image: image)
+        start = time.perf_counter()
+        for i in range(4 * (grid_size - 1)):
+            atlas.sprite(16, "#DDDDDD", ((f"Tile {i+1}", 10, "black", -15),
+                                         (f"Value: {i}", 8, "black", 20)))
+        print(f"{1000 * (time.perf_counter() - start):.1f} ms to rasterise "
+              f"{4 * (grid_size - 1)} tiles: {atlas.stats()}")
+    else:
+        print(repaint_benchmark(root, grid_size))
+        root.destroy()
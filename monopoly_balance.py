@@ -0,0 +1,227 @@
+"""Generate boards whose seats all have the same chance of winning.
+
+Moving first and needing a 1 to start give the early seats an edge on a
+board with random values. This tool searches tile values with simulated
+annealing until every seat's win probability is within tolerance of
+1/n_players.
+
+Each annealing step proposes several neighbouring boards (one tile's
+value nudged, or two tiles' values swapped) and scores them in parallel
+with the NumPy batch simulator, together with the current board. All of
+a step's boards are played with the same simulator seed. The dice do not
+depend on tile values, so they are compared on exactly the same games,
+which removes most of the sampling noise from the comparison. Every step
+draws a new seed, so the search cannot fit itself to one sample's
+noise. A board that meets the tolerance is checked again on a larger,
+independent sample before it is accepted.
+
+Search starts from a board like the front-ends create, with corners
+worth 0 and other tiles worth 10 to 200. Corners stay at 0, and other
+tiles may go down to 0 as well, like the card tiles of the classic
+board. While every move scores something, an extra turn is always
+worth points to the seat that gets it, and no assignment of values of
+10 or more brings two players closer than about 1% apart. Accepted
+boards are written as a board definition file for monopoly_boards.
+
+The default tolerance of 1.5 percentage points is about half the first
+player's edge on a random two-player board. Tighter tolerances are
+reachable but take many more rounds: near the optimum, neighbouring
+boards differ by less than the sampling noise of one step.
+
+    python monopoly_balance.py balanced.json --boards 5 --players 2
+"""
+import math
+import os
+import random
+
+import numpy as np
+
+from monopoly_engine import BOARD_TILES, CORNERS
+from monopoly_vectorized import simulate_batch
+
+MIN_VALUE = 0
+MAX_VALUE = 200
+
+
+def win_shares(scores):
+    """Each seat's share of the wins, splitting tied games evenly"""
+    at_best = scores == scores.max(axis=1)[:, None]
+    return (at_best / at_best.sum(axis=1)[:, None]).mean(axis=0)
+
+
+def imbalance(values, n_games, n_players, seed):
+    """Largest distance of a seat's win share from 1/n_players"""
+    _, scores = simulate_batch(values, n_games, n_players, seed=seed)
+    shares = win_shares(scores)
+    return float(np.abs(shares - 1 / n_players).max()), shares.tolist()
+
+
+_settings = None
+
+
+def _init_worker(n_games, n_players):
+    global _settings
+    _settings = (n_games, n_players)
+
+
+def _score(job):
+    values, seed = job
+    return imbalance(values, *_settings, seed)[0]
+
+
+def neighbour(values, rng, step=30):
+    """A copy of values with two tiles swapped, or one tile nudged or set to a bound"""
+    values = list(values)
+    tiles = [idx for idx in range(BOARD_TILES) if idx not in CORNERS]
+    move = rng.random()
+    if move < 0.4:
+        a, b = rng.sample(tiles, 2)
+        values[a], values[b] = values[b], values[a]
+    elif move < 0.8:
+        idx = rng.choice(tiles)
+        values[idx] = max(MIN_VALUE, min(MAX_VALUE, values[idx] + round(rng.gauss(0, step))))
+    else:
+        # Boards with a few valuable tiles among cheap ones are the most
+        # even, and small steps reach them slowly
+        values[rng.choice(tiles)] = rng.choice((MIN_VALUE, MAX_VALUE))
+    return values
+
+
+def random_values(rng):
+    return [0 if idx in CORNERS else rng.randint(10, MAX_VALUE) for idx in range(BOARD_TILES)]
+
+
+def anneal(values, rng, map_scores, iterations=300, proposals=4, start_temp=0.002, end_temp=0.00005,
+           target=0.0, patience=5):
+    """Simulated annealing on the imbalance, return the final values
+
+    map_scores(list of boards, seed) returns their imbalances on the
+    games of one simulator seed. Each iteration scores the current board
+    and `proposals` neighbours on a fresh seed and considers the best
+    neighbour. Stops early once the current board has scored at most
+    target on `patience` seeds in a row.
+    """
+    current = values
+    streak = 0
+    for iteration in range(iterations):
+        temp = start_temp * (end_temp / start_temp) ** (iteration / max(1, iterations - 1))
+        candidates = [neighbour(current, rng) for _ in range(proposals)]
+        scores = map_scores([current] + candidates, rng.randrange(2**63))
+        current_score = scores[0]
+        streak = streak + 1 if current_score <= target else 0
+        if streak >= patience:
+            break
+        score, candidate = min(zip(scores[1:], candidates))
+        if score <= current_score or rng.random() < math.exp((current_score - score) / temp):
+            current = candidate
+    return current
+
+
+def generate(n_boards, n_players=2, tolerance=0.015, n_games=20000, verify_games=200000,
+             iterations=300, proposals=4, seed=0, processes=None, max_rounds=5, on_board=None):
+    """Search for n_boards balanced boards, return [(values, win shares)]
+
+    Candidates are scored on n_games games; a board is accepted when its
+    imbalance on verify_games fresh games is within tolerance as well.
+    Annealing runs for up to max_rounds rounds of `iterations` steps per
+    board, each round cooler than the last and starting from the best
+    board verified so far; boards that never pass are dropped.
+    """
+    import multiprocessing
+
+    rng = random.Random(seed)
+    processes = processes or os.cpu_count() or 1
+    if processes == 1:
+        _init_worker(n_games, n_players)
+        pool = None
+        map_scores = lambda boards, seed: [_score((board, seed)) for board in boards]
+    else:
+        pool = multiprocessing.Pool(processes, _init_worker, (n_games, n_players))
+        map_scores = lambda boards, seed: pool.map(_score, [(board, seed) for board in boards])
+
+    boards = []
+    try:
+        for _ in range(n_boards):
+            best = random_values(rng)
+            best_score = float("inf")
+            for round_number in range(max_rounds):
+                # Aim below the tolerance so the independent check has some slack
+                values = anneal(best, rng, map_scores, iterations, proposals,
+                                start_temp=0.002 / 2 ** round_number, target=tolerance / 2)
+                verified, shares = imbalance(values, verify_games, n_players, rng.randrange(2**63))
+                if verified < best_score:
+                    best, best_score = values, verified
+                if verified <= tolerance:
+                    boards.append((values, shares))
+                    if on_board:
+                        on_board(values, shares)
+                    break
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+    return boards
+
+
+def board_definitions(boards, base_tiles=None, prefix="balanced"):
+    """Board definition file contents for generated values
+
+    Tiles take their text, colour, link and kind from base_tiles, or are
+    named and coloured like create_random_tiles boards.
+    """
+    rng = random.Random(0)
+    definitions = []
+    for number, (values, shares) in enumerate(boards):
+        tiles = []
+        for idx, value in enumerate(values):
+            if base_tiles:
+                tile = {key: base_tiles[idx][key] for key in ("text", "color", "hyperlink", "kind")}
+            else:
+                tile = {'text': f"Tile {idx+1}", 'color': "#%06X" % rng.randint(0, 0xFFFFFF),
+                        'hyperlink': f"https://tile{idx+1}.com",
+                        'kind': "corner" if idx in CORNERS else "property"}
+            tile['value'] = value
+            tiles.append(tile)
+        definitions.append({'name': f"{prefix}-{len(shares)}p-{number+1}", 'tiles': tiles})
+    return {'boards': definitions}
+
+
+if __name__ == "__main__":
+    import argparse
+    import json
+    import time
+
+    from monopoly_boards import compile_boards, load_board, parse_definitions
+
+    parser = argparse.ArgumentParser(description="Generate boards where every seat wins equally often")
+    parser.add_argument("output", help="board definition file to write (JSON)")
+    parser.add_argument("--boards", type=int, default=1)
+    parser.add_argument("--players", type=int, default=2)
+    parser.add_argument("--tolerance", type=float, default=0.015,
+                        help="largest allowed distance of a seat's win rate from 1/players")
+    parser.add_argument("--games", type=int, default=20000, help="games per candidate")
+    parser.add_argument("--verify-games", type=int, default=200000)
+    parser.add_argument("--iterations", type=int, default=300)
+    parser.add_argument("--proposals", type=int, default=4, help="candidates scored in parallel per step")
+    parser.add_argument("--base", help="board definition file to take names and colours from")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--processes", type=int, default=None)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    random_board = random_values(random.Random(args.seed))
+    before, shares = imbalance(random_board, args.verify_games, args.players, 1)
+    print(f"random board: win shares {[round(s, 4) for s in shares]}, imbalance {before:.4f}")
+
+    def report(values, shares):
+        print(f"balanced board after {time.perf_counter() - start:.0f} s: "
+              f"win shares {[round(s, 4) for s in shares]}")
+
+    boards = generate(args.boards, args.players, args.tolerance, args.games, args.verify_games,
+                      args.iterations, args.proposals, args.seed, args.processes, on_board=report)
+    document = board_definitions(boards, load_board(args.base) if args.base else None)
+    data = json.dumps(document, indent=1).encode()
+    compile_boards(parse_definitions(data, args.output))
+    with open(args.output, "wb") as f:
+        f.write(data)
+    print(f"wrote {len(boards)} of {args.boards} boards to {args.output}")
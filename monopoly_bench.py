@@ -0,0 +1,446 @@
+"""Benchmark suite for the front-ends and the engine, runnable without a display.
+
+With a display (a desktop session or xvfb-run) the front-ends draw on
+real Tk widgets and every timing includes Tk's own work. Without one,
+tkinter is replaced by a stub whose widgets accept every call and whose
+canvas only records item coordinates and options, so timings cover the
+Python side of each operation. The backend is stored with the results,
+and results from different backends should not be compared.
+
+    draw_board      MonopolyGame.draw_board per canvas size, and
+                    BoardRenderer layout per number of tiles
+    roll_dice_turn  turns per second through the single-player window,
+                    with the game-over dialog stubbed out
+    select_tile     latency of a click on the board
+    create_gui      monopoly-game.py window setup per BOARD_SIZE
+    simulate        headless games per second
+
+Results are written as JSON. --compare reads a stored results file and
+flags every result that got worse by more than --threshold; the exit
+status is 1 if any did.
+
+    python monopoly_bench.py --output baseline.json
+    python monopoly_bench.py --compare baseline.json --threshold 0.25
+"""
+import os
+import random
+import sys
+import time
+import types
+
+CANVAS_SIZES = ((400, 320), (800, 640), (1600, 1280), (3200, 2560))
+GRID_SIZES = (7, 13, 26, 51)
+BOARD_SIZES = (7, 15, 31, 63)
+
+
+# Stub tkinter
+
+class _StubWidget:
+    """Accepts any widget call; after callbacks are never run"""
+
+    _next_id = 0
+
+    def __init__(self, *args, **options):
+        self.options = options
+
+    def _new_id(self):
+        _StubWidget._next_id += 1
+        return _StubWidget._next_id
+
+    def cget(self, key):
+        return self.options.get(key, "")
+
+    def configure(self, **options):
+        self.options.update(options)
+
+    config = configure
+
+    def after(self, ms, callback=None, *args):
+        return f"after#{self._new_id()}"
+
+    def get(self):
+        return ""
+
+    def __getattr__(self, name):
+        return lambda *args, **options: None
+
+
+class _StubCanvas(_StubWidget):
+    """Keeps item coordinates and options as a canvas would"""
+
+    def __init__(self, *args, **options):
+        super().__init__(*args, **options)
+        self.items = {}
+
+    def _create(self, *coords, **options):
+        item = self._new_id()
+        self.items[item] = [list(coords), options]
+        return item
+
+    create_rectangle = create_text = create_oval = create_line = create_image = _create
+
+    def coords(self, item, *coords):
+        if coords:
+            self.items[item][0] = list(coords)
+        return self.items[item][0]
+
+    def itemconfigure(self, item, **options):
+        self.items[item][1].update(options)
+
+    itemconfig = itemconfigure
+
+    def delete(self, *items):
+        if "all" in items:
+            self.items.clear()
+        for item in items:
+            self.items.pop(item, None)
+
+    def winfo_width(self):
+        return self.options.get('width', 800)
+
+    def winfo_height(self):
+        return self.options.get('height', 640)
+
+
+class _StubVar:
+    def __init__(self, master=None, value=None):
+        self.value = value
+
+    def get(self):
+        return self.value
+
+    def set(self, value):
+        self.value = value
+
+
+class _StubFont:
+    def __init__(self, family="Arial", size=10, **options):
+        self.size = size
+
+    def measure(self, text):
+        return round(len(text) * self.size * 0.6)
+
+
+def _stub_modules():
+    """tkinter and the submodules the front-ends import, as stubs"""
+    tk = types.ModuleType("tkinter")
+    tk.Canvas = _StubCanvas
+    tk.BooleanVar = tk.IntVar = tk.StringVar = tk.DoubleVar = _StubVar
+    tk.TclError = RuntimeError
+    # Constants such as tk.BOTH are their lower-case names, widgets are stubs
+    tk.__getattr__ = lambda name: name.lower() if name.isupper() else _StubWidget
+    submodules = {}
+    for name in ("messagebox", "simpledialog", "colorchooser", "ttk", "font"):
+        module = types.ModuleType(f"tkinter.{name}")
+        module.__getattr__ = lambda name: (lambda *args, **options: None)
+        setattr(tk, name, module)
+        submodules[f"tkinter.{name}"] = module
+    tk.font.Font = _StubFont
+    return {'tkinter': tk, **submodules}
+
+
+def select_backend(stub=False):
+    """Use Tk if a display is available, else install the stub; return the backend name"""
+    if not stub:
+        try:
+            import tkinter
+            tkinter.Tk().destroy()
+            return "tk"
+        except Exception:
+            pass
+    sys.modules.update(_stub_modules())
+    return "stub"
+
+
+# Helpers
+
+def _metric(value, unit, better="lower"):
+    return {'value': value, 'unit': unit, 'better': better}
+
+
+def _percentile(samples, fraction):
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * fraction))]
+
+
+def _set_canvas_size(canvas, width, height):
+    # draw_board reads the size from winfo_*; this holds with real Tk too
+    canvas.winfo_width = lambda: width
+    canvas.winfo_height = lambda: height
+
+
+def _front_end(workdir, n_players=2, seed=0):
+    """A started single-player window with n_players and its journal in workdir"""
+    import tkinter as tk
+
+    import Monopoly_sp
+
+    Monopoly_sp.SAVE_PATH = os.path.join(workdir, "bench.journal")
+    root = tk.Tk()
+    window = Monopoly_sp.MonopolyGame(root, seed)
+    for seat in range(n_players):
+        window.game.add_player(f"Player {seat+1}", 0, Monopoly_sp.BOT_COLORS[seat])
+    window.start_game()
+    # Map the window, so with real Tk the timed redraws are painted
+    root.update()
+    # The game-over dialog would block, and closes the window
+    window.declare_winner = lambda: None
+    return root, window
+
+
+def _close(root, window):
+    window.animator.clear()
+    window.odds.close()
+    if window.game.journal:
+        window.game.journal.discard()
+    root.destroy()
+
+
+# Benchmarks; each returns {name: metric}
+
+def bench_draw_board(workdir, repeat=20):
+    """First draw and redraw after a resize, per canvas size and per tile count"""
+    import tkinter as tk
+
+    from monopoly_renderer import BoardRenderer
+
+    results = {}
+    root, window = _front_end(workdir)
+    try:
+        for width, height in CANVAS_SIZES:
+            creates, resizes = [], []
+            for n in range(repeat):
+                window.canvas.delete("all")
+                window.renderer = window.animator.renderer = window.create_renderer()
+                _set_canvas_size(window.canvas, width, height)
+                start = time.perf_counter()
+                window.draw_board()
+                root.update_idletasks()
+                creates.append(time.perf_counter() - start)
+            for n in range(repeat):
+                # One tile size step either way; label layouts are cached after the first
+                step = 8 if n % 2 else 0
+                _set_canvas_size(window.canvas, width + step, height + step)
+                start = time.perf_counter()
+                window.draw_board()
+                root.update_idletasks()
+                resizes.append(time.perf_counter() - start)
+            results[f"draw_board.create.{width}x{height}"] = _metric(1000 * _percentile(creates, 0.5), "ms")
+            results[f"draw_board.resize.{width}x{height}"] = _metric(1000 * _percentile(resizes, 0.5), "ms")
+    finally:
+        _close(root, window)
+
+    rng = random.Random(0)
+    root = tk.Tk()
+    try:
+        for grid_size in GRID_SIZES:
+            n_tiles = 4 * (grid_size - 1)
+            values = [rng.randint(10, 200) for _ in range(n_tiles)]
+            labels = [
+                {'key': "name", 'dy': -15, 'size': 10, 'fill': "black", 'text': lambda idx: f"Tile {idx+1}"},
+                {'key': "value", 'dy': 20, 'size': 8, 'fill': "black",
+                 'text': lambda idx: f"Value: {values[idx]}"},
+            ]
+            creates, resizes = [], []
+            for n in range(repeat):
+                canvas = tk.Canvas(root)
+                canvas.pack()
+                renderer = BoardRenderer(canvas, labels, lambda idx: "#DDDDDD", grid_size)
+                start = time.perf_counter()
+                renderer.layout(40)
+                root.update_idletasks()
+                creates.append(time.perf_counter() - start)
+                start = time.perf_counter()
+                renderer.layout(41)
+                root.update_idletasks()
+                resizes.append(time.perf_counter() - start)
+                canvas.destroy()
+            results[f"draw_board.tiles.create.{n_tiles}"] = _metric(1000 * _percentile(creates, 0.5), "ms")
+            results[f"draw_board.tiles.resize.{n_tiles}"] = _metric(1000 * _percentile(resizes, 0.5), "ms")
+    finally:
+        root.destroy()
+    return results
+
+
+def bench_roll_dice_turn(workdir, n_games=10, n_players=4):
+    """Turns per second through roll_dice_turn, over n_games complete games"""
+    elapsed = 0.0
+    turns = []
+    for seed in range(n_games):
+        root, window = _front_end(workdir, n_players, seed)
+        try:
+            _set_canvas_size(window.canvas, 800, 640)
+            window.draw_board()
+            while not window.game.is_over():
+                start = time.perf_counter()
+                window.roll_dice_turn()
+                turns.append(time.perf_counter() - start)
+        finally:
+            _close(root, window)
+    elapsed = sum(turns)
+    return {'roll_dice_turn.turns_per_s': _metric(len(turns) / elapsed, "turns/s", "higher"),
+            'roll_dice_turn.p99': _metric(1000 * _percentile(turns, 0.99), "ms")}
+
+
+def bench_select_tile(workdir, n_clicks=5000):
+    """Latency of clicks at random points of random tiles on an 800x640 canvas"""
+    rng = random.Random(0)
+    root, window = _front_end(workdir)
+    times = []
+    try:
+        _set_canvas_size(window.canvas, 800, 640)
+        window.draw_board()
+        rects = window.renderer.geometry.rects
+        for _ in range(n_clicks):
+            x0, y0, x1, y1 = rng.choice(rects)
+            event = types.SimpleNamespace(x=rng.randrange(x0, x1), y=rng.randrange(y0, y1))
+            start = time.perf_counter()
+            window.select_tile(event)
+            times.append(time.perf_counter() - start)
+    finally:
+        _close(root, window)
+    return {'select_tile.p50': _metric(1000 * _percentile(times, 0.5), "ms"),
+            'select_tile.p99': _metric(1000 * _percentile(times, 0.99), "ms")}
+
+
+def bench_create_gui(workdir, repeat=5):
+    """monopoly-game.py create_gui time per BOARD_SIZE"""
+    import importlib.util
+
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "monopoly-game.py")
+    spec = importlib.util.spec_from_file_location("monopoly_game", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+
+    results = {}
+    for board_size in BOARD_SIZES:
+        module.BOARD_SIZE = board_size
+        for data in module.tile_data.values():
+            data.clear()
+        module.rng.seed(0)
+        module.initialize_board()
+        times = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            root = module.create_gui()
+            root.update_idletasks()
+            times.append(time.perf_counter() - start)
+            root.destroy()
+        results[f"create_gui.board_{board_size}"] = _metric(1000 * _percentile(times, 0.5), "ms")
+    return results
+
+
+def bench_simulate(workdir, n_games=20000):
+    """Headless games per second, with play_fast and with the NumPy simulator"""
+    from monopoly_engine import create_random_tiles, play_fast
+
+    rng = random.Random(0)
+    values = [tile['value'] for tile in create_random_tiles(rng)]
+    start = time.perf_counter()
+    for _ in range(n_games):
+        play_fast(values, 2, rng)
+    results = {'simulate.play_fast': _metric(n_games / (time.perf_counter() - start), "games/s", "higher")}
+    try:
+        from monopoly_vectorized import simulate_batch
+    except ImportError:
+        return results
+    start = time.perf_counter()
+    simulate_batch(values, n_games * 10, seed=0)
+    results['simulate.batch'] = _metric(n_games * 10 / (time.perf_counter() - start), "games/s", "higher")
+    return results
+
+
+BENCHMARKS = {
+    'draw_board': bench_draw_board,
+    'roll_dice_turn': bench_roll_dice_turn,
+    'select_tile': bench_select_tile,
+    'create_gui': bench_create_gui,
+    'simulate': bench_simulate,
+}
+
+
+def run_suite(names=None, stub=False, on_result=None):
+    """Run the named benchmarks (all by default), return the results document"""
+    import platform
+    import tempfile
+
+    backend = select_backend(stub)
+    document = {
+        'meta': {'backend': backend, 'python': platform.python_version(),
+                 'platform': platform.platform(), 'cpus': os.cpu_count(),
+                 'created': time.strftime("%Y-%m-%dT%H:%M:%S")},
+        'results': {},
+    }
+    with tempfile.TemporaryDirectory() as workdir:
+        for name in names or BENCHMARKS:
+            results = BENCHMARKS[name](workdir)
+            document['results'].update(results)
+            if on_result:
+                on_result(name, results)
+    return document
+
+
+def compare(document, baseline, threshold=0.25):
+    """(rows, regressions) comparing results with a baseline document
+
+    A row is (name, baseline value, value, slowdown), where slowdown is
+    above 1 when the result got worse. A result regresses when its
+    slowdown exceeds 1 + threshold.
+    """
+    rows = []
+    regressions = []
+    for name, metric in document['results'].items():
+        before = baseline['results'].get(name)
+        if before is None or not before['value'] or not metric['value']:
+            rows.append((name, None, metric['value'], None))
+            continue
+        if metric['better'] == "higher":
+            slowdown = before['value'] / metric['value']
+        else:
+            slowdown = metric['value'] / before['value']
+        rows.append((name, before['value'], metric['value'], slowdown))
+        if slowdown > 1 + threshold:
+            regressions.append(name)
+    return rows, regressions
+
+
+if __name__ == "__main__":
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description="Benchmark rendering, turns, hit-testing and simulation")
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--compare", metavar="BASELINE", help="results file to check for regressions against")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="allowed slowdown, as a fraction, before a result counts as a regression")
+    parser.add_argument("--only", nargs="+", choices=sorted(BENCHMARKS), help="benchmarks to run")
+    parser.add_argument("--stub", action="store_true", help="use the stub canvas even with a display")
+    args = parser.parse_args()
+
+    def report(name, results):
+        for key, metric in results.items():
+            print(f"{key:36} {metric['value']:12.3f} {metric['unit']}", file=sys.stderr)
+
+    document = run_suite(args.only, args.stub, on_result=report)
+    data = json.dumps(document, indent=1)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(data + "\n")
+    elif not args.compare:
+        print(data)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if baseline['meta'].get('backend') != document['meta']['backend']:
+            print(f"warning: the baseline ran on the {baseline['meta'].get('backend')} backend, "
+                  f"these results on {document['meta']['backend']}")
+        rows, regressions = compare(document, baseline, args.threshold)
+        for name, before, value, slowdown in rows:
+            if slowdown is None:
+                print(f"{name:36} {'':>12} {value:12.3f}  new")
+            else:
+                flag = "  REGRESSION" if name in regressions else ""
+                print(f"{name:36} {before:12.3f} {value:12.3f}  {slowdown:5.2f}x{flag}")
+        print(f"{len(regressions)} regressions beyond {args.threshold:.0%}")
+        sys.exit(1 if regressions else 0)
@@ -0,0 +1,287 @@
+"""Board definitions loaded from JSON or CSV through a binary cache.
+
+A definition file holds one or more boards of BOARD_TILES tiles, each
+with text, value, color (#RRGGBB), hyperlink and kind. JSON files are
+either one board {"name": ..., "tiles": [...]} or a catalog
+{"boards": [...]}. CSV files have the columns text, value, color,
+hyperlink and kind, plus an optional board column naming the board of
+each row; without it the whole file is one board named after the file.
+
+The first load validates every board and compiles the file into a
+binary cache named by the SHA-256 of its contents. Later loads only
+hash the file and map the cache; boards are decoded one at a time when
+first asked for, so catalogs with thousands of boards open instantly.
+The cache repeats the digest in its header and its index is bounds
+checked on open; a cache that fails either check is compiled again.
+"""
+import csv
+import hashlib
+import io
+import json
+import mmap
+import os
+import re
+import struct
+
+from monopoly_engine import BOARD_TILES
+
+KINDS = ("property", "corner", "tax", "railroad", "utility", "card")
+TILE_FIELDS = ("text", "value", "color", "hyperlink", "kind")
+COLOR = re.compile(r"#[0-9A-Fa-f]{6}\Z")
+
+CACHE_MAGIC = b"MGB2"
+DIGEST_SIZE = 32
+COUNT = struct.Struct("<I")
+INDEX_ENTRY = struct.Struct("<QI")
+TILE = struct.Struct("<iB3B")
+STRING = struct.Struct("<H")
+
+
+class BoardError(ValueError):
+    pass
+
+
+def validate_board(name, tiles):
+    """Check one board definition, return its tiles normalised"""
+    if not isinstance(name, str) or not name:
+        raise BoardError("board name must be a non-empty string")
+    if len(tiles) != BOARD_TILES:
+        raise BoardError(f"board {name!r} has {len(tiles)} tiles, expected {BOARD_TILES}")
+    result = []
+    for idx, tile in enumerate(tiles):
+        where = f"board {name!r} tile {idx}"
+        if not isinstance(tile, dict):
+            raise BoardError(f"{where}: expected an object")
+        unknown = set(tile) - set(TILE_FIELDS)
+        if unknown:
+            raise BoardError(f"{where}: unknown fields {sorted(unknown)}")
+        try:
+            value = int(tile.get('value', 0))
+        except (TypeError, ValueError):
+            raise BoardError(f"{where}: value must be an integer") from None
+        if isinstance(tile.get('value'), (bool, float)) or not 0 <= value < 2**31:
+            raise BoardError(f"{where}: value must be a non-negative integer")
+        color = tile.get('color', "#FFFFFF")
+        if not isinstance(color, str) or not COLOR.match(color):
+            raise BoardError(f"{where}: color must look like #RRGGBB")
+        kind = tile.get('kind', "property")
+        if kind not in KINDS:
+            raise BoardError(f"{where}: kind must be one of {', '.join(KINDS)}")
+        result.append({
+            'text': str(tile.get('text', "")),
+            'value': value,
+            'color': color.upper(),
+            'hyperlink': str(tile.get('hyperlink', "")),
+            'kind': kind,
+        })
+    return result
+
+
+def parse_definitions(data, filename):
+    """Parse the bytes of a JSON or CSV definition file into (name, tiles) pairs"""
+    if filename.lower().endswith(".csv"):
+        rows = list(csv.DictReader(io.StringIO(data.decode("utf-8-sig"))))
+        default = os.path.splitext(os.path.basename(filename))[0]
+        boards = {}
+        for row in rows:
+            name = row.pop('board', None) or default
+            boards.setdefault(name, []).append({k: v for k, v in row.items() if v != ""})
+        return list(boards.items())
+
+    document = json.loads(data)
+    boards = document['boards'] if isinstance(document, dict) and 'boards' in document else [document]
+    result = []
+    for board in boards:
+        if not isinstance(board, dict) or not isinstance(board.get('tiles'), list):
+            raise BoardError(f"{filename}: every board needs a name and a tiles list")
+        result.append((board.get('name'), board['tiles']))
+    return result
+
+
+def _pack_string(value):
+    data = value.encode()
+    if len(data) > 0xFFFF:
+        raise BoardError(f"string too long: {value[:40]!r}...")
+    return STRING.pack(len(data)) + data
+
+
+def _unpack_string(buf, offset):
+    (size,) = STRING.unpack_from(buf, offset)
+    offset += STRING.size
+    return bytes(buf[offset:offset+size]).decode(), offset + size
+
+
+def compile_boards(boards, digest=bytes(DIGEST_SIZE)):
+    """Validate (name, tiles) pairs and return the binary cache contents
+
+    digest is the SHA-256 of the definition file, kept in the header.
+    """
+    blobs = []
+    names = set()
+    for name, tiles in boards:
+        tiles = validate_board(name, tiles)
+        if name in names:
+            raise BoardError(f"duplicate board name {name!r}")
+        names.add(name)
+        parts = []
+        for tile in tiles:
+            rgb = bytes.fromhex(tile['color'][1:])
+            parts.append(TILE.pack(tile['value'], KINDS.index(tile['kind']), *rgb))
+            parts.append(_pack_string(tile['text']))
+            parts.append(_pack_string(tile['hyperlink']))
+        blobs.append((name, b"".join(parts)))
+
+    index = [CACHE_MAGIC, digest, COUNT.pack(len(blobs))]
+    index_size = len(CACHE_MAGIC) + DIGEST_SIZE + COUNT.size + sum(
+        len(_pack_string(name)) + INDEX_ENTRY.size for name, _ in blobs)
+    offset = index_size
+    for name, blob in blobs:
+        index.append(_pack_string(name) + INDEX_ENTRY.pack(offset, len(blob)))
+        offset += len(blob)
+    return b"".join(index) + b"".join(blob for _, blob in blobs)
+
+
+class BoardCatalog:
+    """Boards of one compiled cache file, decoded lazily by name
+
+    With digest given, the cache must have been compiled from a file
+    with that SHA-256. Raises BoardError for a cache that is not one,
+    was compiled from another file or is cut short.
+    """
+
+    def __init__(self, cache_path, digest=None):
+        self.cache_path = cache_path
+        with open(cache_path, "rb") as f:
+            try:
+                self.buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                raise BoardError(f"{cache_path} is empty") from None
+        try:
+            self.index = self._read_index(digest)
+        except (BoardError, struct.error, UnicodeDecodeError):
+            self.buf.close()
+            raise BoardError(f"{cache_path} is not a valid board cache") from None
+        self.loaded = {}
+
+    def _read_index(self, digest):
+        buf = self.buf
+        start = len(CACHE_MAGIC) + DIGEST_SIZE
+        if buf[:len(CACHE_MAGIC)] != CACHE_MAGIC:
+            raise BoardError("bad magic")
+        if digest is not None and buf[len(CACHE_MAGIC):start] != digest:
+            raise BoardError("digest mismatch")
+        (count,) = COUNT.unpack_from(buf, start)
+        offset = start + COUNT.size
+        index = {}
+        for _ in range(count):
+            name, offset = _unpack_string(buf, offset)
+            entry = index[name] = INDEX_ENTRY.unpack_from(buf, offset)
+            offset += INDEX_ENTRY.size
+            if entry[0] + entry[1] > len(buf):
+                raise BoardError("truncated")
+        return index
+
+    def __len__(self):
+        return len(self.index)
+
+    def __contains__(self, name):
+        return name in self.index
+
+    def names(self):
+        return list(self.index)
+
+    def board(self, name=None):
+        """Tiles of a board as fresh dicts; the first board if name is None"""
+        if name is None:
+            name = next(iter(self.index))
+        tiles = self.loaded.get(name)
+        if tiles is None:
+            if name not in self.index:
+                raise KeyError(f"no board named {name!r}")
+            offset, _ = self.index[name]
+            tiles = []
+            for idx in range(BOARD_TILES):
+                value, kind, r, g, b = TILE.unpack_from(self.buf, offset)
+                text, offset = _unpack_string(self.buf, offset + TILE.size)
+                hyperlink, offset = _unpack_string(self.buf, offset)
+                tiles.append((text, value, f"#{r:02X}{g:02X}{b:02X}", hyperlink, KINDS[kind]))
+            self.loaded[name] = tiles
+        return [{'text': text, 'value': value, 'color': color, 'hyperlink': hyperlink,
+                 'kind': kind, 'position': idx}
+                for idx, (text, value, color, hyperlink, kind) in enumerate(tiles)]
+
+    def close(self):
+        self.buf.close()
+
+
+def default_cache_dir(path):
+    return os.path.join(os.path.dirname(os.path.abspath(path)), ".board_cache")
+
+
+def load_catalog(path, cache_dir=None):
+    """Open the boards defined in path, compiling its cache if needed"""
+    with open(path, "rb") as f:
+        data = f.read()
+    cache_dir = cache_dir or default_cache_dir(path)
+    digest = hashlib.sha256(data).digest()
+    cache_path = os.path.join(cache_dir, digest.hex() + ".bin")
+    if os.path.exists(cache_path):
+        try:
+            return BoardCatalog(cache_path, digest)
+        except BoardError:
+            pass
+    compiled = compile_boards(parse_definitions(data, path), digest)
+    os.makedirs(cache_dir, exist_ok=True)
+    temp = f"{cache_path}.{os.getpid()}.tmp"
+    with open(temp, "wb") as f:
+        f.write(compiled)
+    os.replace(temp, cache_path)
+    return BoardCatalog(cache_path, digest)
+
+
+def load_board(path, name=None, cache_dir=None):
+    """Tiles of one board from a definition file"""
+    catalog = load_catalog(path, cache_dir)
+    try:
+        return catalog.board(name)
+    finally:
+        catalog.close()
+
+
+if __name__ == "__main__":
+    import random
+    import shutil
+    import sys
+    import tempfile
+    import time
+
+    # Cold compile, warm open and lazy loads for a large generated catalog
+    n_boards = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    rng = random.Random(0)
+    directory = tempfile.mkdtemp()
+    path = os.path.join(directory, "catalog.json")
+    boards = [{'name': f"board{i}", 'tiles': [
+        {'text': f"Tile {j+1}", 'value': rng.randint(10, 200), 'color': "#%06X" % rng.randint(0, 0xFFFFFF),
+         'hyperlink': f"https://tile{j+1}.com", 'kind': rng.choice(KINDS)}
+        for j in range(BOARD_TILES)]} for i in range(n_boards)]
+    with open(path, "w") as f:
+        json.dump({'boards': boards}, f)
+
+    start = time.perf_counter()
+    json.loads(open(path, "rb").read())
+    parse_ms = 1000 * (time.perf_counter() - start)
+    start = time.perf_counter()
+    load_catalog(path).close()
+    cold_ms = 1000 * (time.perf_counter() - start)
+    start = time.perf_counter()
+    catalog = load_catalog(path)
+    warm_ms = 1000 * (time.perf_counter() - start)
+    start = time.perf_counter()
+    tiles = catalog.board(f"board{n_boards // 2}")
+    board_ms = 1000 * (time.perf_counter() - start)
+    assert [t['value'] for t in tiles] == [t['value'] for t in boards[n_boards // 2]['tiles']]
+    catalog.close()
+    print(f"{n_boards} boards, {os.path.getsize(path)} bytes of JSON")
+    print(f"json.loads only: {parse_ms:.1f} ms, first load (validate + compile): {cold_ms:.1f} ms")
+    print(f"cached open: {warm_ms:.1f} ms, one board on demand: {board_ms:.3f} ms")
+    shutil.rmtree(directory)
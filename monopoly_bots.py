@@ -0,0 +1,251 @@
+"""Computer players deciding re-rolls with expectimax search.
+
+An ExpectimaxBot is a re-roll policy for Game.policies. When its seat
+rolls, it compares keeping the roll with re-rolling by searching the
+next turns of the game: each turn is a chance node over the six die
+faces, and the bot's own re-roll choices are max nodes. Opponents are
+assumed to keep their rolls. Leaves are scored by the bot's lead over
+the best opponent, plus a bonus for re-rolls still in hand and for
+winning a finished game.
+
+Search deepens one turn at a time until the bot's depth or its time
+budget per decision is reached; an interrupted depth is discarded.
+Evaluated states are cached in a bounded TranspositionTable, keyed by
+an int packing the seat the bot plays, the visited mask, positions,
+re-rolls left and score differences. Only differences matter to the evaluation, so the same
+situation is found again at any absolute score.
+"""
+import time
+from collections import OrderedDict
+
+from monopoly_engine import BOARD_TILES
+
+FULL_MASK = (1 << BOARD_TILES) - 1
+WIN_BONUS = 10000
+# Score differences are packed with this bias; larger gaps are clamped
+SCORE_BITS = 21
+
+
+class TranspositionTable:
+    """LRU cache of state values with hit statistics"""
+
+    def __init__(self, maxsize=1 << 16):
+        self.maxsize = maxsize
+        self.values = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        value = self.values.get(key)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self.values.move_to_end(key)
+        return value
+
+    def put(self, key, value):
+        self.values[key] = value
+        if len(self.values) > self.maxsize:
+            self.values.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        self.values.clear()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {'hits': self.hits, 'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions, 'size': len(self.values)}
+
+
+class _Timeout(Exception):
+    pass
+
+
+class ExpectimaxBot:
+    """Re-roll policy searching up to depth turns ahead within time_budget seconds
+
+    reroll_value is what one unused re-roll is worth at a leaf, in points;
+    by default a quarter of the board's mean tile value.
+    """
+
+    def __init__(self, depth=4, time_budget=0.002, table=None, reroll_value=None):
+        self.depth = depth
+        self.time_budget = time_budget
+        self.table = table or TranspositionTable()
+        self.reroll_value = reroll_value
+        self.values = None
+        self.value_per_reroll = 0.0
+        self.me = 0
+        self.deadline = 0.0
+        self.decisions = 0
+        self.rerolls = 0
+        self.depth_total = 0
+        self.timeouts = 0
+
+    def __call__(self, game, seat, roll):
+        return self.decide(game, seat, roll)
+
+    def decide(self, game, seat, roll):
+        """True to re-roll the roll seat just made in game"""
+        values = tuple(tile['value'] for tile in game.tiles[:BOARD_TILES])
+        if values != self.values:
+            # Cached values were computed for other tile values
+            self.values = values
+            self.table.clear()
+        self.value_per_reroll = (self.reroll_value if self.reroll_value is not None
+                                 else sum(values) / len(values) / 4)
+        self.me = seat
+        visited = 0
+        for idx in game.visited:
+            visited |= 1 << idx
+        positions = tuple(p['position'] if p['started'] else -1 for p in game.players)
+        scores = tuple(p['score'] for p in game.players)
+        rerolls = tuple(p['rerolls'] for p in game.players)
+
+        self.deadline = time.perf_counter() + self.time_budget
+        choice = False
+        reached = 0
+        for depth in range(1, self.depth + 1):
+            try:
+                keep = self._after(positions, scores, visited, rerolls, seat, roll, depth)
+                spent = rerolls[:seat] + (rerolls[seat] - 1,) + rerolls[seat+1:]
+                reroll = sum(self._after(positions, scores, visited, spent, seat, r, depth)
+                             for r in range(1, 7)) / 6
+            except _Timeout:
+                self.timeouts += 1
+                break
+            choice = reroll > keep
+            reached = depth
+        self.decisions += 1
+        self.rerolls += choice
+        self.depth_total += reached
+        return choice
+
+    def _key(self, positions, scores, visited, rerolls, seat, depth):
+        # Values are margins for self.me, so a bot moved to another seat
+        # must not find them again
+        key = visited | seat << BOARD_TILES | self.me << (BOARD_TILES + 3) | depth << (BOARD_TILES + 6)
+        base = scores[self.me]
+        bias = 1 << (SCORE_BITS - 1)
+        for position, score, left in zip(positions, scores, rerolls):
+            key = key << 5 | (position + 1)
+            key = key << 4 | min(left, 15)
+            key = key << SCORE_BITS | max(0, min(2 * bias - 1, score - base + bias))
+        return key
+
+    def _evaluate(self, scores, rerolls, over):
+        me = scores[self.me]
+        others = [score for seat, score in enumerate(scores) if seat != self.me]
+        margin = me - max(others) if others else me
+        if over:
+            return margin + (WIN_BONUS if margin > 0 else -WIN_BONUS if margin < 0 else 0)
+        return margin + self.value_per_reroll * rerolls[self.me]
+
+    def _after(self, positions, scores, visited, rerolls, seat, roll, depth):
+        """Value once seat's turn ends with roll"""
+        position = positions[seat]
+        if position < 0:
+            if roll == 1:
+                positions = positions[:seat] + (1,) + positions[seat+1:]
+                visited |= 3
+        else:
+            position = (position + roll) % BOARD_TILES
+            positions = positions[:seat] + (position,) + positions[seat+1:]
+            visited |= 1 << position
+            scores = scores[:seat] + (scores[seat] + self.values[position],) + scores[seat+1:]
+        if visited == FULL_MASK:
+            return self._evaluate(scores, rerolls, True)
+        if depth <= 1:
+            return self._evaluate(scores, rerolls, False)
+        return self._turn(positions, scores, visited, rerolls, (seat + 1) % len(positions), depth - 1)
+
+    def _turn(self, positions, scores, visited, rerolls, seat, depth):
+        """Expected value of seat's coming turn"""
+        key = self._key(positions, scores, visited, rerolls, seat, depth)
+        value = self.table.get(key)
+        if value is not None:
+            return value
+        if time.perf_counter() > self.deadline:
+            raise _Timeout
+
+        after = self._after
+        outcomes = [after(positions, scores, visited, rerolls, seat, roll, depth) for roll in range(1, 7)]
+        if seat == self.me and rerolls[seat]:
+            spent = rerolls[:seat] + (rerolls[seat] - 1,) + rerolls[seat+1:]
+            reroll = sum(after(positions, scores, visited, spent, seat, roll, depth)
+                         for roll in range(1, 7)) / 6
+            outcomes = [max(keep, reroll) for keep in outcomes]
+        value = sum(outcomes) / 6
+        self.table.put(key, value)
+        return value
+
+    def stats(self):
+        return {'decisions': self.decisions, 'rerolls': self.rerolls, 'timeouts': self.timeouts,
+                'mean_depth': self.depth_total / self.decisions if self.decisions else 0.0,
+                'table': self.table.stats()}
+
+
+# Policies a journal records by name and restores on resume
+POLICIES = {'expectimax': ExpectimaxBot}
+
+
+def threshold_policy(game, seat, roll):
+    """Baseline: re-roll when the roll lands on a below-average tile"""
+    player = game.players[seat]
+    if not player['started']:
+        return roll != 1
+    values = [tile['value'] for tile in game.tiles[:BOARD_TILES]]
+    return values[(player['position'] + roll) % BOARD_TILES] < sum(values) / len(values)
+
+
+def play_table(n_games=200, n_players=2, rerolls=3, depth=4, time_budget=0.002, seed=0, opponent=None):
+    """Seat 0 is an ExpectimaxBot, the others use opponent (or also bots)
+
+    Returns seat 0's win rate, turns per second and the bot's statistics.
+    """
+    import random
+
+    from monopoly_engine import Game, create_random_tiles
+
+    rng = random.Random(seed)
+    bots = [ExpectimaxBot(depth, time_budget) for _ in range(n_players if opponent is None else 1)]
+    wins = ties = turns = 0
+    start = time.perf_counter()
+    for _ in range(n_games):
+        game = Game(create_random_tiles(rng), rng, rerolls)
+        for seat in range(n_players):
+            game.add_player(f"Player {seat+1}")
+            game.policies[seat] = bots[seat] if seat < len(bots) else opponent
+        _, winners = game.play_to_completion()
+        turns += game.turns
+        if any(winner is game.players[0] for winner in winners):
+            if len(winners) > 1:
+                ties += 1
+            else:
+                wins += 1
+    elapsed = time.perf_counter() - start
+    return {'games': n_games, 'win_rate': wins / n_games, 'ties': ties,
+            'turns_per_s': turns / elapsed, 'bot': bots[0].stats()}
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Pit an expectimax bot against simple policies")
+    parser.add_argument("--games", type=int, default=200)
+    parser.add_argument("--players", type=int, default=2)
+    parser.add_argument("--rerolls", type=int, default=3)
+    parser.add_argument("--depth", type=int, default=4)
+    parser.add_argument("--budget-ms", type=float, default=2.0)
+    args = parser.parse_args()
+
+    for name, opponent in (("keeps every roll", None), ("threshold re-rolls", threshold_policy)):
+        result = play_table(args.games, args.players, args.rerolls, args.depth,
+                            args.budget_ms / 1000, opponent=opponent or (lambda game, seat, roll: False))
+        print(f"vs {name}: {result}")
+    print("all seats bots:", play_table(args.games, args.players, args.rerolls, args.depth,
+                                        args.budget_ms / 1000))
@@ -0,0 +1,248 @@
+"""Compact game representation for simulation and hosting workloads.
+
+Game in monopoly_engine keeps players as dicts, tiles as dicts and visited
+as a set, which is convenient for the Tk front-ends but costs several KB
+per game. Here tiles are interned in a shared TileCatalog, a Board is two
+small arrays of catalog ids and values shared by every game with the same
+layout, players live in parallel arrays (or slotted Player views), and
+visited is an int bitmask.
+
+CompactGame follows the same rules and random draws as Game.step.
+"""
+import random
+import sys
+import weakref
+from array import array
+
+from monopoly_engine import BOARD_TILES, roll_die
+
+FULL_MASK = (1 << BOARD_TILES) - 1
+
+
+class TileCatalog:
+    """Interned, immutable tile records shared by every board
+
+    The catalog only keeps what live boards use: boards are held weakly
+    and every record counts the boards that reference it, so a board that
+    is edited away takes its records with it. Freed ids are reused.
+    """
+
+    def __init__(self):
+        self.records = []
+        self.ids = {}
+        self.uses = []
+        self.free = []
+        self.boards = weakref.WeakValueDictionary()
+
+    def __len__(self):
+        return len(self.ids)
+
+    def intern(self, tile):
+        record = (sys.intern(tile['text']), int(tile['value']),
+                  sys.intern(tile['color']), sys.intern(tile['hyperlink']))
+        tile_id = self.ids.get(record)
+        if tile_id is None:
+            if self.free:
+                tile_id = self.free.pop()
+                self.records[tile_id] = record
+            else:
+                tile_id = len(self.records)
+                self.records.append(record)
+                self.uses.append(0)
+            self.ids[record] = tile_id
+        return tile_id
+
+    def tile(self, tile_id):
+        text, value, color, hyperlink = self.records[tile_id]
+        return {'text': text, 'value': value, 'color': color, 'hyperlink': hyperlink}
+
+    def board(self, tiles):
+        """Shared Board for a tile list; identical layouts get one instance"""
+        tile_ids = tuple(self.intern(t) for t in tiles[:BOARD_TILES])
+        board = self.boards.get(tile_ids)
+        if board is None:
+            board = self.boards[tile_ids] = Board(tile_ids, self)
+            for tile_id in tile_ids:
+                self.uses[tile_id] += 1
+            weakref.finalize(board, self._release, tile_ids).atexit = False
+        return board
+
+    def _release(self, tile_ids):
+        """Drop a dead board's references, freeing records nothing else uses"""
+        for tile_id in tile_ids:
+            self.uses[tile_id] -= 1
+            if not self.uses[tile_id]:
+                del self.ids[self.records[tile_id]]
+                self.records[tile_id] = None
+                self.free.append(tile_id)
+
+
+CATALOG = TileCatalog()
+
+
+class Board:
+    """An immutable board: catalog ids plus a flat value array
+
+    Build boards with TileCatalog.board so identical layouts are shared.
+    """
+
+    __slots__ = ('catalog', 'tile_ids', 'values', '__weakref__')
+
+    def __init__(self, tile_ids, catalog):
+        self.catalog = catalog
+        self.tile_ids = array('I', tile_ids)
+        self.values = array('i', (catalog.records[i][1] for i in tile_ids))
+
+    def tile(self, idx):
+        return self.catalog.tile(self.tile_ids[idx])
+
+    def with_tile(self, idx, **changes):
+        """Copy of this board with one tile edited, e.g. from the edit panel"""
+        tiles = [self.tile(i) for i in range(len(self.tile_ids))]
+        tiles[idx].update(changes)
+        return self.catalog.board(tiles)
+
+
+class Player:
+    __slots__ = ('name', 'score', 'color', 'position', 'started')
+
+    def __init__(self, name, score=0, color="white"):
+        self.name = name
+        self.score = score
+        self.color = color
+        self.position = 0
+        self.started = False
+
+
+class CompactGame:
+    """Struct-of-arrays game state: one array per player field"""
+
+    __slots__ = ('board', 'rng', 'names', 'colors', 'positions', 'scores',
+                 'visited', 'current_player', 'turns')
+
+    def __init__(self, board, rng=random):
+        self.board = board
+        self.rng = rng
+        self.names = []
+        self.colors = []
+        # Position -1 means the player has not rolled a 1 yet
+        self.positions = array('b')
+        self.scores = array('q')
+        self.visited = 0
+        self.current_player = 0
+        self.turns = 0
+
+    def add_player(self, name, score=0, color="white"):
+        self.names.append(sys.intern(name))
+        self.colors.append(sys.intern(color))
+        self.positions.append(-1)
+        self.scores.append(score)
+
+    def is_over(self):
+        return self.visited == FULL_MASK
+
+    def step(self):
+        """Play one turn, return (seat, roll, position)"""
+        seat = self.current_player
+        roll = roll_die(self.rng)
+        pos = self.positions[seat]
+        if pos < 0:
+            if roll == 1:
+                pos = 1
+                self.positions[seat] = 1
+                self.visited |= 3
+        else:
+            pos = (pos + roll) % BOARD_TILES
+            self.positions[seat] = pos
+            self.visited |= 1 << pos
+            self.scores[seat] += self.board.values[pos]
+
+        self.turns += 1
+        if self.visited != FULL_MASK:
+            self.current_player = (seat + 1) % len(self.names)
+        return seat, roll, pos
+
+    def play_to_completion(self, max_turns=None):
+        while not self.is_over():
+            if max_turns is not None and self.turns >= max_turns:
+                break
+            self.step()
+        return self.winners()
+
+    def winners(self):
+        max_score = max(self.scores)
+        return max_score, [self.names[i] for i, s in enumerate(self.scores) if s == max_score]
+
+    def player(self, seat):
+        """Slotted view of one seat, e.g. for display"""
+        player = Player(self.names[seat], self.scores[seat], self.colors[seat])
+        player.position = max(self.positions[seat], 0)
+        player.started = self.positions[seat] >= 0
+        return player
+
+
+def _measure(build, n_games):
+    import gc
+    import tracemalloc
+
+    gc.collect()
+    tracemalloc.start()
+    games = [build(i) for i in range(n_games)]
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del games
+    return current / n_games
+
+
+def memory_benchmark(n_games=10000, n_players=4, turns=60, seed=0):
+    """Bytes per game for the dict layout and the compact layout
+
+    Both layouts get their own copy of the tiles, as every Tk window does,
+    and are played for the same number of turns. The random source is
+    shared so its state is not counted.
+    """
+    import copy
+
+    from monopoly_engine import Game, create_random_tiles
+
+    tiles = create_random_tiles(random.Random(seed))
+    rng = random.Random(seed)
+
+    def build_dict(i):
+        game = Game(copy.deepcopy(tiles), rng)
+        for seat in range(n_players):
+            game.add_player(f"Player {seat+1}")
+        game.play_to_completion(turns)
+        return game
+
+    def build_compact(i):
+        game = CompactGame(CATALOG.board(copy.deepcopy(tiles)), rng)
+        for seat in range(n_players):
+            game.add_player(f"Player {seat+1}")
+        game.play_to_completion(turns)
+        return game
+
+    dict_bytes = _measure(build_dict, n_games)
+    compact_bytes = _measure(build_compact, n_games)
+    return {'games': n_games, 'dict_bytes': dict_bytes, 'compact_bytes': compact_bytes,
+            'ratio': dict_bytes / compact_bytes}
+
+
+if __name__ == "__main__":
+    import time
+
+    from monopoly_engine import Game, create_random_tiles
+
+    print(memory_benchmark())
+
+    tiles = create_random_tiles(random.Random(0))
+    board = CATALOG.board(tiles)
+    for name, build in (("dict", lambda i: Game(tiles, random.Random(i))),
+                        ("compact", lambda i: CompactGame(board, random.Random(i)))):
+        start = time.perf_counter()
+        for i in range(2000):
+            game = build(i)
+            for seat in range(4):
+                game.add_player(f"Player {seat+1}")
+            game.play_to_completion()
+        print(f"{name}: {2000 / (time.perf_counter() - start):.0f} games/s")
@@ -0,0 +1,220 @@
+"""Headless game rules shared by the Tk front-ends.
+
+This module has no tkinter import so it can be used for offline simulation.
+"""
+import random
+
+BOARD_TILES = 24
+CORNERS = {0, 6, 12, 18}
+
+
+def roll_die(rng=random):
+    """Roll a six-sided die using the given random source"""
+    return int(rng.random() * 6) + 1
+
+
+def create_random_tiles(rng=random):
+    """Create a board of random tiles, with zero-value corners"""
+    tiles = []
+    for i in range(BOARD_TILES):
+        tiles.append({
+            'color': "#%06x" % rng.randint(0, 0xFFFFFF),
+            'value': rng.randint(10, 200) if i not in CORNERS else 0,
+            'text': f"Tile {i+1}",
+            'hyperlink': f"https://tile{i+1}.com",
+            'position': i
+        })
+    return tiles
+
+
+class Game:
+    """State and rules of a single game, independent of any UI
+
+    rerolls is an optional house rule: each player may throw away that
+    many rolls per game and roll again, keeping the second roll. Whether
+    to re-roll is asked of the seat's policy in policies, a function
+    (game, seat, roll) returning True to re-roll; seats without a policy
+    keep every roll, so with no policies a game makes one random draw
+    per turn. A policy can be given to add_player, e.g. for a computer
+    player.
+    """
+
+    def __init__(self, tiles, rng=random, rerolls=0):
+        self.tiles = tiles
+        self.rng = rng
+        self.rerolls = rerolls
+        self.policies = {}
+        self.players = []
+        self.current_player = 0
+        self.visited = set()
+        self.turns = 0
+        # Optional recorder with player_added/turn_played/tile_edited hooks
+        self.journal = None
+
+    def set_rerolls(self, rerolls):
+        """Change the re-roll house rule before the first turn, for every player"""
+        self.rerolls = rerolls
+        for player in self.players:
+            player['rerolls'] = rerolls
+
+    def add_player(self, name, score=0, color="white", policy=None):
+        player = {
+            'name': name,
+            'score': score,
+            'color': color,
+            'position': 0,
+            'started': False,
+            'rerolls': self.rerolls
+        }
+        self.players.append(player)
+        if policy is not None:
+            self.policies[len(self.players) - 1] = policy
+        if self.journal:
+            self.journal.player_added(player)
+        return player
+
+    def is_over(self):
+        return len(self.visited) >= BOARD_TILES
+
+    def step(self):
+        """Play one turn for the current player and describe what happened"""
+        player = self.players[self.current_player]
+        roll = roll_die(self.rng)
+        policy = self.policies.get(self.current_player)
+        rerolled = bool(player['rerolls'] and policy and policy(self, self.current_player, roll))
+        if rerolled:
+            player['rerolls'] -= 1
+            roll = roll_die(self.rng)
+        turn = {'seat': self.current_player, 'player': player, 'roll': roll, 'event': "wait",
+                'position': player['position'], 'value': 0, 'rerolled': rerolled}
+
+        if not player['started']:
+            if roll == 1:
+                player['started'] = True
+                self.visited.update([0, 1])
+                player['position'] = 1
+                turn['event'] = "started"
+                turn['position'] = 1
+        else:
+            new_pos = (player['position'] + roll) % BOARD_TILES
+            value = self.tiles[new_pos]['value']
+            player['position'] = new_pos
+            self.visited.add(new_pos)
+            player['score'] += value
+            turn.update(event="moved", position=new_pos, value=value)
+
+        self.turns += 1
+        turn['game_over'] = self.is_over()
+        if not turn['game_over']:
+            self.current_player = (self.current_player + 1) % len(self.players)
+        if self.journal:
+            self.journal.turn_played(turn)
+        return turn
+
+    def edit_tile(self, idx, **changes):
+        """Change the properties of one tile, e.g. from the edit panel"""
+        self.tiles[idx].update(changes)
+        if self.journal:
+            self.journal.tile_edited(idx)
+
+    def play_to_completion(self, max_turns=None):
+        """Play turns until the board is fully visited, return the winners"""
+        while not self.is_over():
+            if max_turns is not None and self.turns >= max_turns:
+                break
+            self.step()
+        return self.winners()
+
+    def winners(self):
+        """Return the best score and the players holding it"""
+        max_score = max(p['score'] for p in self.players)
+        return max_score, [p for p in self.players if p['score'] == max_score]
+
+
+def play_fast(values, n_players, rng=random):
+    """Play a full game with bare locals, return (turns, scores)
+
+    Follows exactly the same rules and random draws as Game.step.
+    """
+    return play_from(values, [-1] * n_players, [0] * n_players, 0, 0, rng)
+
+
+def play_from(values, positions, scores, visited, seat, rng=random):
+    """Play an unfinished game on to its end, return (turns played, final scores)
+
+    positions holds -1 for players still waiting for a 1, visited is a
+    bitmask of tiles and seat is the player to move.
+    """
+    full = (1 << BOARD_TILES) - 1
+    rand = rng.random
+    positions = list(positions)
+    scores = list(scores)
+    n_players = len(positions)
+    turns = 0
+    while True:
+        roll = int(rand() * 6) + 1
+        pos = positions[seat]
+        if pos < 0:
+            if roll == 1:
+                positions[seat] = 1
+                visited |= 3
+        else:
+            pos = (pos + roll) % BOARD_TILES
+            positions[seat] = pos
+            visited |= 1 << pos
+            scores[seat] += values[pos]
+        turns += 1
+        if visited == full:
+            return turns, scores
+        seat += 1
+        if seat == n_players:
+            seat = 0
+
+
+def simulate(n_games, seed=None, n_players=2, tiles=None):
+    """Play n_games headless games and summarise the results
+
+    When no tiles are given a random board is drawn once from the seed and
+    used for every game.
+    """
+    rng = random.Random(seed)
+    if tiles is None:
+        tiles = create_random_tiles(rng)
+    values = [tile['value'] for tile in tiles[:BOARD_TILES]]
+
+    wins = [0] * n_players
+    ties = 0
+    total_turns = 0
+    total_scores = [0] * n_players
+    for _ in range(n_games):
+        turns, scores = play_fast(values, n_players, rng)
+        total_turns += turns
+        best = max(scores)
+        if scores.count(best) > 1:
+            ties += 1
+        else:
+            wins[scores.index(best)] += 1
+        for seat in range(n_players):
+            total_scores[seat] += scores[seat]
+
+    n = max(n_games, 1)
+    return {
+        'games': n_games,
+        'players': n_players,
+        'mean_turns': total_turns / n,
+        'wins': wins,
+        'ties': ties,
+        'mean_scores': [s / n for s in total_scores],
+    }
+
+
+if __name__ == "__main__":
+    import sys
+    import time
+
+    n_games = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    start = time.perf_counter()
+    result = simulate(n_games, seed=0)
+    elapsed = time.perf_counter() - start
+    print(result)
+    print(f"{n_games / elapsed:.0f} games/s")
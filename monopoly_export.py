@@ -0,0 +1,235 @@
+"""Headless board rendering to SVG and PNG for batch export.
+
+Boards are laid out with the same BoardGeometry, labels and token sizes
+as the Tk renderers, so exports match what the game windows draw, but
+nothing here imports tkinter. SVG output needs no third-party packages;
+PNG output needs Pillow and reuses TileAtlas, so identical tiles are
+rasterised once per worker.
+
+export_batch renders many boards or game states across a process pool.
+Workers write their files themselves, and at most max_pending jobs are
+outstanding at any time, so memory stays bounded however long the
+input is.
+
+    python monopoly_export.py out/ --games 5000 --format png
+    python monopoly_export.py out/ --board boards/classic.json
+"""
+import os
+import threading
+from xml.sax.saxutils import escape
+
+from monopoly_geometry import BoardGeometry
+from monopoly_renderer import FONT_FAMILY, REFERENCE_TILE_SIZE
+from monopoly_textlayout import MIN_FONT_SIZE, TextLayoutCache
+
+# The labels the single-player window draws on every tile
+BOARD_LABELS = (
+    {'key': "name", 'dy': -15, 'size': 10, 'fill': "black", 'text': lambda tile: tile['text']},
+    {'key': "link", 'dy': 5, 'size': 8, 'fill': "blue", 'text': lambda tile: tile.get('hyperlink', "")},
+    {'key': "value", 'dy': 20, 'size': 8, 'fill': "black", 'text': lambda tile: f"Value: {tile['value']}"},
+)
+FORMATS = ("svg", "png")
+
+
+def _approximate_width(family, size, text):
+    return round(len(text) * size * 0.6)
+
+
+class BoardExporter:
+    """Renders board states ({'tiles': [...], 'players': [...]}) to files
+
+    A state's players are optional dicts as made by Game.add_player; only
+    started players get a token.
+    """
+
+    def __init__(self, tile_size=100, grid_size=7, labels=BOARD_LABELS):
+        self.tile_size = tile_size
+        self.geometry = BoardGeometry(grid_size, tile_size)
+        self.labels = labels
+        self.text_layout = TextLayoutCache(measure=_approximate_width)
+        self.atlas = None
+
+    def _scaled(self, value):
+        return round(value * self.tile_size / REFERENCE_TILE_SIZE)
+
+    def _fit(self, text_layout, label, tile):
+        max_lines = label.get('lines', 3) if label.get('wrap') else 1
+        return text_layout.fit(label['text'](tile), FONT_FAMILY,
+                               max(MIN_FONT_SIZE, self._scaled(label['size'])),
+                               self.tile_size-10, max_lines)
+
+    def _tokens(self, players):
+        r = max(4, self._scaled(10))
+        for player in players:
+            if player.get('started'):
+                x, y = self.geometry.centers[player['position']]
+                yield (x-r, y-r, x+r, y+r), player['color']
+
+    def svg(self, state):
+        """SVG document of a board state as a string"""
+        side = self.geometry.grid_size * self.tile_size
+        out = [f'<svg xmlns="http://www.w3.org/2000/svg" width="{side}" height="{side}" '
+               f'viewBox="0 0 {side} {side}" font-family="{FONT_FAMILY}" text-anchor="middle">',
+               f'<rect width="{side}" height="{side}" fill="white"/>']
+        for idx, tile in enumerate(state['tiles'][:len(self.geometry)]):
+            x0, y0, x1, y1 = self.geometry.rects[idx]
+            x, y = self.geometry.centers[idx]
+            out.append(f'<rect x="{x0}" y="{y0}" width="{x1-x0}" height="{y1-y0}" '
+                       f'fill="{escape(tile["color"])}" stroke="black"/>')
+            for label in self.labels:
+                size, text = self._fit(self.text_layout, label, tile)
+                lines = text.split("\n")
+                top = y + self._scaled(label['dy']) - size * 1.2 * (len(lines) - 1) / 2
+                for n, line in enumerate(lines):
+                    out.append(f'<text x="{x}" y="{top + n * size * 1.2:g}" font-size="{size}" '
+                               f'fill="{label["fill"]}" dominant-baseline="central">{escape(line)}</text>')
+        for (x0, y0, x1, y1), color in self._tokens(state.get('players', ())):
+            out.append(f'<ellipse cx="{(x0+x1)/2:g}" cy="{(y0+y1)/2:g}" rx="{(x1-x0)/2:g}" '
+                       f'ry="{(y1-y0)/2:g}" fill="{escape(color)}" stroke="black"/>')
+        out.append("</svg>\n")
+        return "\n".join(out)
+
+    def png(self, state):
+        """Pillow image of a board state"""
+        from PIL import Image, ImageDraw
+
+        from monopoly_atlas import TileAtlas
+
+        if self.atlas is None:
+            self.atlas = TileAtlas(photo=lambda image: image)
+        side = self.geometry.grid_size * self.tile_size
+        image = Image.new("RGB", (side, side), "white")
+        for idx, tile in enumerate(state['tiles'][:len(self.geometry)]):
+            labels = []
+            for label in self.labels:
+                size, text = self._fit(self.atlas.text_layout, label, tile)
+                labels.append((text, size, label['fill'], self._scaled(label['dy'])))
+            sprite = self.atlas.sprite(self.tile_size, tile['color'], tuple(labels))
+            image.paste(sprite, self.geometry.rects[idx][:2])
+        draw = ImageDraw.Draw(image)
+        for box, color in self._tokens(state.get('players', ())):
+            draw.ellipse(box, fill=color, outline="black")
+        return image
+
+    def write(self, state, path):
+        """Render a state to path; the extension picks SVG or PNG"""
+        if path.lower().endswith(".svg"):
+            data = self.svg(state).encode()
+        else:
+            import io
+            buf = io.BytesIO()
+            self.png(state).save(buf, "PNG", compress_level=1)
+            data = buf.getvalue()
+        temp = f"{path}.{os.getpid()}.tmp"
+        with open(temp, "wb") as f:
+            f.write(data)
+        os.replace(temp, path)
+        return len(data)
+
+
+_worker_exporter = None
+
+
+def _init_worker(tile_size):
+    global _worker_exporter
+    _worker_exporter = BoardExporter(tile_size)
+
+
+def _export_one(job):
+    path, state = job
+    return path, _worker_exporter.write(state, path)
+
+
+def export_batch(states, out_dir, fmt="svg", tile_size=100, processes=None, max_pending=None,
+                 on_done=None):
+    """Render (name, state) pairs into out_dir across a process pool
+
+    states may be any iterable, including a generator; it is consumed no
+    faster than the workers finish. on_done(path, size) is called for
+    every file written. Returns the number of files and bytes written.
+    """
+    import multiprocessing
+
+    if fmt not in FORMATS:
+        raise ValueError(f"format must be one of {', '.join(FORMATS)}")
+    os.makedirs(out_dir, exist_ok=True)
+    processes = processes or os.cpu_count() or 1
+    max_pending = max_pending or processes * 8
+    slots = threading.BoundedSemaphore(max_pending)
+    totals = {'files': 0, 'bytes': 0}
+    errors = []
+
+    def done(result):
+        totals['files'] += 1
+        totals['bytes'] += result[1]
+        if on_done:
+            on_done(*result)
+        slots.release()
+
+    def failed(error):
+        errors.append(error)
+        slots.release()
+
+    with multiprocessing.Pool(processes, _init_worker, (tile_size,)) as pool:
+        for name, state in states:
+            slots.acquire()
+            if errors:
+                break
+            pool.apply_async(_export_one, ((os.path.join(out_dir, f"{name}.{fmt}"), state),),
+                             callback=done, error_callback=failed)
+        pool.close()
+        pool.join()
+    if errors:
+        raise errors[0]
+    return totals
+
+
+def game_states(n_games, seed=0, n_players=4, tiles=None):
+    """(name, state) for the final position of n_games seeded random games"""
+    import random
+
+    from monopoly_engine import Game, create_random_tiles
+
+    colors = ("red", "green", "blue", "yellow")
+    for n in range(n_games):
+        rng = random.Random(f"{seed}:{n}")
+        game = Game(tiles or create_random_tiles(rng), rng)
+        for seat in range(n_players):
+            game.add_player(f"Player {seat+1}", color=colors[seat % len(colors)])
+        game.play_to_completion()
+        yield f"game{n:06d}", {'tiles': game.tiles, 'players': game.players}
+
+
+def catalog_states(path):
+    """(name, state) for every board in a definition file"""
+    from monopoly_boards import load_catalog
+
+    catalog = load_catalog(path)
+    try:
+        for name in catalog.names():
+            yield name, {'tiles': catalog.board(name), 'players': []}
+    finally:
+        catalog.close()
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Render boards or game states to SVG/PNG files")
+    parser.add_argument("out_dir")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--board", help="JSON/CSV board definition file; every board is rendered")
+    source.add_argument("--games", type=int, default=1000, help="random seeded games to render")
+    parser.add_argument("--format", choices=FORMATS, default="svg")
+    parser.add_argument("--tile-size", type=int, default=100)
+    parser.add_argument("--processes", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    states = catalog_states(args.board) if args.board else game_states(args.games, args.seed)
+    start = time.perf_counter()
+    totals = export_batch(states, args.out_dir, args.format, args.tile_size, args.processes)
+    elapsed = time.perf_counter() - start
+    print(f"{totals['files']} files, {totals['bytes'] / 1e6:.1f} MB in {elapsed:.1f} s "
+          f"({totals['files'] / elapsed:.0f} boards/s)")
@@ -0,0 +1,97 @@
+"""Board geometry shared by the renderers and click handling.
+
+A BoardGeometry is built once per (grid size, tile size) and answers
+"which tile is at this pixel" and "where is tile n" with table lookups.
+"""
+
+
+def perimeter_positions(grid_size=7):
+    """Grid (row, col) of each perimeter tile, in board order"""
+    last = grid_size - 1
+    positions = []
+    for row in range(last, -1, -1): positions.append((row, last))
+    for col in range(last - 1, -1, -1): positions.append((0, col))
+    for row in range(1, last + 1): positions.append((row, 0))
+    for col in range(1, last): positions.append((last, col))
+    return positions
+
+
+def perimeter_cell(idx, grid_size=7):
+    """Grid (row, col) of perimeter tile idx without building the board"""
+    last = grid_size - 1
+    if idx <= last:
+        return last - idx, last
+    if idx <= 2*last:
+        return 0, 2*last - idx
+    if idx <= 3*last:
+        return idx - 2*last, 0
+    return last, idx - 3*last
+
+
+def perimeter_runs(rows, cols, grid_size=7):
+    """Tile index ranges of the perimeter inside a block of cells
+
+    rows and cols are inclusive (first, last) ranges. Returns a list of
+    (first index, last index) runs, one per board edge crossed, so the
+    cost does not depend on the board size.
+    """
+    last = grid_size - 1
+    r0, r1 = max(rows[0], 0), min(rows[1], last)
+    c0, c1 = max(cols[0], 0), min(cols[1], last)
+    if r0 > r1 or c0 > c1:
+        return []
+    runs = []
+    if c1 == last:
+        runs.append((last - r1, last - r0))
+    if r0 == 0:
+        runs.append((2*last - min(c1, last - 1), 2*last - c0))
+    if c0 == 0:
+        runs.append((2*last + max(r0, 1), 2*last + r1))
+    if r1 == last:
+        runs.append((3*last + max(c0, 1), 3*last + min(c1, last - 1)))
+    return [(first, end) for first, end in runs if first <= end]
+
+
+class BoardGeometry:
+    """Perimeter order, grid lookup table and pixel rectangles of a board"""
+
+    def __init__(self, grid_size=7, tile_size=0):
+        self.grid_size = grid_size
+        self.tile_size = tile_size
+        self.positions = perimeter_positions(grid_size)
+
+        # Dense row-major grid of tile indices, -1 for the board interior
+        self.grid = [-1] * (grid_size * grid_size)
+        for idx, (row, col) in enumerate(self.positions):
+            self.grid[row * grid_size + col] = idx
+
+        half = tile_size//2
+        self.centers = []
+        self.rects = []
+        for row, col in self.positions:
+            x = col * tile_size + half
+            y = row * tile_size + half
+            self.centers.append((x, y))
+            self.rects.append((x-half, y-half, x+half, y+half))
+
+    def __len__(self):
+        return len(self.positions)
+
+    def resized(self, tile_size):
+        """Return a geometry for tile_size, reusing this one if unchanged"""
+        if tile_size == self.tile_size:
+            return self
+        return BoardGeometry(self.grid_size, tile_size)
+
+    def index_at(self, row, col):
+        if 0 <= row < self.grid_size and 0 <= col < self.grid_size:
+            idx = self.grid[row * self.grid_size + col]
+            if idx >= 0:
+                return idx
+        return None
+
+    def tile_at(self, x, y):
+        """Tile index under a pixel, or None"""
+        if self.tile_size <= 0 or x < 0 or y < 0:
+            return None
+        return self.index_at(y // self.tile_size, x // self.tile_size)
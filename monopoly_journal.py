@@ -0,0 +1,349 @@
+"""Append-only binary journal of a game, for saving and resuming.
+
+Every state change is appended to the log as one record: players added,
+turns (roll, move and score delta) and tile edits. Every snapshot_every
+records the whole state is written to a small snapshot file next to the
+log, together with the log offset it covers. Resuming maps the log into
+memory, loads the snapshot and replays only the records after it, so
+resume time does not grow with the length of the session.
+
+When the game draws from its own random.Random, snapshots also hold the
+generator state. Game.step makes one draw per turn plus one for a
+re-roll, and each TURN record carries the re-roll flag and that extra
+draw count, so resume advances the restored generator by exactly the
+draws of the replayed turns and the resumed game rolls exactly what the
+original would have.
+
+The log starts with LOG_MAGIC and a header holding the game's seed and
+re-roll allowance, so a resumed game keeps its original seed; the
+front-ends show it and name the archive of a finished game after it
+(see GameJournal.finish). Player records hold the re-rolls each player
+has left and, for computer players, the name of their policy in
+monopoly_bots.POLICIES, which resume builds anew.
+
+Record layout: type (uint8), payload length (uint16), payload. Strings
+are a uint16 length followed by UTF-8 bytes. A torn record at the end of
+the log, e.g. after a crash, is ignored and overwritten on resume.
+"""
+import mmap
+import os
+import random
+import struct
+
+from monopoly_bots import POLICIES
+from monopoly_engine import Game
+
+LOG_MAGIC = b"MGJ3"
+SNAPSHOT_MAGIC = b"MGS2"
+
+PLAYER, TURN, TILE, STATE, RNG = 1, 2, 3, 4, 5
+EVENTS = ("wait", "started", "moved")
+
+# Saves are kept next to the game scripts, wherever the game is started from
+SAVE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Whether the seed is known, the seed and the re-rolls each player starts with
+HEADER = struct.Struct("<?qH")
+RECORD = struct.Struct("<BH")
+PLAYER_FIELDS = struct.Struct("<qbH")
+TURN_FIELDS = struct.Struct("<BBBBq?B")
+TILE_FIELDS = struct.Struct("<Hq")
+STATE_FIELDS = struct.Struct("<BQQ")
+# Mersenne Twister state: version, 625 words, whether gauss_next is set, gauss_next
+RNG_FIELDS = struct.Struct("<B625I?d")
+STRING = struct.Struct("<H")
+OFFSET = struct.Struct("<Q")
+
+
+def save_path(name):
+    """Where a front-end keeps its journal called name"""
+    return os.path.join(SAVE_DIR, name)
+
+
+def _pack_strings(*values):
+    parts = []
+    for value in values:
+        data = str(value).encode()
+        parts.append(STRING.pack(len(data)) + data)
+    return b"".join(parts)
+
+
+def _unpack_strings(buf, offset, count):
+    values = []
+    for _ in range(count):
+        (size,) = STRING.unpack_from(buf, offset)
+        offset += STRING.size
+        values.append(bytes(buf[offset:offset+size]).decode())
+        offset += size
+    return values
+
+
+def _record(kind, payload):
+    return RECORD.pack(kind, len(payload)) + payload
+
+
+def player_record(player, policy=None):
+    position = player['position'] if player['started'] else -1
+    kind = next((name for name, cls in POLICIES.items() if isinstance(policy, cls)), "")
+    return _record(PLAYER, PLAYER_FIELDS.pack(player['score'], position, player['rerolls']) +
+                   _pack_strings(player['name'], player['color'], kind))
+
+
+def turn_record(turn):
+    # A re-roll throws the first roll away, which costs one more draw
+    extra_draws = 1 if turn['rerolled'] else 0
+    return _record(TURN, TURN_FIELDS.pack(turn['seat'], turn['roll'], EVENTS.index(turn['event']),
+                                          turn['position'], turn['value'], turn['rerolled'],
+                                          extra_draws))
+
+
+def tile_record(idx, tile):
+    return _record(TILE, TILE_FIELDS.pack(idx, tile.get('value', 0)) +
+                   _pack_strings(tile.get('text', ""), tile.get('color', ""),
+                                 tile.get('hyperlink', "")))
+
+
+def state_record(game):
+    visited = 0
+    for idx in game.visited:
+        visited |= 1 << idx
+    return _record(STATE, STATE_FIELDS.pack(game.current_player, game.turns, visited))
+
+
+def rng_record(rng):
+    version, words, gauss_next = rng.getstate()
+    return _record(RNG, RNG_FIELDS.pack(version, *words, gauss_next is not None, gauss_next or 0.0))
+
+
+def read_header(buf):
+    """The seed at the start of a log (or None), the re-roll allowance and
+    the offset of the first record"""
+    has_seed, seed, rerolls = HEADER.unpack_from(buf, len(LOG_MAGIC))
+    return (seed if has_seed else None), rerolls, len(LOG_MAGIC) + HEADER.size
+
+
+def apply_records(game, buf, offset, end):
+    """Replay the records in buf[offset:end] onto game, return the offset
+    after the last complete record"""
+    while offset + RECORD.size <= end:
+        kind, size = RECORD.unpack_from(buf, offset)
+        start = offset + RECORD.size
+        if start + size > end:
+            break
+        if kind == PLAYER:
+            score, position, rerolls = PLAYER_FIELDS.unpack_from(buf, start)
+            name, color, policy = _unpack_strings(buf, start + PLAYER_FIELDS.size, 3)
+            player = game.add_player(name, score, color, POLICIES[policy]() if policy else None)
+            player['rerolls'] = rerolls
+            if position >= 0:
+                player.update(position=position, started=True)
+        elif kind == TURN:
+            seat, _, event, position, value, rerolled, extra_draws = TURN_FIELDS.unpack_from(buf, start)
+            player = game.players[seat]
+            if rerolled:
+                player['rerolls'] -= 1
+            if isinstance(game.rng, random.Random):
+                for _ in range(1 + extra_draws):
+                    game.rng.random()
+            if EVENTS[event] == "started":
+                player['started'] = True
+                game.visited.update([0, 1])
+            elif EVENTS[event] == "moved":
+                game.visited.add(position)
+                player['score'] += value
+            player['position'] = position
+            game.turns += 1
+            if not game.is_over():
+                game.current_player = (seat + 1) % len(game.players)
+        elif kind == TILE:
+            idx, value = TILE_FIELDS.unpack_from(buf, start)
+            text, color, hyperlink = _unpack_strings(buf, start + TILE_FIELDS.size, 3)
+            while len(game.tiles) <= idx:
+                game.tiles.append({})
+            game.tiles[idx].update(value=value, text=text, color=color,
+                                   hyperlink=hyperlink, position=idx)
+        elif kind == STATE:
+            game.current_player, game.turns, visited = STATE_FIELDS.unpack_from(buf, start)
+            game.visited = {idx for idx in range(visited.bit_length()) if visited >> idx & 1}
+        elif kind == RNG:
+            fields = RNG_FIELDS.unpack_from(buf, start)
+            game.rng = random.Random()
+            game.rng.setstate((fields[0], fields[1:626], fields[627] if fields[626] else None))
+        offset = start + size
+    return offset
+
+
+class GameJournal:
+    """Records the changes made to one Game into an append-only log
+
+    The journal sets itself as game.journal, after which Game reports
+    players, turns and tile edits to it. Use create for a new save and
+    resume to continue one.
+    """
+
+    def __init__(self, path, game, file, records=0, snapshot_every=1000, seed=None):
+        self.path = path
+        self.snapshot_path = path + ".snap"
+        self.game = game
+        self.seed = seed
+        self.file = file
+        self.records = records
+        self.snapshot_every = snapshot_every
+        game.journal = self
+
+    @classmethod
+    def create(cls, path, game, snapshot_every=1000, seed=None):
+        """Start a new log holding the current tiles and players
+
+        seed is the seed the game's generator was made from, if any.
+        """
+        file = open(path, "wb")
+        file.write(LOG_MAGIC + HEADER.pack(seed is not None, seed or 0, game.rerolls))
+        journal = cls(path, game, file, snapshot_every=snapshot_every, seed=seed)
+        for idx, tile in enumerate(game.tiles):
+            journal.append(tile_record(idx, tile))
+        for seat, player in enumerate(game.players):
+            journal.append(player_record(player, game.policies.get(seat)))
+        journal.snapshot()
+        return journal
+
+    def append(self, record):
+        self.file.write(record)
+        self.file.flush()
+        self.records += 1
+        if self.snapshot_every and self.records >= self.snapshot_every:
+            self.snapshot()
+
+    def player_added(self, player):
+        self.append(player_record(player, self.game.policies.get(len(self.game.players) - 1)))
+
+    def turn_played(self, turn):
+        self.append(turn_record(turn))
+
+    def tile_edited(self, idx):
+        self.append(tile_record(idx, self.game.tiles[idx]))
+
+    def snapshot(self):
+        """Write the full state and the log offset it covers"""
+        self.file.flush()
+        game = self.game
+        parts = [SNAPSHOT_MAGIC, OFFSET.pack(self.file.tell())]
+        parts.extend(tile_record(idx, tile) for idx, tile in enumerate(game.tiles))
+        parts.extend(player_record(player, game.policies.get(seat))
+                     for seat, player in enumerate(game.players))
+        parts.append(state_record(game))
+        if isinstance(game.rng, random.Random):
+            parts.append(rng_record(game.rng))
+        temp = self.snapshot_path + ".tmp"
+        with open(temp, "wb") as f:
+            f.write(b"".join(parts))
+        os.replace(temp, self.snapshot_path)
+        self.records = 0
+
+    def close(self):
+        if not self.file.closed:
+            self.file.close()
+        if self.game.journal is self:
+            self.game.journal = None
+
+    def finish(self):
+        """Close the log of a finished game and keep it as save-<seed>.journal
+
+        Only the snapshot is deleted and the log is renamed, so the game is
+        no longer offered for resuming but its recording stays next to the
+        save, e.g. for monopoly_replay. Returns the archived path.
+        """
+        self.close()
+        if os.path.exists(self.snapshot_path):
+            os.remove(self.snapshot_path)
+        name = "save" if self.seed is None else f"save-{self.seed}"
+        directory = os.path.dirname(self.path)
+        archive = os.path.join(directory, name + ".journal")
+        copies = 1
+        while os.path.exists(archive):
+            copies += 1
+            archive = os.path.join(directory, f"{name}-{copies}.journal")
+        os.replace(self.path, archive)
+        return archive
+
+    def discard(self):
+        """Close and delete the save, e.g. for a game nobody played"""
+        self.close()
+        for path in (self.path, self.snapshot_path):
+            if os.path.exists(path):
+                os.remove(path)
+
+
+def load_snapshot(path):
+    """Game from the snapshot next to the log and the log offset it covers,
+    or (None, None) if there is no usable snapshot"""
+    try:
+        with open(path + ".snap", "rb") as f:
+            data = f.read()
+    except FileNotFoundError:
+        return None, None
+    if not data.startswith(SNAPSHOT_MAGIC):
+        return None, None
+    (offset,) = OFFSET.unpack_from(data, len(SNAPSHOT_MAGIC))
+    game = Game([])
+    apply_records(game, data, len(SNAPSHOT_MAGIC) + OFFSET.size, len(data))
+    return game, offset
+
+
+def resume(path, snapshot_every=1000):
+    """Rebuild a saved game, return it with a journal appending to its log"""
+    with open(path, "rb") as f:
+        buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            if buf[:len(LOG_MAGIC)] != LOG_MAGIC or len(buf) < len(LOG_MAGIC) + HEADER.size:
+                raise ValueError(f"{path} is not a game journal")
+            seed, rerolls, start = read_header(buf)
+            game, offset = load_snapshot(path)
+            if game is None or not start <= offset <= len(buf):
+                game, offset = Game([]), start
+            game.rerolls = rerolls
+            end = apply_records(game, buf, offset, len(buf))
+        finally:
+            buf.close()
+
+    file = open(path, "r+b")
+    file.truncate(end)
+    file.seek(end)
+    return GameJournal(path, game, file, snapshot_every=snapshot_every, seed=seed).game
+
+
+if __name__ == "__main__":
+    import sys
+    import tempfile
+    import time
+
+    from monopoly_engine import create_random_tiles
+
+    # Resume time for growing sessions, with and without snapshots
+    directory = tempfile.mkdtemp()
+    for n_records in (10**4, 10**5, 10**6):
+        for snapshot_every in (1000, None):
+            path = os.path.join(directory, f"bench{n_records}.log")
+            rng = random.Random(0)
+            game = Game(create_random_tiles(rng), rng)
+            journal = GameJournal.create(path, game, snapshot_every=snapshot_every)
+            game.add_player("Player 1")
+            game.add_player("Player 2")
+            for i in range(n_records):
+                if i % 2 and not game.is_over():
+                    game.step()
+                else:
+                    idx = rng.randrange(len(game.tiles))
+                    game.edit_tile(idx, value=rng.randint(10, 200))
+            journal.close()
+
+            start = time.perf_counter()
+            resumed = resume(path)
+            elapsed = time.perf_counter() - start
+            resumed.journal.close()
+            assert [p['score'] for p in resumed.players] == [p['score'] for p in game.players]
+            assert resumed.tiles == game.tiles and resumed.visited == game.visited
+            label = f"every {snapshot_every}" if snapshot_every else "no snapshots"
+            print(f"{n_records} records, {label}: {os.path.getsize(path)} bytes, "
+                  f"resume {1000 * elapsed:.2f} ms")
+            sys.stdout.flush()
@@ -0,0 +1,198 @@
+"""Local load generator for monopoly_server.
+
+Opens a number of client connections, creates tables spread evenly over
+them and plays every table to the end with all tables live at once. Each
+client keeps one request in flight and cycles through its tables. Reports actions per second,
+round-trip latency and peak memory (client and server share the process
+unless --port points at a separate server).
+
+    python monopoly_loadgen.py --tables 2000 --clients 50
+
+Without --port an in-process server is started on a free port.
+
+With --spectators, one table is watched by that many spectator
+connections while a single player rolls it to the end as fast as the
+server answers, and the fan-out throughput is reported. The server then
+runs in a child process so each side has its own file descriptors.
+
+    python monopoly_loadgen.py --spectators 10000
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import resource
+import time
+
+from monopoly_server import GameServer, encode
+
+
+class Client:
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.next_id = 0
+        self.latencies = []
+
+    async def request(self, op, **fields):
+        self.next_id += 1
+        fields.update(op=op, id=self.next_id)
+        start = time.perf_counter()
+        self.writer.write(encode(fields))
+        while True:
+            reply = json.loads(await self.reader.readline())
+            if reply.get('id') == self.next_id:
+                break
+        self.latencies.append(time.perf_counter() - start)
+        if not reply['ok']:
+            raise RuntimeError(reply['error'])
+        return reply
+
+
+async def open_tables(host, port, n_tables, n_players, seed):
+    reader, writer = await asyncio.open_connection(host, port)
+    client = Client(reader, writer)
+    players = [f"Player {seat+1}" for seat in range(n_players)]
+    tables = []
+    for i in range(n_tables):
+        reply = await client.request("create", players=players, seed=seed + i)
+        tables.append(reply['table'])
+    client.latencies.clear()
+    return client, tables
+
+
+async def play_tables(client, tables):
+    while tables:
+        live = []
+        for table in tables:
+            reply = await client.request("roll", table=table)
+            if not reply['game_over']:
+                live.append(table)
+        tables = live
+    client.writer.close()
+    return client.latencies
+
+
+async def load_test(n_tables=2000, n_clients=50, n_players=2, host="127.0.0.1", port=None):
+    listener = None
+    if port is None:
+        listener = await GameServer(max_tables=n_tables).start(host, 0)
+        port = listener.sockets[0].getsockname()[1]
+
+    # Every table is created before the first roll so all of them are live at once
+    shares = [n_tables // n_clients + (i < n_tables % n_clients) for i in range(n_clients)]
+    opened = await asyncio.gather(*(open_tables(host, port, share, n_players, 1000003 * i)
+                                    for i, share in enumerate(shares)))
+    stats = await opened[0][0].request("stats")
+    start = time.perf_counter()
+    results = await asyncio.gather(*(play_tables(client, tables) for client, tables in opened))
+    elapsed = time.perf_counter() - start
+
+    if listener is not None:
+        listener.close()
+        await listener.wait_closed()
+    latencies = sorted(l for result in results for l in result)
+    actions = len(latencies)
+    return {
+        'tables': n_tables,
+        'clients': n_clients,
+        'live_tables': stats['tables'],
+        'actions': actions,
+        'actions_per_s': actions / elapsed,
+        'p50_ms': 1000 * latencies[actions // 2],
+        'p99_ms': 1000 * latencies[min(actions - 1, int(actions * 0.99))],
+        'max_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+
+
+async def watch(host, port, table, counts):
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write(encode({'op': "watch", 'table': table}))
+    lines = snapshots = 0
+    tail = b""
+    while True:
+        data = await reader.read(65536)
+        if not data:
+            break
+        lines += data.count(b"\n")
+        chunk = tail + data
+        snapshots += chunk.count(b'"event":"snapshot"')
+        if b'"game_over":true' in chunk:
+            break
+        tail = data[-32:]
+    writer.close()
+    # The watch reply is a snapshot too
+    counts.append((lines - 1, snapshots - 1))
+
+
+async def _serve_child(conn):
+    listener = await GameServer().start("127.0.0.1", 0)
+    conn.send(listener.sockets[0].getsockname()[1])
+    async with listener:
+        await listener.serve_forever()
+
+
+def _child_main(conn):
+    asyncio.run(_serve_child(conn))
+
+
+async def fan_out_test(n_spectators=10000, n_players=2, host="127.0.0.1", port=None, seed=0):
+    process = None
+    if port is None:
+        parent, child = multiprocessing.Pipe()
+        process = multiprocessing.Process(target=_child_main, args=(child,), daemon=True)
+        process.start()
+        port = parent.recv()
+    try:
+        reader, writer = await asyncio.open_connection(host, port)
+        player = Client(reader, writer)
+        players = [f"Player {seat+1}" for seat in range(n_players)]
+        table = (await player.request("create", players=players, seed=seed))['table']
+
+        counts = []
+        watchers = []
+        for i in range(n_spectators):
+            watchers.append(asyncio.create_task(watch(host, port, table, counts)))
+            if i % 500 == 499:
+                await asyncio.sleep(0)
+        while (await player.request("stats"))['spectators'] < n_spectators:
+            await asyncio.sleep(0.05)
+
+        player.latencies.clear()
+        start = time.perf_counter()
+        turns = 0
+        while not (await player.request("roll", table=table))['game_over']:
+            turns += 1
+        await asyncio.gather(*watchers)
+        elapsed = time.perf_counter() - start
+        writer.close()
+    finally:
+        if process is not None:
+            process.terminate()
+
+    deltas = sum(lines for lines, _ in counts)
+    latencies = sorted(player.latencies)
+    return {
+        'spectators': n_spectators,
+        'turns': turns + 1,
+        'deltas': deltas,
+        'resyncs': sum(snapshots for _, snapshots in counts),
+        'deltas_per_s': deltas / elapsed,
+        'roll_p50_ms': 1000 * latencies[len(latencies) // 2],
+        'roll_p99_ms': 1000 * latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))],
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tables", type=int, default=2000)
+    parser.add_argument("--clients", type=int, default=50)
+    parser.add_argument("--players", type=int, default=2)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int)
+    parser.add_argument("--spectators", type=int)
+    args = parser.parse_args()
+    if args.spectators:
+        print(asyncio.run(fan_out_test(args.spectators, args.players, args.host, args.port)))
+    else:
+        print(asyncio.run(load_test(args.tables, args.clients, args.players, args.host, args.port)))
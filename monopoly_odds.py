@@ -0,0 +1,251 @@
+"""Live win chances for the Tk front-ends, estimated off the UI thread.
+
+After every turn the front-end hands its Game to an OddsEstimator. The
+estimator reduces the game to a state key (tile values, positions,
+scores, visited tiles and the player to move) and looks it up in an LRU
+cache, so replaying or resuming a game reaches known states without
+recomputing them. Other states are sent to a worker process, which plays
+n_games random continuations with play_from and counts how often each
+player ends with the best score; a tied game counts as a shared win.
+
+Requests are numbered and at most one estimate is in flight. While the
+worker is busy, a new request only replaces the state waiting to be
+sent, and tells the worker to abandon its estimate between two chunks
+of games; the newest state goes out once the worker has answered. At
+full autoplay speed this keeps one job in the pipe however fast turns
+are played. Results come back on a queue that is polled with
+widget.after, so the Tk thread never waits for a simulation.
+
+Estimates assume every player keeps every roll; re-roll decisions of
+computer players are not simulated.
+
+    python monopoly_odds.py            # latency and cache behaviour
+"""
+import multiprocessing
+import queue
+import random
+from collections import OrderedDict
+
+from monopoly_engine import play_from
+
+
+def state_key(game):
+    """Everything about a game that its outcome depends on, as a hashable tuple"""
+    visited = 0
+    for idx in game.visited:
+        visited |= 1 << idx
+    return (tuple(tile['value'] for tile in game.tiles),
+            tuple(p['position'] if p['started'] else -1 for p in game.players),
+            tuple(p['score'] for p in game.players),
+            visited, game.current_player)
+
+
+def estimate(key, n_games, chunk_size=500, cancelled=None):
+    """Each player's chance of winning from a state key
+
+    Games are played in chunks of chunk_size; returns None if cancelled()
+    turns true between two chunks. The random games are seeded from the
+    key, so the same state always gets the same estimate.
+    """
+    values, positions, scores, visited, seat = key
+    rng = random.Random(repr(key))
+    wins = [0.0] * len(positions)
+    for start in range(0, n_games, chunk_size):
+        if cancelled and cancelled():
+            return None
+        for _ in range(min(chunk_size, n_games - start)):
+            final = play_from(values, positions, scores, visited, seat, rng)[1]
+            best = max(final)
+            winners = [player for player, score in enumerate(final) if score == best]
+            for player in winners:
+                wins[player] += 1 / len(winners)
+    return [w / n_games for w in wins]
+
+
+def _worker(jobs, results, latest, n_games):
+    while True:
+        job = jobs.get()
+        if job is None:
+            return
+        generation, key = job
+        # Every job is answered, with None if it was superseded
+        chances = None
+        if generation == latest.value:
+            chances = estimate(key, n_games, cancelled=lambda: latest.value != generation)
+        results.put((generation, key, chances))
+
+
+class OddsEstimator:
+    """Win chances of a running game, delivered to on_result(chances) on the Tk thread
+
+    chances is a list with one probability per player, in seat order.
+    The worker process is started on the first request that misses the
+    cache; call close to stop it.
+    """
+
+    def __init__(self, widget, on_result, n_games=2000, poll_ms=50, cache_size=4096):
+        self.widget = widget
+        self.on_result = on_result
+        self.n_games = n_games
+        self.poll_ms = poll_ms
+        self.cache_size = cache_size
+        self.cache = OrderedDict()
+        self.process = None
+        self.jobs = self.results = self.latest = None
+        self.generation = 0
+        self.wanted = None
+        self.in_flight = False
+        self.pending = None
+        self.requests = 0
+        self.hits = 0
+        self.sent = 0
+        self.computed = 0
+        self.cancelled = 0
+
+    def _start(self):
+        self.jobs = multiprocessing.Queue()
+        self.results = multiprocessing.Queue()
+        self.latest = multiprocessing.Value('q', 0, lock=False)
+        self.process = multiprocessing.Process(target=_worker, name="win-odds", daemon=True,
+                                               args=(self.jobs, self.results, self.latest, self.n_games))
+        self.process.start()
+
+    def request(self, game):
+        """Ask for the win chances of game as it stands; stale requests are dropped"""
+        if not game.players or game.is_over():
+            return
+        self.requests += 1
+        self.generation += 1
+        if self.latest is not None:
+            # Tells the worker to drop whatever it is working on
+            self.latest.value = self.generation
+        key = state_key(game)
+        self.wanted = key
+        if not self._answer_from_cache() and not self.in_flight:
+            self._send()
+
+    def _answer_from_cache(self):
+        chances = self.cache.get(self.wanted)
+        if chances is None:
+            return False
+        self.hits += 1
+        self.cache.move_to_end(self.wanted)
+        self.wanted = None
+        self.on_result(chances)
+        return True
+
+    def _send(self):
+        if self.process is None:
+            self._start()
+            self.latest.value = self.generation
+        self.in_flight = True
+        self.sent += 1
+        self.jobs.put((self.generation, self.wanted))
+        if self.pending is None:
+            self.pending = self.widget.after(self.poll_ms, self.poll)
+
+    def poll(self):
+        """Take finished estimates off the result queue"""
+        self.pending = None
+        while True:
+            try:
+                generation, key, chances = self.results.get_nowait()
+            except queue.Empty:
+                break
+            self.in_flight = False
+            if chances is None:
+                self.cancelled += 1
+                continue
+            self.computed += 1
+            # A superseded estimate is still right for its own state
+            self.cache[key] = chances
+            if len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+            if key == self.wanted:
+                self.wanted = None
+                self.on_result(chances)
+        if self.wanted is not None and not self.in_flight and not self._answer_from_cache():
+            self._send()
+        elif self.in_flight:
+            self.pending = self.widget.after(self.poll_ms, self.poll)
+
+    def close(self, timeout=0.5):
+        """Stop polling and the worker process, e.g. when the window closes
+
+        A running estimate is cancelled at its next chunk; a worker that
+        has not exited after timeout seconds is terminated.
+        """
+        if self.pending is not None:
+            self.widget.after_cancel(self.pending)
+            self.pending = None
+        if self.process is not None:
+            self.generation += 1
+            self.latest.value = self.generation
+            self.jobs.put(None)
+            self.process.join(timeout)
+            if self.process.is_alive():
+                self.process.terminate()
+                self.process.join()
+            self.process = None
+
+    def stats(self):
+        return {'requests': self.requests, 'cache_hits': self.hits, 'sent': self.sent,
+                'computed': self.computed, 'cancelled': self.cancelled, 'cached': len(self.cache)}
+
+
+def latency_benchmark(n_players=2, n_games=2000, seed=0, turn_interval=0.25):
+    """Play a seeded game twice through an estimator, without a display
+
+    A turn is played every turn_interval seconds, so estimates that take
+    longer are superseded. The second pass replays the same states, which
+    are answered from the cache unless their first estimate was
+    cancelled. Reports the time request() takes on the calling thread
+    and, per pass, how many turns got an answer and how quickly.
+    """
+    import time
+
+    from monopoly_engine import Game, create_random_tiles
+
+    class Widget:
+        def after(self, ms, callback):
+            return callback
+
+        def after_cancel(self, callback):
+            pass
+
+    answered = []
+    estimator = OddsEstimator(Widget(), lambda chances: answered.append(time.perf_counter()), n_games)
+    calls = []
+    passes = []
+    try:
+        for replay in (False, True):
+            latencies = []
+            rng = random.Random(seed)
+            game = Game(create_random_tiles(rng), rng)
+            for seat in range(n_players):
+                game.add_player(f"Player {seat+1}")
+            while not game.is_over():
+                start = time.perf_counter()
+                estimator.request(game)
+                calls.append(time.perf_counter() - start)
+                deadline = start + turn_interval
+                while estimator.wanted is not None and time.perf_counter() < deadline:
+                    time.sleep(0.005)
+                    estimator.poll()
+                if answered and answered[-1] >= start:
+                    latencies.append(answered[-1] - start)
+                time.sleep(max(0.0, deadline - time.perf_counter()))
+                game.step()
+            latencies.sort()
+            passes.append({'answered': len(latencies),
+                           'answer_p50_ms': 1000 * latencies[len(latencies) // 2] if latencies else None,
+                           'answer_max_ms': 1000 * latencies[-1] if latencies else None})
+    finally:
+        estimator.close()
+    calls.sort()
+    return {'turns': game.turns, 'first_pass': passes[0], 'replay': passes[1],
+            'request_p99_ms': 1000 * calls[int(len(calls) * 0.99)], 'estimator': estimator.stats()}
+
+
+if __name__ == "__main__":
+    print(latency_benchmark())
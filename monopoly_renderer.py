@@ -0,0 +1,417 @@
+"""Retained-mode board renderer for the Tk front-ends.
+
+Tile items are created once and tagged by tile index. A resize only moves
+them and rescales their fonts, a roll only moves the token that changed,
+and a tile edit only reconfigures that tile's items. Label fonts and line
+breaks come from a TextLayoutCache, so Tk never wraps text itself and a
+resize to a size seen before measures nothing.
+
+ResizeScheduler coalesces <Configure> events into at most one layout pass
+per frame and stretches the existing items with canvas.scale in between.
+TokenAnimator walks tokens tile by tile to their new position.
+"""
+import time
+from collections import deque
+
+from monopoly_geometry import BoardGeometry
+from monopoly_textlayout import MIN_FONT_SIZE, TextLayoutCache
+
+# Tile size the label offsets and font sizes were designed for
+REFERENCE_TILE_SIZE = 100
+FONT_FAMILY = "Arial"
+
+
+class BoardRenderer:
+    """Keeps one set of canvas items per tile and per player token
+
+    labels is a list of dicts describing the text drawn on every tile:
+    'key', 'dy' (offset from the tile centre), 'size' (font size),
+    'fill' and 'text' (a function of the tile index). Labels are shrunk
+    to fit the tile width; a label with 'wrap' set may also wrap onto
+    'lines' lines (default 3). on_label is called once for every label
+    item created, e.g. to bind events to it.
+    """
+
+    def __init__(self, canvas, labels, tile_fill, grid_size=7, on_label=None, text_layout=None):
+        self.canvas = canvas
+        self.labels = labels
+        self.tile_fill = tile_fill
+        self.on_label = on_label
+        self.text_layout = text_layout or TextLayoutCache()
+        self.geometry = BoardGeometry(grid_size)
+        self.tile_size = None
+        self.stale = False
+        self.tile_items = []
+        self.tokens = {}
+
+        # Item counts for the most recent frame and in total
+        self.frame_stats = {'created': 0, 'updated': 0}
+        self.totals = {'created': 0, 'updated': 0, 'frames': 0}
+
+    def begin_frame(self):
+        self.frame_stats = {'created': 0, 'updated': 0}
+        self.totals['frames'] += 1
+
+    def _count(self, kind, n=1):
+        self.frame_stats[kind] += n
+        self.totals[kind] += n
+
+    def _scaled(self, value):
+        return round(value * self.tile_size / REFERENCE_TILE_SIZE)
+
+    def _label(self, label, idx):
+        """Font and line-broken text of one label on tile idx"""
+        max_lines = label.get('lines', 3) if label.get('wrap') else 1
+        size, text = self.text_layout.fit(label['text'](idx), FONT_FAMILY,
+                                          max(MIN_FONT_SIZE, self._scaled(label['size'])),
+                                          self.tile_size-10, max_lines)
+        return (FONT_FAMILY, size), text
+
+    def layout(self, tile_size, players=()):
+        """Create the tile items, or move and rescale them for a new size"""
+        self.begin_frame()
+        if tile_size != self.tile_size or self.stale:
+            self.tile_size = tile_size
+            self.geometry = self.geometry.resized(tile_size)
+            self.stale = False
+            if not self.tile_items:
+                self._create_tiles()
+            else:
+                self._move_tiles()
+            for seat in list(self.tokens):
+                self._place_token(seat, *self.tokens[seat][1:])
+        for seat, player in enumerate(players):
+            if player['started'] and seat not in self.tokens:
+                self._place_token(seat, player['position'], player['color'])
+        return self.frame_stats
+
+    def preview_scale(self, factor):
+        """Stretch the existing items until the next layout pass"""
+        if self.tile_items:
+            self.canvas.scale("all", 0, 0, factor, factor)
+            self.stale = True
+
+    def _create_tiles(self):
+        geometry = self.geometry
+        for idx in range(len(geometry)):
+            x, y = geometry.centers[idx]
+            tag = f"tile{idx}"
+            rect = self.canvas.create_rectangle(*geometry.rects[idx],
+                                                fill=self.tile_fill(idx), outline="black",
+                                                tags=("tile", tag))
+            texts = []
+            for label in self.labels:
+                font, text = self._label(label, idx)
+                item = self.canvas.create_text(x, y + self._scaled(label['dy']),
+                                               text=text, font=font, fill=label['fill'],
+                                               tags=("tile", tag, label['key']))
+                texts.append(item)
+                if self.on_label:
+                    self.on_label(idx, label['key'], item)
+            self.tile_items.append((rect, texts))
+            self._count('created', 1 + len(texts))
+
+    def _move_tiles(self):
+        geometry = self.geometry
+        for idx, (rect, texts) in enumerate(self.tile_items):
+            x, y = geometry.centers[idx]
+            self.canvas.coords(rect, *geometry.rects[idx])
+            for label, item in zip(self.labels, texts):
+                font, text = self._label(label, idx)
+                self.canvas.coords(item, x, y + self._scaled(label['dy']))
+                self.canvas.itemconfigure(item, font=font, text=text)
+            self._count('updated', 1 + len(texts))
+
+    def update_tile(self, idx):
+        """Refresh the fill and text of one tile after it was edited"""
+        self.begin_frame()
+        if idx >= len(self.tile_items):
+            return self.frame_stats
+        rect, texts = self.tile_items[idx]
+        self.canvas.itemconfigure(rect, fill=self.tile_fill(idx))
+        for label, item in zip(self.labels, texts):
+            font, text = self._label(label, idx)
+            self.canvas.itemconfigure(item, font=font, text=text)
+        self._count('updated', 1 + len(texts))
+        return self.frame_stats
+
+    def move_token(self, seat, player):
+        """Place or move a single player's token"""
+        self.begin_frame()
+        if player['started'] and self.tile_size:
+            self._place_token(seat, player['position'], player['color'])
+        return self.frame_stats
+
+    def remove_token(self, seat):
+        """Delete a player's token, e.g. when a replay seeks back before its start"""
+        token = self.tokens.pop(seat, None)
+        if token is not None:
+            self.canvas.delete(token[0])
+
+    def token_box(self, x, y):
+        """Oval coordinates of a token centred on (x, y)"""
+        r = max(4, self._scaled(10))
+        return x-r, y-r, x+r, y+r
+
+    def _place_token(self, seat, position, color):
+        box = self.token_box(*self.geometry.centers[position])
+        token = self.tokens.get(seat)
+        if token is None:
+            item = self.canvas.create_oval(*box, fill=color, outline="black",
+                                           tags=("token", f"player{seat}"))
+            self._count('created')
+        else:
+            item = token[0]
+            self.canvas.coords(item, *box)
+            self._count('updated')
+        self.tokens[seat] = (item, position, color)
+
+
+class ResizeScheduler:
+    """Coalesces resize events into one layout pass per frame
+
+    Every <Configure> event only scales the current items through preview;
+    layout runs from widget.after once per frame_budget seconds at most.
+    Resize-to-paint latency is measured from the first event of a burst
+    until Tk is idle again after the layout pass.
+    """
+
+    def __init__(self, widget, layout, preview=None, frame_budget=1/60, samples=1000):
+        self.widget = widget
+        self.layout = layout
+        self.preview = preview
+        self.frame_budget = frame_budget
+        self.size = None
+        self.pending = None
+        self.first_event = None
+        self.last_layout = 0.0
+        self.events = 0
+        self.layouts = 0
+        self.latencies = deque(maxlen=samples)
+
+    def on_configure(self, event):
+        self.events += 1
+        now = time.perf_counter()
+        if self.first_event is None:
+            self.first_event = now
+
+        old_size, self.size = self.size, (event.width, event.height)
+        if self.preview and old_size and min(old_size) > 0:
+            self.preview(min(self.size) / min(old_size))
+
+        if self.pending is None:
+            wait = self.last_layout + self.frame_budget - now
+            self.pending = self.widget.after(max(1, int(wait * 1000)), self._flush)
+
+    def _flush(self):
+        self.pending = None
+        self.last_layout = time.perf_counter()
+        self.layouts += 1
+        self.layout()
+        started, self.first_event = self.first_event, None
+        if started is not None:
+            self.widget.after_idle(self._painted, started)
+
+    def _painted(self, started):
+        self.latencies.append(time.perf_counter() - started)
+
+    def stats(self):
+        """Event and layout counts with mean and p99 latency in ms"""
+        samples = sorted(self.latencies)
+        if not samples:
+            return {'events': self.events, 'layouts': self.layouts,
+                    'mean_ms': 0.0, 'p99_ms': 0.0}
+        p99 = samples[min(len(samples) - 1, int(len(samples) * 0.99))]
+        return {
+            'events': self.events,
+            'layouts': self.layouts,
+            'mean_ms': 1000 * sum(samples) / len(samples),
+            'p99_ms': 1000 * p99,
+        }
+
+
+class TokenAnimator:
+    """Moves tokens tile by tile along the perimeter at a fixed frame rate
+
+    move() records the new position with the renderer at once, so a layout
+    pass always puts tokens where the game has them, and then animates the
+    token's oval from where it was. Any number of tokens animate together
+    from one widget.after loop. Token positions are a function of time,
+    so when a frame is late the loop skips the frames it missed and counts
+    them as dropped instead of queueing them. A move never takes longer
+    than max_duration seconds, so fast auto-play does not build a backlog.
+    """
+
+    def __init__(self, renderer, widget, fps=60, tile_time=0.08, max_duration=0.5, samples=1000):
+        self.renderer = renderer
+        self.widget = widget
+        self.interval = 1 / fps
+        self.tile_time = tile_time
+        self.max_duration = max_duration
+        # seat -> {'path': positions, 'start': time, 'step': seconds per tile}
+        self.animations = {}
+        self.pending = None
+        self.deadline = 0.0
+        self.last_frame = None
+        self.frames = 0
+        self.dropped = 0
+        self.frame_times = deque(maxlen=samples)
+        self.work_times = deque(maxlen=samples)
+
+    @property
+    def running(self):
+        return self.pending is not None
+
+    def _position(self, animation, now):
+        """Index along the path reached at time now, as a float"""
+        return min(len(animation['path']) - 1, (now - animation['start']) / animation['step'])
+
+    def move(self, seat, player):
+        """Animate a player's token to its current position"""
+        renderer = self.renderer
+        token = renderer.tokens.get(seat)
+        if token is None or not player['started'] or not renderer.tile_size:
+            return renderer.move_token(seat, player)
+
+        now = time.perf_counter()
+        n_tiles = len(renderer.geometry)
+        animation = self.animations.get(seat)
+        if animation is None:
+            path, start = [token[1]], now
+        else:
+            # Continue from wherever the token is in its current animation
+            done = self._position(animation, now)
+            path = animation['path'][int(done):]
+            start = now - (done - int(done)) * animation['step']
+        target = player['position']
+        while path[-1] != target:
+            path.append((path[-1] + 1) % n_tiles)
+
+        renderer.tokens[seat] = (token[0], target, player['color'])
+        if len(path) == 1:
+            self.animations.pop(seat, None)
+            return renderer.move_token(seat, player)
+        step = min(self.tile_time, self.max_duration / (len(path) - 1))
+        self.animations[seat] = {'path': path, 'start': start, 'step': step}
+        if self.pending is None:
+            self.deadline = now
+            self.last_frame = None
+            self.pending = self.widget.after(1, self._frame)
+        return renderer.frame_stats
+
+    def clear(self):
+        """Stop all animations, e.g. before the renderer is replaced"""
+        self.animations.clear()
+        if self.pending is not None:
+            self.widget.after_cancel(self.pending)
+            self.pending = None
+
+    def _frame(self):
+        now = time.perf_counter()
+        if self.last_frame is not None:
+            self.frame_times.append(now - self.last_frame)
+        self.last_frame = now
+        self.frames += 1
+
+        renderer = self.renderer
+        centers = renderer.geometry.centers
+        for seat, animation in list(self.animations.items()):
+            done = self._position(animation, now)
+            path = animation['path']
+            k = int(done)
+            if k >= len(path) - 1:
+                x, y = centers[path[-1]]
+                del self.animations[seat]
+            else:
+                (x0, y0), (x1, y1) = centers[path[k]], centers[path[k + 1]]
+                t = done - k
+                x, y = x0 + (x1 - x0) * t, y0 + (y1 - y0) * t
+            token = renderer.tokens.get(seat)
+            if token is not None:
+                renderer.canvas.coords(token[0], *renderer.token_box(x, y))
+        self.work_times.append(time.perf_counter() - now)
+
+        if not self.animations:
+            self.pending = None
+            return
+        # Next frame on the frame grid; frames whose slot already passed are dropped
+        self.deadline += self.interval
+        after = time.perf_counter()
+        if after > self.deadline:
+            missed = int((after - self.deadline) / self.interval) + 1
+            self.dropped += missed
+            self.deadline += missed * self.interval
+        self.pending = self.widget.after(max(1, round(1000 * (self.deadline - after))), self._frame)
+
+    def stats(self):
+        """Frame counts with mean and p99 frame interval and work time in ms"""
+        intervals = sorted(self.frame_times)
+        work = sorted(self.work_times)
+        result = {'frames': self.frames, 'dropped': self.dropped,
+                  'mean_ms': 0.0, 'p99_ms': 0.0, 'fps': 0.0, 'work_ms': 0.0}
+        if intervals:
+            mean = sum(intervals) / len(intervals)
+            result.update(mean_ms=1000 * mean, fps=1 / mean if mean else 0.0,
+                          p99_ms=1000 * intervals[min(len(intervals) - 1, int(len(intervals) * 0.99))])
+        if work:
+            result['work_ms'] = 1000 * sum(work) / len(work)
+        return result
+
+
+def animation_benchmark(root, n_tokens=4, moves=100, load_ms=0):
+    """Frame statistics of n_tokens tokens animating at once on a 7x7 board
+
+    load_ms of busy work every 10 ms stands in for a loaded event loop.
+    Needs a display.
+    """
+    import random
+    import tkinter as tk
+
+    rng = random.Random(0)
+    canvas = tk.Canvas(root, width=700, height=700)
+    canvas.pack()
+    renderer = BoardRenderer(canvas, [], lambda idx: "#DDDDDD")
+    players = [{'position': 0, 'started': True, 'color': color}
+               for color in ("red", "green", "blue", "yellow")[:n_tokens]]
+    renderer.layout(100, players)
+    animator = TokenAnimator(renderer, root)
+    left = [moves]
+
+    def next_moves():
+        if animator.animations:
+            root.after(10, next_moves)
+            return
+        if left[0] == 0:
+            root.quit()
+            return
+        left[0] -= 1
+        for seat, player in enumerate(players):
+            player['position'] = (player['position'] + rng.randint(1, 6)) % len(renderer.geometry)
+            animator.move(seat, player)
+        root.after(10, next_moves)
+
+    def busy():
+        end = time.perf_counter() + load_ms / 1000
+        while time.perf_counter() < end:
+            pass
+        if left[0]:
+            root.after(10, busy)
+
+    next_moves()
+    if load_ms:
+        busy()
+    root.mainloop()
+    canvas.destroy()
+    return animator.stats()
+
+
+if __name__ == "__main__":
+    try:
+        import tkinter as tk
+        root = tk.Tk()
+    except Exception as e:
+        print(f"No display ({e})")
+    else:
+        print("idle:", animation_benchmark(root))
+        print("loaded:", animation_benchmark(root, load_ms=12))
+        root.destroy()
@@ -0,0 +1,262 @@
+"""Replay of a journaled game with fast seeking.
+
+Replay indexes every record of a monopoly_journal log once and keeps a
+checkpoint of the full game state every checkpoint_every records. Seeking
+restores the nearest checkpoint at or before the target and applies at
+most checkpoint_every records, so it costs the same anywhere in the log.
+
+Positions are record numbers: a step is one player added, one turn or one
+tile edit. seek_turn maps a turn number to its record.
+
+    python monopoly_replay.py monopoly_sp.journal
+    python monopoly_replay.py --bench
+"""
+import mmap
+from array import array
+
+from monopoly_engine import Game
+from monopoly_journal import HEADER, LOG_MAGIC, RECORD, TURN, apply_records, read_header
+
+
+class Replay:
+    """Seekable view of a journal log"""
+
+    def __init__(self, path, checkpoint_every=500):
+        self.path = path
+        self.checkpoint_every = checkpoint_every
+        with open(path, "rb") as f:
+            self.buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self.buf[:len(LOG_MAGIC)] != LOG_MAGIC or len(self.buf) < len(LOG_MAGIC) + HEADER.size:
+            self.buf.close()
+            raise ValueError(f"{path} is not a game journal")
+
+        # Start offset of every record, plus the end of the last one
+        self.offsets = array('Q')
+        # Record number of every turn
+        self.turn_steps = array('Q')
+        offset, end = read_header(self.buf)[2], len(self.buf)
+        while offset + RECORD.size <= end:
+            kind, size = RECORD.unpack_from(self.buf, offset)
+            if offset + RECORD.size + size > end:
+                break
+            if kind == TURN:
+                self.turn_steps.append(len(self.offsets))
+            self.offsets.append(offset)
+            offset += RECORD.size + size
+        self.offsets.append(offset)
+
+        self.game = Game([])
+        self.position = 0
+        self.checkpoints = [self._capture()]
+        for step in range(checkpoint_every, len(self), checkpoint_every):
+            self._apply(step)
+            self.checkpoints.append(self._capture())
+        self.seek(0)
+
+    def __len__(self):
+        """Number of steps in the log"""
+        return len(self.offsets) - 1
+
+    @property
+    def turns(self):
+        return len(self.turn_steps)
+
+    def _capture(self):
+        game = self.game
+        return ([dict(tile) for tile in game.tiles], [dict(player) for player in game.players],
+                game.current_player, game.turns, frozenset(game.visited))
+
+    def _restore(self, checkpoint):
+        tiles, players, current_player, turns, visited = checkpoint
+        game = Game([dict(tile) for tile in tiles])
+        game.players = [dict(player) for player in players]
+        game.current_player = current_player
+        game.turns = turns
+        game.visited = set(visited)
+        self.game = game
+
+    def _apply(self, step):
+        """Apply records from the current position up to step"""
+        apply_records(self.game, self.buf, self.offsets[self.position], self.offsets[step])
+        self.position = step
+
+    def seek(self, step):
+        """Move to the state after the first step records"""
+        step = max(0, min(step, len(self)))
+        if not self.position <= step < self.position + self.checkpoint_every:
+            index = step // self.checkpoint_every
+            self._restore(self.checkpoints[index])
+            self.position = index * self.checkpoint_every
+        self._apply(step)
+        return self.game
+
+    def seek_turn(self, turn):
+        """Move to the state right after the given turn (1-based, 0 = before any turn)"""
+        if turn <= 0:
+            return self.seek(self.turn_steps[0] if self.turn_steps else len(self))
+        return self.seek(self.turn_steps[min(turn, self.turns) - 1] + 1)
+
+    def step_forward(self):
+        """Apply one more record, return False at the end of the log"""
+        if self.position >= len(self):
+            return False
+        self._apply(self.position + 1)
+        return self.position < len(self)
+
+    def close(self):
+        self.buf.close()
+
+
+class ReplayViewer:
+    """Tk window playing a Replay back at any speed with a seek bar"""
+
+    def __init__(self, root, replay):
+        import tkinter as tk
+
+        from monopoly_renderer import BoardRenderer
+        from monopoly_widgets import AutoPlayer
+
+        self.root = root
+        self.replay = replay
+        self.root.title(f"Monopoly Replay - {replay.path}")
+        self.root.geometry("900x800")
+        self.root.configure(bg="#2E2E2E")
+
+        self.canvas = tk.Canvas(self.root, bg="white", highlightthickness=0)
+        self.canvas.pack(fill=tk.BOTH, expand=True, padx=20, pady=20)
+        self.renderer = BoardRenderer(self.canvas, [
+            {'key': "text", 'dy': -20, 'size': 10, 'fill': "black", 'wrap': True,
+             'text': lambda idx: self.replay.game.tiles[idx].get('text', "")},
+            {'key': "value", 'dy': 20, 'size': 10, 'fill': "black",
+             'text': lambda idx: f"Value: {self.replay.game.tiles[idx].get('value', 0)}"},
+        ], tile_fill=lambda idx: self.replay.game.tiles[idx].get('color') or "#DDDDDD")
+
+        controls = tk.Frame(self.root, bg="#3E3E3E")
+        controls.pack(fill=tk.X)
+        self.play_btn = tk.Button(controls, text="Play", command=self.toggle_play,
+                                  font=("Arial", 12), bg="#4CAF50", fg="white", width=8)
+        self.play_btn.pack(side=tk.LEFT, padx=10, pady=10)
+        self.speed_scale = tk.Scale(controls, from_=0, to=200, orient=tk.HORIZONTAL,
+                                    label="Steps/s (0 = max)", bg="#3E3E3E", fg="white",
+                                    highlightthickness=0, command=self.set_speed)
+        self.speed_scale.set(10)
+        self.speed_scale.pack(side=tk.LEFT, padx=10)
+        self.seek_scale = tk.Scale(controls, from_=0, to=len(replay), orient=tk.HORIZONTAL,
+                                   label="Step", bg="#3E3E3E", fg="white",
+                                   highlightthickness=0, showvalue=False, command=self.on_seek)
+        self.seek_scale.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=10)
+        self.status_label = tk.Label(controls, font=("Arial", 12), bg="#3E3E3E", fg="white",
+                                     justify=tk.LEFT)
+        self.status_label.pack(side=tk.LEFT, padx=10)
+
+        self.autoplay = AutoPlayer(self.root, self.play_step)
+        replay.seek_turn(0)
+        self.seek_scale.set(replay.position)
+        self.canvas.bind("<Configure>", lambda event: self.redraw())
+
+    def redraw(self):
+        w = self.canvas.winfo_width()
+        h = self.canvas.winfo_height()
+        game = self.replay.game
+        # The first records of a log add the tiles one by one
+        if len(game.tiles) >= len(self.renderer.geometry):
+            self.renderer.layout(min(w//7, h//7))
+        for idx in range(min(len(game.tiles), len(self.renderer.tile_items))):
+            self.renderer.update_tile(idx)
+        for seat, player in enumerate(game.players):
+            if player['started']:
+                self.renderer.move_token(seat, player)
+            else:
+                self.renderer.remove_token(seat)
+        for seat in [seat for seat in self.renderer.tokens if seat >= len(game.players)]:
+            self.renderer.remove_token(seat)
+        scores = ", ".join(f"{p['name']}: {p['score']}" for p in game.players)
+        self.status_label.config(text=f"Turn {game.turns}/{self.replay.turns}\n{scores}")
+
+    def play_step(self):
+        playing = self.replay.step_forward()
+        self.seek_scale.set(self.replay.position)
+        self.redraw()
+        if not playing:
+            self.autoplay.stop()
+            self.play_btn.config(text="Play")
+        return playing
+
+    def toggle_play(self):
+        if self.replay.position >= len(self.replay):
+            self.replay.seek(0)
+        self.autoplay.toggle(self.speed_scale.get())
+        self.play_btn.config(text="Pause" if self.autoplay.running else "Play")
+
+    def set_speed(self, value):
+        self.autoplay.rate = int(value)
+
+    def on_seek(self, value):
+        if int(value) != self.replay.position:
+            self.replay.seek(int(value))
+            self.redraw()
+
+
+def seek_benchmark(n_steps=100000, checkpoint_every=500, n_seeks=1000, seed=0):
+    """Record an n_steps session and time random seeks in its replay
+
+    A 24-tile game is over after a few hundred turns, so most steps of a
+    long session are tile edits made between turns, as in the edit panel.
+    """
+    import os
+    import random
+    import tempfile
+    import time
+
+    from monopoly_engine import create_random_tiles
+    from monopoly_journal import GameJournal
+
+    path = os.path.join(tempfile.mkdtemp(), "session.journal")
+    rng = random.Random(seed)
+    game = Game(create_random_tiles(rng), rng)
+    journal = GameJournal.create(path, game, snapshot_every=None)
+    game.add_player("Player 1")
+    game.add_player("Player 2")
+    for i in range(n_steps - 2):
+        if i % 200 == 0 and not game.is_over():
+            game.step()
+        else:
+            game.edit_tile(rng.randrange(len(game.tiles)), value=rng.randint(10, 200))
+    journal.close()
+
+    start = time.perf_counter()
+    replay = Replay(path, checkpoint_every)
+    index_ms = 1000 * (time.perf_counter() - start)
+
+    times = []
+    for _ in range(n_seeks):
+        step = rng.randrange(len(replay) + 1)
+        start = time.perf_counter()
+        replay.seek(step)
+        times.append(time.perf_counter() - start)
+    assert [p['score'] for p in replay.seek(len(replay)).players] == \
+        [p['score'] for p in game.players]
+
+    start = time.perf_counter()
+    apply_records(Game([]), replay.buf, replay.offsets[0], replay.offsets[-1])
+    full_ms = 1000 * (time.perf_counter() - start)
+    replay.close()
+    os.remove(path)
+    os.remove(path + ".snap")
+    times.sort()
+    return {'steps': n_steps, 'turns': replay.turns, 'index_ms': index_ms,
+            'seek_mean_ms': 1000 * sum(times) / len(times),
+            'seek_max_ms': 1000 * times[-1], 'replay_from_start_ms': full_ms}
+
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) < 2 or sys.argv[1] == "--bench":
+        print(seek_benchmark())
+    else:
+        import tkinter as tk
+
+        root = tk.Tk()
+        viewer = ReplayViewer(root, Replay(sys.argv[1]))
+        root.mainloop()
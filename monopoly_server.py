@@ -0,0 +1,338 @@
+"""asyncio server hosting many independent game tables in one process.
+
+Clients speak line-delimited JSON over TCP. Every request is one object
+with an 'op' and an optional 'id' that is echoed in the reply:
+
+    {"op": "create", "players": ["ann", "bob"], "seed": 1}
+    {"op": "join", "table": 3}
+    {"op": "roll", "table": 3}
+    {"op": "state", "table": 3}
+    {"op": "edit", "table": 3, "tile": 5, "value": 120, "color": "#ff0000"}
+    {"op": "watch", "table": 3}
+    {"op": "leave", "table": 3}
+    {"op": "stats"}
+
+Replies carry "ok": true or "ok": false with an "error". Every roll is
+pushed as a turn delta to each connection subscribed to the table. Tables
+are CompactGame instances on a shared interned board and are dropped as
+soon as their game is over, or when the last connection playing or
+watching them closes, so memory is bounded by max_tables.
+
+Spectators ("watch") get one snapshot of the table including its tiles,
+then only the per-turn and tile-edit deltas; see SpectatorChannel.
+"""
+import asyncio
+import json
+import random
+import time
+
+from monopoly_compact import CATALOG, CompactGame
+from monopoly_engine import create_random_tiles
+
+DEFAULT_PORT = 8765
+MAX_PLAYERS = 8
+# Subscribers with more than this many unsent bytes are dropped
+MAX_BUFFERED = 256 * 1024
+# Spectators with more than this many unsent bytes stop getting deltas
+# until their buffer drains, then get a fresh snapshot
+SPECTATOR_BUFFERED = 16 * 1024
+TILE_FIELDS = ('text', 'value', 'color', 'hyperlink')
+# Tile values are stored as C ints
+MIN_VALUE, MAX_VALUE = -2 ** 31, 2 ** 31 - 1
+
+
+def encode(message):
+    return json.dumps(message, separators=(',', ':')).encode() + b"\n"
+
+
+class ProtocolError(Exception):
+    pass
+
+
+def _int_field(message, key, low=MIN_VALUE, high=MAX_VALUE):
+    """message[key] if it is an integer in [low, high], else ProtocolError"""
+    value = message.get(key)
+    # JSON true and false decode to bools, which are ints to Python
+    if not isinstance(value, int) or isinstance(value, bool) or not low <= value <= high:
+        raise ProtocolError(f"bad {key}")
+    return value
+
+
+class SpectatorChannel:
+    """Read-only fan-out of one table to any number of spectators
+
+    Every delta is encoded once and the same bytes are written to all
+    spectators. A spectator whose send buffer is above SPECTATOR_BUFFERED
+    is marked lagging and skipped; once its buffer is empty again it is
+    sent the current snapshot instead of the deltas it missed, so a slow
+    consumer costs at most one buffer of memory.
+    """
+
+    def __init__(self, table):
+        self.table = table
+        self.spectators = {}
+        self.sent = 0
+        self.resyncs = 0
+
+    def __len__(self):
+        return len(self.spectators)
+
+    def add(self, writer):
+        self.spectators[writer] = False
+        return self.table.snapshot()
+
+    def discard(self, writer):
+        self.spectators.pop(writer, None)
+
+    def publish(self, data, final=False):
+        """Write one encoded delta to every spectator that keeps up
+
+        With final set, lagging spectators get the closing snapshot even
+        if their buffer has not drained, so everyone sees the game end.
+        """
+        snapshot = None
+        for writer, lagging in list(self.spectators.items()):
+            if writer.is_closing():
+                del self.spectators[writer]
+                continue
+            buffered = writer.transport.get_write_buffer_size()
+            if lagging:
+                if buffered and not final:
+                    continue
+                if snapshot is None:
+                    snapshot = encode(self.table.snapshot())
+                writer.write(snapshot)
+                self.spectators[writer] = False
+                self.resyncs += 1
+            elif buffered > SPECTATOR_BUFFERED:
+                self.spectators[writer] = True
+            else:
+                writer.write(data)
+                self.sent += 1
+
+
+class Table:
+    __slots__ = ('table_id', 'game', 'subscribers', 'channel')
+
+    def __init__(self, table_id, game):
+        self.table_id = table_id
+        self.game = game
+        self.subscribers = set()
+        self.channel = SpectatorChannel(self)
+
+    def state(self):
+        game = self.game
+        return {
+            'table': self.table_id,
+            'players': list(game.names),
+            'positions': list(game.positions),
+            'scores': list(game.scores),
+            'current': game.current_player,
+            'turns': game.turns,
+            'visited': game.visited,
+            'game_over': game.is_over(),
+        }
+
+    def snapshot(self):
+        """Full state for a spectator joining or resyncing"""
+        board = self.game.board
+        state = self.state()
+        state.update(event="snapshot", colors=list(self.game.colors),
+                     tiles=[board.catalog.records[i] for i in board.tile_ids])
+        return state
+
+
+class GameServer:
+    """Tables, subscriptions and the request dispatcher"""
+
+    def __init__(self, board=None, max_tables=10000, seed=None):
+        if board is None:
+            board = CATALOG.board(create_random_tiles(random.Random(seed)))
+        self.board = board
+        self.max_tables = max_tables
+        self.seeds = random.Random(seed)
+        self.tables = {}
+        self.next_id = 1
+        self.connections = 0
+        self.actions = 0
+        self.finished = 0
+        self.abandoned = 0
+        self.handlers = {
+            'create': self.op_create,
+            'join': self.op_join,
+            'roll': self.op_roll,
+            'state': self.op_state,
+            'edit': self.op_edit,
+            'watch': self.op_watch,
+            'leave': self.op_leave,
+            'stats': self.op_stats,
+        }
+
+    def _table(self, message):
+        table = self.tables.get(_int_field(message, 'table'))
+        if table is None:
+            raise ProtocolError("unknown table")
+        return table
+
+    def op_create(self, message, writer):
+        names = message.get('players', [])
+        if not isinstance(names, list) or not all(isinstance(name, str) for name in names):
+            raise ProtocolError("players must be a list of names")
+        if not 1 <= len(names) <= MAX_PLAYERS:
+            raise ProtocolError(f"need 1 to {MAX_PLAYERS} players")
+        seed = message.get('seed')
+        if not isinstance(seed, (int, float, str, type(None))):
+            raise ProtocolError("bad seed")
+        if len(self.tables) >= self.max_tables:
+            raise ProtocolError("server full")
+        game = CompactGame(self.board, random.Random(self.seeds.random() if seed is None else seed))
+        for name in names:
+            game.add_player(name)
+        table = Table(self.next_id, game)
+        self.next_id += 1
+        self.tables[table.table_id] = table
+        table.subscribers.add(writer)
+        return table.state()
+
+    def op_join(self, message, writer):
+        table = self._table(message)
+        table.subscribers.add(writer)
+        return table.state()
+
+    def op_watch(self, message, writer):
+        return self._table(message).channel.add(writer)
+
+    def op_leave(self, message, writer):
+        table = self._table(message)
+        table.subscribers.discard(writer)
+        table.channel.discard(writer)
+        return {}
+
+    def op_edit(self, message, writer):
+        table = self._table(message)
+        game = table.game
+        idx = _int_field(message, 'tile', 0, len(game.board.tile_ids) - 1)
+        changes = {key: message[key] for key in TILE_FIELDS if key in message}
+        for key in ('text', 'color', 'hyperlink'):
+            if key in changes and not isinstance(changes[key], str):
+                raise ProtocolError(f"bad {key}")
+        if 'value' in changes:
+            _int_field(message, 'value')
+        game.board = game.board.with_tile(idx, **changes)
+        delta = {'event': "tile", 'table': table.table_id, 'tile': idx}
+        delta.update(game.board.tile(idx))
+        self.publish(table, delta, skip=writer)
+        return delta
+
+    def op_state(self, message, writer):
+        return self._table(message).state()
+
+    def op_roll(self, message, writer):
+        table = self._table(message)
+        game = table.game
+        seat = _int_field(message, 'seat', 0, MAX_PLAYERS - 1) if 'seat' in message else game.current_player
+        if seat != game.current_player:
+            raise ProtocolError("not your turn")
+        seat, roll, position = game.step()
+        self.actions += 1
+        delta = {'event': "turn", 'table': table.table_id, 'seat': seat, 'roll': roll,
+                 'position': position, 'score': game.scores[seat], 'turns': game.turns,
+                 'current': game.current_player, 'game_over': game.is_over()}
+        if delta['game_over']:
+            best, names = game.winners()
+            delta.update(best=best, winners=names)
+            del self.tables[table.table_id]
+            self.finished += 1
+        self.publish(table, delta, skip=writer)
+        return delta
+
+    def op_stats(self, message, writer):
+        return {'tables': len(self.tables), 'connections': self.connections,
+                'actions': self.actions, 'finished': self.finished, 'abandoned': self.abandoned,
+                'spectators': sum(len(t.channel) for t in self.tables.values())}
+
+    def publish(self, table, delta, skip=None):
+        """Push a delta to the spectators and every subscriber except skip,
+        dropping slow subscribers. The delta is encoded once for all of them."""
+        listeners = [writer for writer in table.subscribers if writer is not skip]
+        if not listeners and not table.channel:
+            return
+        data = encode(delta)
+        table.channel.publish(data, final=delta.get('game_over', False))
+        for writer in listeners:
+            if writer.is_closing() or writer.transport.get_write_buffer_size() > MAX_BUFFERED:
+                table.subscribers.discard(writer)
+                continue
+            writer.write(data)
+
+    def dispatch(self, line, writer):
+        """Handle one request line and return the reply object"""
+        request_id = None
+        try:
+            message = json.loads(line)
+            if not isinstance(message, dict):
+                raise ProtocolError("expected an object")
+            request_id = message.get('id')
+            op = message.get('op')
+            handler = self.handlers.get(op) if isinstance(op, str) else None
+            if handler is None:
+                raise ProtocolError("unknown op")
+            reply = handler(message, writer)
+            reply['ok'] = True
+        except (ProtocolError, ValueError) as e:
+            reply = {'ok': False, 'error': str(e)}
+        if request_id is not None:
+            reply['id'] = request_id
+        return reply
+
+    async def handle(self, reader, writer):
+        self.connections += 1
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except (ConnectionError, asyncio.LimitOverrunError, ValueError):
+                    break
+                if not line:
+                    break
+                if line.strip():
+                    writer.write(encode(self.dispatch(line, writer)))
+                    await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            self.connections -= 1
+            for table in list(self.tables.values()):
+                table.subscribers.discard(writer)
+                table.channel.discard(writer)
+                if not table.subscribers and not table.channel:
+                    # Nobody can play or see it any more
+                    del self.tables[table.table_id]
+                    self.abandoned += 1
+            writer.close()
+
+    async def start(self, host="127.0.0.1", port=DEFAULT_PORT):
+        return await asyncio.start_server(self.handle, host, port)
+
+
+async def serve(host="127.0.0.1", port=DEFAULT_PORT, max_tables=10000):
+    server = GameServer(max_tables=max_tables)
+    listener = await server.start(host, port)
+    print(f"Serving on {host}:{port}")
+    started = time.perf_counter()
+    async with listener:
+        while True:
+            await asyncio.sleep(10)
+            stats = server.op_stats({}, None)
+            rate = stats['actions'] / (time.perf_counter() - started)
+            print(f"{stats} {rate:.0f} actions/s")
+
+
+if __name__ == "__main__":
+    import sys
+
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_PORT
+    try:
+        asyncio.run(serve(port=port))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,135 @@
+"""Measured and wrapped tile label layouts, cached with LRU eviction.
+
+Tk measures and wraps canvas text again every time an item's font or
+wrap width changes. TextLayoutCache does the measuring once per
+(text, font family, size, width, line limit): it picks the largest font
+size up to the requested one whose wrapped lines fit the width, wraps
+the text with explicit newlines and remembers the result. Resizing back
+to a size seen before is then a dictionary hit with no measuring.
+"""
+from collections import OrderedDict
+
+MIN_FONT_SIZE = 6
+
+
+class TextLayoutCache:
+    """LRU cache of fitted label layouts with hit statistics
+
+    measure(family, size, text) returns the width of text in pixels; by
+    default it uses tkinter.font, which needs a Tk root to exist.
+    """
+
+    def __init__(self, maxsize=4096, measure=None):
+        self.maxsize = maxsize
+        self.layouts = OrderedDict()
+        self.widths = {}
+        self.fonts = {}
+        self.measure = measure or self._tk_measure
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.measures = 0
+
+    def _tk_measure(self, family, size, text):
+        font = self.fonts.get((family, size))
+        if font is None:
+            from tkinter import font as tkfont
+            font = self.fonts[(family, size)] = tkfont.Font(family=family, size=size)
+        return font.measure(text)
+
+    def _width(self, family, size, text):
+        key = (family, size, text)
+        width = self.widths.get(key)
+        if width is None:
+            # Word widths are only an aid to wrapping; drop them all when full
+            if len(self.widths) >= self.maxsize * 8:
+                self.widths.clear()
+            width = self.widths[key] = self.measure(family, size, text)
+            self.measures += 1
+        return width
+
+    def _wrap(self, text, family, size, width):
+        """Greedy word wrap, return the lines and the widest line's width"""
+        space = self._width(family, size, " ")
+        lines = []
+        widest = 0
+        for paragraph in text.split("\n"):
+            line, line_width = [], 0
+            for word in paragraph.split():
+                word_width = self._width(family, size, word)
+                if line and line_width + space + word_width > width:
+                    lines.append(" ".join(line))
+                    widest = max(widest, line_width)
+                    line, line_width = [], 0
+                line_width += word_width + (space if line else 0)
+                line.append(word)
+            lines.append(" ".join(line))
+            widest = max(widest, line_width)
+        return lines, widest
+
+    def fit(self, text, family, size, width, max_lines=1):
+        """Return (font size, text with line breaks) fitting width pixels"""
+        key = (text, family, size, width, max_lines)
+        layout = self.layouts.get(key)
+        if layout is not None:
+            self.hits += 1
+            self.layouts.move_to_end(key)
+            return layout
+
+        self.misses += 1
+        for fitted in range(size, MIN_FONT_SIZE - 1, -1):
+            if max_lines > 1:
+                lines, widest = self._wrap(text, family, fitted, width)
+            else:
+                lines, widest = [text], self._width(family, fitted, text)
+            if widest <= width and len(lines) <= max_lines:
+                break
+        layout = (fitted, "\n".join(lines))
+
+        self.layouts[key] = layout
+        if len(self.layouts) > self.maxsize:
+            self.layouts.popitem(last=False)
+            self.evictions += 1
+        return layout
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'evictions': self.evictions,
+            'measures': self.measures,
+            'size': len(self.layouts),
+        }
+
+
+if __name__ == "__main__":
+    import os
+    import time
+
+    from monopoly_boards import load_board
+
+    # Resize back and forth between common window sizes. Without a display
+    # text width is approximated from the character count.
+    try:
+        import tkinter as tk
+        root = tk.Tk()
+        cache = TextLayoutCache()
+    except Exception:
+        root = None
+        cache = TextLayoutCache(measure=lambda family, size, text: round(len(text) * size * 0.6))
+    names = [tile['text'] for tile in load_board(os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                                             "boards", "classic.json"))]
+    tile_sizes = [80, 100, 120, 100, 80, 140, 120, 100] * 50
+    start = time.perf_counter()
+    for step, tile_size in enumerate(tile_sizes):
+        for name in names:
+            cache.fit(name, "Arial", max(MIN_FONT_SIZE, round(9 * tile_size / 100)), tile_size - 10, 3)
+        if step == 3:
+            print(f"after the first sizes: {cache.stats()}")
+    elapsed = time.perf_counter() - start
+    print(f"after {len(tile_sizes)} resizes: {cache.stats()}")
+    print(f"{1e6 * elapsed / (len(tile_sizes) * len(names)):.2f} us per label layout")
+    if root is not None:
+        root.destroy()
@@ -0,0 +1,234 @@
+"""Parallel tournaments between re-roll strategies.
+
+Games are split into chunks of chunk_size and spread over a
+multiprocessing pool. Chunk n draws every random number from its own
+generator seeded with "<seed>:<n>", so a tournament gives the same
+results whatever the number of processes or the order chunks finish in.
+
+Workers return one Aggregate per chunk: win and tie counts per entrant
+and histograms of scores and game lengths. These are merged as they
+arrive, so memory does not grow with the number of games. Ties are
+counted as the front-ends announce them, when several players share
+the best score.
+
+With rotate set, seats are rotated every game so each entrant moves
+first equally often. When nobody can re-roll, games are played with
+play_fast.
+
+    python monopoly_tournament.py --games 1000000 --entrants keep keep
+    python monopoly_tournament.py --games 2000 --rerolls 3 --entrants expectimax threshold
+"""
+import os
+import random
+import time
+from collections import Counter
+
+from monopoly_bots import ExpectimaxBot, threshold_policy
+from monopoly_engine import BOARD_TILES, CORNERS, Game, play_fast
+
+# Strategy name -> factory of a fresh policy (None keeps every roll).
+# Bots search to a fixed depth with no time budget, so results do not
+# depend on how fast the machine is.
+STRATEGIES = {
+    'keep': lambda: None,
+    'threshold': lambda: threshold_policy,
+    'expectimax': lambda: ExpectimaxBot(depth=3, time_budget=float("inf")),
+}
+SCORE_BUCKET = 100
+
+
+class Aggregate:
+    """Mergeable tournament statistics for n_entrants entrants"""
+
+    def __init__(self, n_entrants):
+        self.games = 0
+        self.wins = [0] * n_entrants
+        self.ties = [0] * n_entrants
+        self.tied_games = 0
+        self.score_sums = [0] * n_entrants
+        self.score_squares = [0] * n_entrants
+        self.scores = [Counter() for _ in range(n_entrants)]
+        self.turns = Counter()
+
+    def add(self, scores, turns):
+        """Record one finished game; scores are indexed by entrant"""
+        self.games += 1
+        self.turns[turns] += 1
+        best = max(scores)
+        winners = [entrant for entrant, score in enumerate(scores) if score == best]
+        if len(winners) > 1:
+            self.tied_games += 1
+            for entrant in winners:
+                self.ties[entrant] += 1
+        else:
+            self.wins[winners[0]] += 1
+        for entrant, score in enumerate(scores):
+            self.score_sums[entrant] += score
+            self.score_squares[entrant] += score * score
+            self.scores[entrant][score // SCORE_BUCKET] += 1
+
+    def merge(self, other):
+        self.games += other.games
+        self.tied_games += other.tied_games
+        self.turns.update(other.turns)
+        for entrant in range(len(self.wins)):
+            self.wins[entrant] += other.wins[entrant]
+            self.ties[entrant] += other.ties[entrant]
+            self.score_sums[entrant] += other.score_sums[entrant]
+            self.score_squares[entrant] += other.score_squares[entrant]
+            self.scores[entrant].update(other.scores[entrant])
+        return self
+
+    @staticmethod
+    def _percentile(histogram, total, fraction, width=1):
+        """Lower edge of the bucket holding the given fraction of samples"""
+        seen = 0
+        for bucket in sorted(histogram):
+            seen += histogram[bucket]
+            if seen >= fraction * total:
+                return bucket * width
+        return 0
+
+    def summary(self, names=None):
+        n = max(self.games, 1)
+        entrants = []
+        for entrant in range(len(self.wins)):
+            mean = self.score_sums[entrant] / n
+            variance = max(0.0, self.score_squares[entrant] / n - mean * mean)
+            entrants.append({
+                'name': names[entrant] if names else entrant,
+                'win_rate': self.wins[entrant] / n,
+                'tie_rate': self.ties[entrant] / n,
+                'mean_score': mean,
+                'score_stdev': variance ** 0.5,
+                'score_p10': self._percentile(self.scores[entrant], n, 0.1, SCORE_BUCKET),
+                'score_p50': self._percentile(self.scores[entrant], n, 0.5, SCORE_BUCKET),
+                'score_p90': self._percentile(self.scores[entrant], n, 0.9, SCORE_BUCKET),
+            })
+        return {
+            'games': self.games,
+            'tie_rate': self.tied_games / n,
+            'mean_turns': sum(turns * count for turns, count in self.turns.items()) / n,
+            'turns_p50': self._percentile(self.turns, n, 0.5),
+            'turns_p99': self._percentile(self.turns, n, 0.99),
+            'entrants': entrants,
+        }
+
+
+def random_values(rng):
+    """Tile values of a random board, distributed as in create_random_tiles
+
+    Only the values matter to a tournament, so this skips the colours and
+    makes one draw per tile; building full tiles cost more than playing.
+    """
+    rand = rng.random
+    return [0 if idx in CORNERS else 10 + int(rand() * 191) for idx in range(BOARD_TILES)]
+
+
+def play_chunk(job):
+    """Play one chunk of a tournament, return its Aggregate"""
+    index, first, count, entrants, seed, rerolls, values, rotate = job
+    rng = random.Random(f"{seed}:{index}")
+    n = len(entrants)
+    policies = [STRATEGIES[name]() for name in entrants]
+    decisions = rerolls and any(policy is not None for policy in policies)
+    aggregate = Aggregate(n)
+    for game_number in range(first, first + count):
+        # seats[s] is the entrant sitting in seat s this game
+        shift = game_number % n if rotate else 0
+        seats = [(seat + shift) % n for seat in range(n)]
+        board = values or random_values(rng)
+        if decisions:
+            game = Game([{'value': value} for value in board], rng, rerolls)
+            for seat, entrant in enumerate(seats):
+                game.add_player(entrants[entrant])
+                if policies[entrant] is not None:
+                    game.policies[seat] = policies[entrant]
+            game.play_to_completion()
+            turns, seat_scores = game.turns, [player['score'] for player in game.players]
+        else:
+            turns, seat_scores = play_fast(board, n, rng)
+        scores = [0] * n
+        for seat, entrant in enumerate(seats):
+            scores[entrant] = seat_scores[seat]
+        aggregate.add(scores, turns)
+    return aggregate
+
+
+def run_tournament(entrants, n_games, seed=0, rerolls=0, values=None, processes=None,
+                   chunk_size=1000, rotate=True, on_progress=None):
+    """Play n_games between the named strategies and summarise the results
+
+    values fixes the tile values of every game; by default each game
+    draws a random board. on_progress(aggregate) is called after every
+    merged chunk.
+    """
+    import multiprocessing
+
+    unknown = [name for name in entrants if name not in STRATEGIES]
+    if unknown:
+        raise ValueError(f"unknown strategies {unknown}, expected {', '.join(STRATEGIES)}")
+    if values is not None and len(values) < BOARD_TILES:
+        raise ValueError(f"a board needs {BOARD_TILES} tile values")
+    entrants = list(entrants)
+    jobs = ((index, first, min(chunk_size, n_games - first), entrants, seed, rerolls, values, rotate)
+            for index, first in enumerate(range(0, n_games, chunk_size)))
+
+    total = Aggregate(len(entrants))
+    start = time.perf_counter()
+    processes = processes or os.cpu_count() or 1
+    if processes == 1:
+        results = map(play_chunk, jobs)
+        pool = None
+    else:
+        pool = multiprocessing.Pool(processes)
+        results = pool.imap_unordered(play_chunk, jobs)
+    try:
+        for aggregate in results:
+            total.merge(aggregate)
+            if on_progress:
+                on_progress(total)
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+    result = total.summary(entrants)
+    elapsed = time.perf_counter() - start
+    result.update(seed=seed, processes=processes, elapsed_s=elapsed, games_per_s=total.games / elapsed)
+    return result
+
+
+if __name__ == "__main__":
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description="Play a tournament between re-roll strategies")
+    parser.add_argument("--games", type=int, default=100000)
+    parser.add_argument("--entrants", nargs="+", default=["keep", "keep"], choices=sorted(STRATEGIES))
+    parser.add_argument("--rerolls", type=int, default=0)
+    parser.add_argument("--board", help="JSON/CSV board definition file; random boards by default")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--processes", type=int, default=None)
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--scaling", action="store_true",
+                        help="time the tournament with 1, 2, 4 ... processes up to --processes")
+    args = parser.parse_args()
+
+    values = None
+    if args.board:
+        from monopoly_boards import load_board
+        values = [tile['value'] for tile in load_board(args.board)]
+
+    if args.scaling:
+        most = args.processes or os.cpu_count() or 1
+        counts = sorted({1 << k for k in range(most.bit_length()) if 1 << k <= most} | {most})
+        base = None
+        for processes in counts:
+            result = run_tournament(args.entrants, args.games, args.seed, args.rerolls, values,
+                                    processes, args.chunk_size)
+            base = base or result['games_per_s']
+            print(f"{processes} processes: {result['games_per_s']:.0f} games/s "
+                  f"({result['games_per_s'] / base:.2f}x)")
+    else:
+        print(json.dumps(run_tournament(args.entrants, args.games, args.seed, args.rerolls, values,
+                                        args.processes, args.chunk_size), indent=2))
@@ -0,0 +1,125 @@
+"""NumPy Monte Carlo simulator that plays many games in lockstep.
+
+Every game in a batch advances one turn per step, so the seat to move is
+the same for all of them. Finished games are masked out, their results
+are written back by game index, and the working arrays are compacted once
+most of the batch has finished.
+"""
+import numpy as np
+
+from monopoly_engine import BOARD_TILES, create_random_tiles
+
+FULL_MASK = (1 << BOARD_TILES) - 1
+
+
+class BatchSimulator:
+    """Positions, scores and visited bitmasks for a batch of games"""
+
+    def __init__(self, values, n_games, n_players=2, seed=None):
+        self.values = np.asarray(values[:BOARD_TILES], dtype=np.int64)
+        self.n_games = n_games
+        self.n_players = n_players
+        self.rng = np.random.default_rng(seed)
+        self.turn = 0
+
+        # Results, indexed by game
+        self.turns = np.zeros(n_games, dtype=np.int32)
+        self.scores = np.zeros((n_games, n_players), dtype=np.int64)
+
+        # Working arrays; finished rows are masked by live until compacted
+        self.active = np.arange(n_games)
+        self.live = np.ones(n_games, dtype=bool)
+        self.n_live = n_games
+        self.positions = np.full((n_games, n_players), -1, dtype=np.int32)
+        self.live_scores = np.zeros((n_games, n_players), dtype=np.int64)
+        self.visited = np.zeros(n_games, dtype=np.uint32)
+
+    def done(self):
+        return self.n_live == 0
+
+    def step(self):
+        """Play one turn in every unfinished game"""
+        seat = self.turn % self.n_players
+        rolls = self.rng.integers(1, 7, size=self.live.size, dtype=np.int32)
+        pos = self.positions[:, seat]
+
+        # Need a 1 to start: starting places the token on tile 1
+        waiting = pos < 0
+        moved = (pos + rolls) % BOARD_TILES
+        starting = waiting & (rolls == 1)
+        new_pos = np.where(waiting, np.where(starting, 1, -1), moved)
+        self.positions[:, seat] = new_pos
+        self.visited |= np.where(waiting, starting * 3, 1 << moved).astype(np.uint32)
+        self.live_scores[:, seat] += np.where(waiting, 0, self.values[moved])
+
+        self.turn += 1
+        finished = self.live & (self.visited == FULL_MASK)
+        if finished.any():
+            ids = self.active[finished]
+            self.turns[ids] = self.turn
+            self.scores[ids] = self.live_scores[finished]
+            self.live &= ~finished
+            self.n_live -= ids.size
+            # Finished games are masked out; compact once they dominate
+            if self.n_live * 2 < self.live.size:
+                self._compact()
+
+    def _compact(self):
+        keep = self.live
+        self.active = self.active[keep]
+        self.positions = self.positions[keep]
+        self.live_scores = self.live_scores[keep]
+        self.visited = self.visited[keep]
+        self.live = self.live[keep]
+
+    def run(self, max_turns=100000):
+        while not self.done() and self.turn < max_turns:
+            self.step()
+        return self.turns, self.scores
+
+
+def simulate_batch(values, n_games, n_players=2, seed=None, batch_size=65536):
+    """Play n_games in batches, return per-game turns and final scores"""
+    rng = np.random.default_rng(seed)
+    turns = np.empty(n_games, dtype=np.int32)
+    scores = np.empty((n_games, n_players), dtype=np.int64)
+    for start in range(0, n_games, batch_size):
+        size = min(batch_size, n_games - start)
+        sim = BatchSimulator(values, size, n_players, seed=rng.integers(2**63))
+        turns[start:start+size], scores[start:start+size] = sim.run()
+    return turns, scores
+
+
+def summarize(turns, scores):
+    """Game-length and score distributions plus per-seat outcomes"""
+    best = scores.max(axis=1)
+    at_best = scores == best[:, None]
+    tied = at_best.sum(axis=1) > 1
+    wins = at_best[~tied].sum(axis=0)
+    return {
+        'games': int(turns.size),
+        'mean_turns': float(turns.mean()),
+        'turn_percentiles': {p: float(v) for p, v in
+                             zip((5, 50, 95, 99), np.percentile(turns, (5, 50, 95, 99)))},
+        'turn_histogram': np.bincount(turns).tolist(),
+        'wins': wins.tolist(),
+        'ties': int(tied.sum()),
+        'mean_scores': scores.mean(axis=0).tolist(),
+        'score_std': scores.std(axis=0).tolist(),
+    }
+
+
+if __name__ == "__main__":
+    import random
+    import sys
+    import time
+
+    n_games = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    values = [tile['value'] for tile in create_random_tiles(random.Random(0))]
+    start = time.perf_counter()
+    turns, scores = simulate_batch(values, n_games, seed=0)
+    elapsed = time.perf_counter() - start
+    result = summarize(turns, scores)
+    del result['turn_histogram']
+    print(result)
+    print(f"{n_games / elapsed:.0f} games/s")
@@ -0,0 +1,315 @@
+"""Zoomable, pannable board view that only draws what is visible.
+
+BoardViewport maps board cells to canvas pixels through a scale and an
+offset. Each redraw asks perimeter_runs which tiles fall inside the
+visible cells, so the work per frame depends on the canvas size, not on
+the board size. Canvas items are kept in pools: items of tiles that
+leave the view are hidden and reused for tiles that enter it.
+
+Level of detail depends on the tile size on screen:
+    - at LABEL_MIN_PX and above, tiles get their text labels
+    - below MIN_TILE_PX, runs of neighbouring tiles are merged into one
+      block so no item is smaller than MIN_TILE_PX
+Pan and zoom only record the new view; the redraw runs at most once per
+frame from widget.after.
+
+    python monopoly_viewport.py 2501      # a board with 10k perimeter tiles
+"""
+import math
+import time
+
+from monopoly_geometry import perimeter_cell, perimeter_runs
+from monopoly_renderer import FONT_FAMILY
+from monopoly_textlayout import MIN_FONT_SIZE, TextLayoutCache
+
+LABEL_MIN_PX = 48
+MIN_TILE_PX = 6
+MIN_SCALE = 0.05
+MAX_SCALE = 400
+
+
+class ItemPool:
+    """Recycles canvas items of one type between redraws"""
+
+    def __init__(self, canvas, create):
+        self.canvas = canvas
+        self.create = create
+        self.free = []
+        self.created = 0
+        self.reused = 0
+
+    def take(self):
+        if self.free:
+            self.reused += 1
+            item = self.free.pop()
+            self.canvas.itemconfigure(item, state="normal")
+            return item
+        self.created += 1
+        return self.create()
+
+    def give(self, item):
+        self.canvas.itemconfigure(item, state="hidden")
+        self.free.append(item)
+
+
+class BoardViewport:
+    """Draws the visible part of a board of grid_size x grid_size cells
+
+    labels and tile_fill are as for BoardRenderer. The view starts
+    fitted to the whole board; zoom and pan change it.
+    """
+
+    def __init__(self, canvas, grid_size, labels, tile_fill, frame_budget=1/60):
+        self.canvas = canvas
+        self.grid_size = grid_size
+        self.labels = labels
+        self.tile_fill = tile_fill
+        self.frame_budget = frame_budget
+        self.text_layout = TextLayoutCache()
+        self.scale = 1.0
+        self.x0 = self.y0 = 0.0
+        self.width = self.height = 0
+        self.players = []
+
+        self.rects = ItemPool(canvas, lambda: canvas.create_rectangle(0, 0, 0, 0, outline="black",
+                                                                      tags=("tile",)))
+        self.texts = ItemPool(canvas, lambda: canvas.create_text(0, 0, tags=("tile", "label")))
+        self.tokens = ItemPool(canvas, lambda: canvas.create_oval(0, 0, 0, 0, outline="black",
+                                                                  tags=("token",)))
+        # Items on screen by key: ('tile', idx) or ('block', first, last)
+        self.shown = {}
+        self.shown_tokens = {}
+        self.pending = None
+        self.drag = None
+        self.redraws = 0
+        self.last_ms = 0.0
+
+    # View transform
+
+    def resize(self, width, height):
+        first = not self.width
+        self.width, self.height = width, height
+        if first:
+            self.fit()
+        self.request_redraw()
+
+    def fit(self):
+        """Show the whole board"""
+        side = min(self.width, self.height) or 1
+        self.scale = max(MIN_SCALE, side / self.grid_size)
+        self.x0 = (self.width - self.grid_size * self.scale) / 2
+        self.y0 = (self.height - self.grid_size * self.scale) / 2
+        self.request_redraw()
+
+    def zoom(self, factor, x, y):
+        """Zoom by factor keeping the board point under (x, y) in place"""
+        scale = min(MAX_SCALE, max(MIN_SCALE, self.scale * factor))
+        factor = scale / self.scale
+        self.x0 = x - (x - self.x0) * factor
+        self.y0 = y - (y - self.y0) * factor
+        self.scale = scale
+        self.request_redraw()
+
+    def pan(self, dx, dy):
+        self.x0 += dx
+        self.y0 += dy
+        self.request_redraw()
+
+    def cell_at(self, x, y):
+        """Board (row, col) under a canvas pixel"""
+        return math.floor((y - self.y0) / self.scale), math.floor((x - self.x0) / self.scale)
+
+    def visible_runs(self):
+        r0, c0 = self.cell_at(0, 0)
+        r1, c1 = self.cell_at(self.width, self.height)
+        return perimeter_runs((r0, r1), (c0, c1), self.grid_size)
+
+    # Redraw
+
+    def request_redraw(self):
+        if self.pending is None:
+            self.pending = self.canvas.after(max(1, int(self.frame_budget * 1000)), self.redraw)
+
+    def _cell_rect(self, first, last):
+        """Pixel rectangle covering tiles first..last of one board edge"""
+        (ra, ca), (rb, cb) = perimeter_cell(first, self.grid_size), perimeter_cell(last, self.grid_size)
+        s = self.scale
+        return (self.x0 + min(ca, cb) * s, self.y0 + min(ra, rb) * s,
+                self.x0 + (max(ca, cb) + 1) * s, self.y0 + (max(ra, rb) + 1) * s)
+
+    def plan(self):
+        """(key, pixel rectangle, tile giving the fill) of everything in view"""
+        units = []
+        block = max(1, math.ceil(MIN_TILE_PX / self.scale))
+        for first, last in self.visible_runs():
+            if block == 1:
+                for idx in range(first, last + 1):
+                    units.append((('tile', idx), self._cell_rect(idx, idx), idx))
+            else:
+                # Blocks are aligned to multiples of block so they stay put while panning
+                start = first - first % block
+                for lo in range(start, last + 1, block):
+                    a, b = max(lo, first), min(lo + block - 1, last)
+                    units.append((('block', a, b), self._cell_rect(a, b), lo))
+        return units
+
+    def redraw(self):
+        self.pending = None
+        started = time.perf_counter()
+        units = self.plan()
+        with_labels = self.scale >= LABEL_MIN_PX
+        shown = {}
+        for key, rect, idx in units:
+            entry = self.shown.pop(key, None)
+            if entry is None or bool(entry[1]) != with_labels:
+                if entry is not None:
+                    self._release(entry)
+                entry = (self.rects.take(), [self.texts.take() for _ in self.labels] if with_labels else [])
+                self._paint(entry, idx)
+            self.canvas.coords(entry[0], *rect)
+            if with_labels:
+                self._place_labels(entry[1], idx, rect)
+            shown[key] = entry
+        for entry in self.shown.values():
+            self._release(entry)
+        self.shown = shown
+        self._draw_tokens()
+        self.canvas.tag_raise("label")
+        self.canvas.tag_raise("token")
+        self.redraws += 1
+        self.last_ms = 1000 * (time.perf_counter() - started)
+
+    def _release(self, entry):
+        self.rects.give(entry[0])
+        for item in entry[1]:
+            self.texts.give(item)
+
+    def _paint(self, entry, idx):
+        self.canvas.itemconfigure(entry[0], fill=self.tile_fill(idx))
+
+    def _place_labels(self, items, idx, rect):
+        tile_px = rect[2] - rect[0]
+        cx, cy = (rect[0] + rect[2]) / 2, (rect[1] + rect[3]) / 2
+        for label, item in zip(self.labels, items):
+            size = max(MIN_FONT_SIZE, round(label['size'] * tile_px / 100))
+            max_lines = label.get('lines', 3) if label.get('wrap') else 1
+            size, text = self.text_layout.fit(label['text'](idx), FONT_FAMILY, size,
+                                              int(tile_px) - 10, max_lines)
+            self.canvas.coords(item, cx, cy + label['dy'] * tile_px / 100)
+            self.canvas.itemconfigure(item, text=text, font=(FONT_FAMILY, size), fill=label['fill'])
+
+    def set_players(self, players):
+        self.players = players
+        self.request_redraw()
+
+    def _draw_tokens(self):
+        r = max(2, min(self.scale * 0.1, 10))
+        shown = {}
+        for seat, player in enumerate(self.players):
+            if not player['started']:
+                continue
+            row, col = perimeter_cell(player['position'], self.grid_size)
+            x = self.x0 + (col + 0.5) * self.scale
+            y = self.y0 + (row + 0.5) * self.scale
+            if not (-r <= x <= self.width + r and -r <= y <= self.height + r):
+                continue
+            item = self.shown_tokens.pop(seat, None) or self.tokens.take()
+            self.canvas.coords(item, x - r, y - r, x + r, y + r)
+            self.canvas.itemconfigure(item, fill=player['color'])
+            shown[seat] = item
+        for item in self.shown_tokens.values():
+            self.tokens.give(item)
+        self.shown_tokens = shown
+
+    def update_tile(self, idx):
+        """Repaint one tile after it was edited, if it is on screen"""
+        entry = self.shown.get(('tile', idx))
+        if entry is not None:
+            self._paint(entry, idx)
+            if entry[1]:
+                self._place_labels(entry[1], idx, self.canvas.coords(entry[0]))
+
+    def stats(self):
+        return {'shown': len(self.shown), 'items': self.rects.created + self.texts.created +
+                self.tokens.created, 'reused': self.rects.reused + self.texts.reused,
+                'redraws': self.redraws, 'last_ms': self.last_ms}
+
+    # Mouse handling
+
+    def bind(self, pan_button=1):
+        """Drag with pan_button to pan, wheel to zoom"""
+        self.canvas.bind("<Configure>", lambda e: self.resize(e.width, e.height))
+        self.canvas.bind(f"<ButtonPress-{pan_button}>", self.on_press)
+        self.canvas.bind(f"<B{pan_button}-Motion>", self.on_drag)
+        self.canvas.bind("<MouseWheel>", lambda e: self.zoom(1.2 if e.delta > 0 else 1/1.2, e.x, e.y))
+        self.canvas.bind("<Button-4>", lambda e: self.zoom(1.2, e.x, e.y))
+        self.canvas.bind("<Button-5>", lambda e: self.zoom(1/1.2, e.x, e.y))
+
+    def on_press(self, event):
+        self.drag = (event.x, event.y)
+
+    def on_drag(self, event):
+        if self.drag is not None:
+            self.pan(event.x - self.drag[0], event.y - self.drag[1])
+            self.drag = (event.x, event.y)
+
+
+def plan_benchmark(grid_size=2501, width=1000, height=800, n_views=2000, seed=0):
+    """Time culling and level-of-detail planning for random views"""
+    import random
+
+    class Canvas:
+        def after(self, ms, callback):
+            return None
+
+    rng = random.Random(seed)
+    view = BoardViewport(Canvas(), grid_size, [], lambda idx: "#DDDDDD")
+    view.resize(width, height)
+    times = []
+    units = 0
+    for _ in range(n_views):
+        view.fit()
+        view.zoom(math.exp(rng.uniform(0, math.log(MAX_SCALE / view.scale))),
+                  rng.uniform(0, width), rng.uniform(0, height))
+        start = time.perf_counter()
+        units = max(units, len(view.plan()))
+        times.append(time.perf_counter() - start)
+    times.sort()
+    return {'tiles': 4 * (grid_size - 1), 'max_units': units,
+            'mean_ms': 1000 * sum(times) / len(times), 'p99_ms': 1000 * times[int(len(times) * 0.99)]}
+
+
+if __name__ == "__main__":
+    import random
+    import sys
+
+    grid_size = int(sys.argv[1]) if len(sys.argv) > 1 else 2501
+    print(plan_benchmark(grid_size))
+    try:
+        import tkinter as tk
+        root = tk.Tk()
+    except Exception as e:
+        print(f"No display ({e})")
+        sys.exit()
+
+    rng = random.Random(0)
+    values = [rng.randint(10, 200) for _ in range(4 * (grid_size - 1))]
+    root.title(f"{len(values)} tiles - drag to pan, wheel to zoom")
+    canvas = tk.Canvas(root, width=1000, height=800, bg="white", highlightthickness=0)
+    canvas.pack(fill=tk.BOTH, expand=True)
+    view = BoardViewport(canvas, grid_size, [
+        {'key': "name", 'dy': -15, 'size': 10, 'fill': "black", 'text': lambda idx: f"Tile {idx+1}"},
+        {'key': "value", 'dy': 20, 'size': 8, 'fill': "black", 'text': lambda idx: f"Value: {values[idx]}"},
+    ], lambda idx: "#%02X%02XFF" % (values[idx], values[idx]))
+    view.bind()
+    view.set_players([{'position': i * 997 % len(values), 'started': True, 'color': color}
+                      for i, color in enumerate(("red", "green", "blue", "yellow"))])
+    status = tk.Label(root, anchor="w")
+    status.pack(fill=tk.X)
+
+    def show_stats():
+        status.config(text=str(view.stats()))
+        root.after(250, show_stats)
+
+    show_stats()
+    root.mainloop()
@@ -0,0 +1,216 @@
+"""Tk widgets shared by the MonopolyGame front-ends."""
+import queue
+import threading
+import time
+import tkinter as tk
+import webbrowser
+
+
+class EventLog:
+    """Scrolling, read-only log that replaces per-turn message boxes"""
+
+    def __init__(self, parent, max_lines=500, **options):
+        frame = tk.Frame(parent, bg=options.get('bg', "#3E3E3E"))
+        self.text = tk.Text(frame, height=options.pop('height', 10), width=options.pop('width', 30),
+                            font=("Arial", 10), state=tk.DISABLED, wrap=tk.WORD, **options)
+        scrollbar = tk.Scrollbar(frame, command=self.text.yview)
+        self.text.configure(yscrollcommand=scrollbar.set)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.text.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.frame = frame
+        self.max_lines = max_lines
+        self.lines = 0
+
+    def pack(self, **options):
+        self.frame.pack(**options)
+
+    def add(self, message):
+        self.text.configure(state=tk.NORMAL)
+        self.text.insert(tk.END, message.replace("\n", " ") + "\n")
+        self.lines += 1
+        if self.lines > self.max_lines:
+            self.text.delete("1.0", "2.0")
+            self.lines -= 1
+        self.text.configure(state=tk.DISABLED)
+        self.text.see(tk.END)
+
+
+class AutoPlayer:
+    """Plays turns from widget.after at a fixed rate or as fast as possible
+
+    play_turn is called once per turn and returns False when the game is
+    over. A rate of 0 means as fast as possible: turns are played in
+    slices of at most slice_budget seconds and control goes back to the Tk
+    event loop between slices, so the window stays responsive.
+    on_rate receives the measured turns per second about once a second.
+    """
+
+    def __init__(self, widget, play_turn, on_rate=None, slice_budget=0.008):
+        self.widget = widget
+        self.play_turn = play_turn
+        self.on_rate = on_rate
+        self.slice_budget = slice_budget
+        self.rate = 1.0
+        self.pending = None
+        self.window_start = 0.0
+        self.window_turns = 0
+
+    @property
+    def running(self):
+        return self.pending is not None
+
+    def start(self, rate=None):
+        if rate is not None:
+            self.rate = rate
+        if not self.running:
+            self.window_start = time.perf_counter()
+            self.window_turns = 0
+            self.pending = self.widget.after(1, self._tick)
+
+    def stop(self):
+        if self.pending is not None:
+            self.widget.after_cancel(self.pending)
+            self.pending = None
+        if self.on_rate:
+            self.on_rate(0.0)
+
+    def toggle(self, rate=None):
+        if self.running:
+            self.stop()
+        else:
+            self.start(rate)
+
+    def _tick(self):
+        self.pending = None
+        deadline = time.perf_counter() + self.slice_budget
+        playing = True
+        while playing:
+            playing = self.play_turn() is not False
+            self.window_turns += 1
+            if self.rate > 0 or time.perf_counter() >= deadline:
+                break
+        if playing:
+            self._report()
+            delay = 1 if self.rate <= 0 else max(1, int(1000 / self.rate))
+            self.pending = self.widget.after(delay, self._tick)
+
+    def _report(self):
+        now = time.perf_counter()
+        elapsed = now - self.window_start
+        if elapsed >= 1.0:
+            if self.on_rate:
+                self.on_rate(self.window_turns / elapsed)
+            self.window_start = now
+            self.window_turns = 0
+
+
+class ItemDispatcher:
+    """Routes <Enter>, <Leave> and <Button-1> on canvas items to handlers
+
+    There is one tag binding per event for all items carrying tag, made
+    once, and the item under the pointer is resolved to its key through
+    a lookup table. Redraws only register items, so they create no Tcl
+    commands. Handlers receive the key of the item.
+    """
+
+    def __init__(self, canvas, tag, on_enter=None, on_leave=None, on_click=None):
+        self.canvas = canvas
+        self.items = {}
+        for sequence, handler in (("<Enter>", on_enter), ("<Leave>", on_leave),
+                                  ("<Button-1>", on_click)):
+            if handler:
+                canvas.tag_bind(tag, sequence, lambda event, handler=handler: self.dispatch(handler))
+
+    def register(self, item, key):
+        self.items[item] = key
+
+    def dispatch(self, handler):
+        current = self.canvas.find_withtag("current")
+        if current:
+            key = self.items.get(current[0])
+            if key is not None:
+                handler(key)
+
+
+class LinkOpener:
+    """Opens URLs on a background thread so a click never blocks Tk
+
+    A URL that is already waiting to be opened is not queued again, so
+    repeated clicks on a slow browser launch open it once.
+    """
+
+    def __init__(self, open_url=webbrowser.open):
+        self.open_url = open_url
+        self.queue = queue.Queue()
+        self.pending = set()
+        self.lock = threading.Lock()
+        self.thread = None
+
+    def open(self, url):
+        with self.lock:
+            if url in self.pending:
+                return False
+            self.pending.add(url)
+            if self.thread is None:
+                self.thread = threading.Thread(target=self._run, name="link-opener", daemon=True)
+                self.thread.start()
+        self.queue.put(url)
+        return True
+
+    def _run(self):
+        while True:
+            url = self.queue.get()
+            try:
+                self.open_url(url)
+            except Exception:
+                pass
+            finally:
+                with self.lock:
+                    self.pending.discard(url)
+
+
+def soak_benchmark(root, redraws=5000, legacy=False):
+    """Tcl command count while the board is laid out redraws times
+
+    With legacy set, every redraw also re-binds each label with fresh
+    lambdas, as the front-ends used to, to show the growth it caused.
+    Needs a display.
+    """
+    from monopoly_renderer import BoardRenderer
+
+    canvas = tk.Canvas(root, width=800, height=800)
+    canvas.pack()
+    links = ItemDispatcher(canvas, "name", on_enter=lambda idx: root.config(cursor="hand2"),
+                           on_leave=lambda idx: root.config(cursor=""),
+                           on_click=lambda idx: None)
+    renderer = BoardRenderer(canvas, [
+        {'key': "name", 'dy': 0, 'size': 9, 'fill': "black", 'wrap': True,
+         'text': lambda idx: f"Tile {idx+1}"},
+    ], tile_fill=lambda idx: "#DDDDDD", on_label=lambda idx, key, item: links.register(item, idx))
+
+    counts = []
+    for i in range(redraws):
+        renderer.layout(40 + i % 60)
+        if legacy:
+            for rect, texts in renderer.tile_items:
+                for item in texts:
+                    canvas.tag_bind(item, "<Enter>", lambda e: root.config(cursor="hand2"))
+                    canvas.tag_bind(item, "<Leave>", lambda e: root.config(cursor=""))
+                    canvas.tag_bind(item, "<Button-1>", lambda e, url=f"https://tile{i}.com": None)
+        if i % (redraws // 10 or 1) == 0 or i == redraws - 1:
+            root.update()
+            counts.append((i + 1, len(root.tk.call("info", "commands"))))
+    canvas.destroy()
+    return counts
+
+
+if __name__ == "__main__":
+    import sys
+
+    root = tk.Tk()
+    redraws = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    for mode in (False, True):
+        print("legacy per-item bindings" if mode else "item dispatcher")
+        for done, commands in soak_benchmark(root, redraws, legacy=mode):
+            print(f"  after {done} redraws: {commands} Tcl commands")
+    root.destroy()
@@ -0,0 +1,107 @@
+import csv
+import hashlib
+import json
+import os
+
+import pytest
+
+from monopoly_boards import BoardError, KINDS, load_board, load_catalog
+from monopoly_engine import BOARD_TILES
+
+
+def definition(name, offset=0):
+    return {'name': name, 'tiles': [
+        {'text': f"Tile {i}", 'value': 10 * i + offset, 'color': "#%06X" % (i * 0x0A0B0C),
+         'hyperlink': f"https://tile{i}.com", 'kind': KINDS[i % len(KINDS)]}
+        for i in range(BOARD_TILES)]}
+
+
+def write_json(path, document):
+    with open(path, "w") as f:
+        json.dump(document, f)
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def tile_fields(tiles):
+    return [{key: tile[key] for key in ('text', 'value', 'color', 'hyperlink', 'kind')} for tile in tiles]
+
+
+def test_round_trip_through_the_cache(tmp_path):
+    path = str(tmp_path / "catalog.json")
+    boards = [definition("one"), definition("two", 5)]
+    digest = write_json(path, {'boards': boards})
+    cache_dir = str(tmp_path / "cache")
+
+    cold = load_catalog(path, cache_dir)
+    assert os.listdir(cache_dir) == [digest + ".bin"]
+    warm = load_catalog(path, cache_dir)
+    try:
+        for catalog in (cold, warm):
+            assert catalog.names() == ["one", "two"]
+            for board in boards:
+                assert tile_fields(catalog.board(board['name'])) == board['tiles']
+        assert [tile['position'] for tile in warm.board()] == list(range(BOARD_TILES))
+    finally:
+        cold.close()
+        warm.close()
+
+
+def test_csv_board_is_named_after_the_file(tmp_path):
+    path = str(tmp_path / "mine.csv")
+    tiles = definition("mine")['tiles']
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=list(tiles[0]))
+        writer.writeheader()
+        writer.writerows(tiles)
+    catalog = load_catalog(path, str(tmp_path / "cache"))
+    try:
+        assert catalog.names() == ["mine"]
+        assert tile_fields(catalog.board("mine")) == tiles
+    finally:
+        catalog.close()
+
+
+def test_edited_definition_gets_a_new_cache(tmp_path):
+    path = str(tmp_path / "board.json")
+    cache_dir = str(tmp_path / "cache")
+    write_json(path, definition("board"))
+    assert load_board(path, cache_dir=cache_dir)[3]['value'] == 30
+    write_json(path, definition("board", 1))
+    assert load_board(path, cache_dir=cache_dir)[3]['value'] == 31
+    assert len(os.listdir(cache_dir)) == 2
+
+
+@pytest.mark.parametrize("corrupt", [
+    lambda data: b"",
+    lambda data: b"junk" + data[4:],
+    lambda data: data[:len(data) // 2],
+    # A valid cache stored under the name of another definition
+    lambda data: data[:4] + bytes(32) + data[36:],
+])
+def test_corrupted_cache_is_compiled_again(tmp_path, corrupt):
+    path = str(tmp_path / "board.json")
+    cache_dir = str(tmp_path / "cache")
+    board = definition("board")
+    digest = write_json(path, board)
+    load_board(path, cache_dir=cache_dir)
+    cache_path = os.path.join(cache_dir, digest + ".bin")
+    with open(cache_path, "rb") as f:
+        data = f.read()
+    with open(cache_path, "wb") as f:
+        f.write(corrupt(data))
+
+    assert tile_fields(load_board(path, cache_dir=cache_dir)) == board['tiles']
+    with open(cache_path, "rb") as f:
+        assert f.read() == data
+
+
+def test_invalid_definition_is_not_cached(tmp_path):
+    path = str(tmp_path / "board.json")
+    board = definition("board")
+    board['tiles'][0]['color'] = "red"
+    write_json(path, board)
+    cache_dir = str(tmp_path / "cache")
+    with pytest.raises(BoardError, match="tile 0: color"):
+        load_board(path, cache_dir=cache_dir)
+    assert not os.path.exists(cache_dir)
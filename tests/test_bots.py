@@ -0,0 +1,47 @@
+import random
+
+from monopoly_bots import ExpectimaxBot
+from monopoly_engine import Game, create_random_tiles
+
+
+def two_player_game(seed):
+    rng = random.Random(seed)
+    game = Game(create_random_tiles(rng), rng, rerolls=2)
+    game.add_player("Ann")
+    game.add_player("Bob")
+    for _ in range(12):
+        game.step()
+    # Equal scores make the score differences the same from either seat
+    for player in game.players:
+        player['score'] = 100
+    return game
+
+
+def test_key_depends_on_the_seat_played():
+    bot = ExpectimaxBot()
+    state = ((3, 7), (40, 40), 0b1011, (1, 2), 0, 2)
+    bot.me = 0
+    first = bot._key(*state)
+    bot.me = 1
+    assert bot._key(*state) != first
+
+
+def test_shared_bot_decides_like_a_fresh_one():
+    # A generous budget makes the search reach full depth every time
+    game = two_player_game(3)
+    shared = ExpectimaxBot(depth=3, time_budget=10)
+    for roll in range(1, 7):
+        shared.decide(game, 0, roll)
+    for roll in range(1, 7):
+        fresh = ExpectimaxBot(depth=3, time_budget=10)
+        assert shared.decide(game, 1, roll) == fresh.decide(game, 1, roll)
+
+
+def test_policy_given_to_add_player():
+    game = Game(create_random_tiles(random.Random(0)), random.Random(0), rerolls=1)
+    bot = ExpectimaxBot()
+    game.add_player("Ann")
+    game.add_player("Bot", policy=bot)
+    assert game.policies == {1: bot}
+    game.set_rerolls(4)
+    assert [p['rerolls'] for p in game.players] == [4, 4]
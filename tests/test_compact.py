@@ -0,0 +1,47 @@
+import gc
+import random
+
+from monopoly_compact import CompactGame, TileCatalog
+from monopoly_engine import Game, create_random_tiles
+
+
+def test_identical_layouts_share_a_board():
+    catalog = TileCatalog()
+    tiles = create_random_tiles(random.Random(0))
+    board = catalog.board(tiles)
+    assert catalog.board([dict(tile) for tile in tiles]) is board
+    assert [board.tile(i)['value'] for i in range(len(tiles))] == [t['value'] for t in tiles]
+
+
+def test_abandoned_boards_and_records_are_freed():
+    catalog = TileCatalog()
+    base = catalog.board(create_random_tiles(random.Random(0)))
+    baseline = len(catalog)
+    board = base
+    for value in range(1000):
+        board = board.with_tile(value % 24, value=value, text=f"edit {value}")
+    gc.collect()
+    # Only the base board, the latest edit and their records are kept
+    assert len(catalog.boards) == 2
+    assert len(catalog) <= baseline + 24
+    assert len(catalog.records) <= baseline + 48
+    assert base.tile(3) == catalog.tile(base.tile_ids[3])
+
+    del board
+    gc.collect()
+    assert len(catalog.boards) == 1
+    assert len(catalog) == baseline
+    assert [base.tile(i)['value'] for i in range(24)] == list(base.values)
+
+
+def test_compact_game_matches_game():
+    tiles = create_random_tiles(random.Random(1))
+    game = Game(tiles, random.Random(2))
+    compact = CompactGame(TileCatalog().board(tiles), random.Random(2))
+    for seat in range(3):
+        game.add_player(f"Player {seat+1}")
+        compact.add_player(f"Player {seat+1}")
+    game.play_to_completion()
+    compact.play_to_completion()
+    assert compact.turns == game.turns
+    assert list(compact.scores) == [p['score'] for p in game.players]
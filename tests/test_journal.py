@@ -0,0 +1,154 @@
+import os
+import random
+
+import pytest
+
+from monopoly_engine import Game, create_random_tiles
+from monopoly_journal import GameJournal, resume
+
+
+def new_game(seed, n_players=2):
+    rng = random.Random(seed)
+    game = Game(create_random_tiles(rng), rng)
+    for seat in range(n_players):
+        game.add_player(f"Player {seat+1}")
+    return game
+
+
+def play(game, turns, edits=None):
+    """Play up to turns turns, editing a tile after every third one"""
+    for turn in range(turns):
+        if game.is_over():
+            break
+        game.step()
+        if edits and turn % 3 == 0:
+            idx = edits.randrange(len(game.tiles))
+            game.edit_tile(idx, value=edits.randint(10, 200), text=f"Edited {turn}")
+
+
+def same_state(a, b):
+    assert a.tiles == b.tiles
+    assert a.players == b.players
+    assert a.visited == b.visited
+    assert (a.turns, a.current_player) == (b.turns, b.current_player)
+
+
+@pytest.mark.parametrize("turns", [1, 6, 7, 20, 41])
+def test_resume_across_snapshot_boundary(tmp_path, turns):
+    path = str(tmp_path / "game.journal")
+    original = new_game(0)
+    journal = GameJournal.create(path, original, snapshot_every=7)
+    play(original, turns, random.Random(1))
+    journal.close()
+
+    resumed = resume(path, snapshot_every=7)
+    same_state(resumed, original)
+    # The restored generator rolls what the uninterrupted game rolls next
+    reference = new_game(0)
+    play(reference, turns, random.Random(1))
+    play(reference, 500)
+    play(resumed, 500)
+    same_state(resumed, reference)
+    resumed.journal.close()
+
+    # The continued log resumes to the final state again
+    again = resume(path)
+    same_state(again, reference)
+    again.journal.close()
+
+
+def test_torn_record_is_dropped(tmp_path):
+    path = str(tmp_path / "game.journal")
+    game = new_game(3)
+    journal = GameJournal.create(path, game, snapshot_every=None)
+    play(game, 10)
+    journal.close()
+    size = os.path.getsize(path)
+    with open(path, "ab") as f:
+        f.write(b"\x02\x10\x00partial")
+
+    resumed = resume(path)
+    same_state(resumed, game)
+    resumed.journal.close()
+    assert os.path.getsize(path) == size
+
+
+def test_missing_snapshot_replays_whole_log(tmp_path):
+    path = str(tmp_path / "game.journal")
+    game = new_game(4, n_players=3)
+    journal = GameJournal.create(path, game, snapshot_every=5)
+    play(game, 30, random.Random(2))
+    journal.close()
+    os.remove(path + ".snap")
+
+    resumed = resume(path)
+    same_state(resumed, game)
+    resumed.journal.close()
+
+
+def test_resume_keeps_the_original_seed(tmp_path):
+    path = str(tmp_path / "game.journal")
+    journal = GameJournal.create(path, new_game(5), seed=4242)
+    journal.close()
+    resumed = resume(path)
+    assert resumed.journal.seed == 4242
+    resumed.journal.close()
+
+
+def test_finish_archives_the_recording(tmp_path):
+    from monopoly_replay import Replay
+
+    archives = []
+    for _ in range(2):
+        path = str(tmp_path / "game.journal")
+        game = new_game(6)
+        journal = GameJournal.create(path, game, snapshot_every=50, seed=99)
+        game.play_to_completion()
+        archives.append(journal.finish())
+        assert not os.path.exists(path) and not os.path.exists(path + ".snap")
+    assert [os.path.basename(a) for a in archives] == ["save-99.journal", "save-99-2.journal"]
+
+    replay = Replay(archives[0])
+    final = replay.seek(len(replay))
+    assert [p['score'] for p in final.players] == [p['score'] for p in game.players]
+    assert replay.turns == game.turns
+    replay.close()
+
+
+class Contrarian:
+    """Deterministic re-roll policy: throws away every even roll"""
+
+    def __call__(self, game, seat, roll):
+        return roll % 2 == 0
+
+
+def test_rerolls_and_computer_players_survive_resume(tmp_path, monkeypatch):
+    from monopoly_bots import POLICIES
+
+    monkeypatch.setitem(POLICIES, 'contrarian', Contrarian)
+
+    def build(seed):
+        rng = random.Random(seed)
+        game = Game(create_random_tiles(rng), rng, rerolls=3)
+        game.add_player("Ann")
+        game.add_player("Bot", policy=Contrarian())
+        return game
+
+    path = str(tmp_path / "game.journal")
+    original = build(8)
+    journal = GameJournal.create(path, original, snapshot_every=4, seed=8)
+    play(original, 15)
+    journal.close()
+    assert original.players[1]['rerolls'] < 3
+
+    resumed = resume(path)
+    same_state(resumed, original)
+    assert resumed.rerolls == 3
+    assert isinstance(resumed.policies.get(1), Contrarian) and 0 not in resumed.policies
+
+    reference = build(8)
+    play(reference, 15)
+    play(reference, 500)
+    play(resumed, 500)
+    same_state(resumed, reference)
+    resumed.journal.close()
@@ -0,0 +1,74 @@
+import random
+import time
+
+import pytest
+
+from monopoly_engine import Game, create_random_tiles
+from monopoly_odds import OddsEstimator, estimate, state_key
+
+
+class Widget:
+    """Stands in for Tk: after callbacks are run by hand"""
+
+    def __init__(self):
+        self.callbacks = {}
+
+    def after(self, ms, callback):
+        handle = object()
+        self.callbacks[handle] = callback
+        return handle
+
+    def after_cancel(self, handle):
+        self.callbacks.pop(handle, None)
+
+    def run_pending(self):
+        callbacks, self.callbacks = self.callbacks, {}
+        for callback in callbacks.values():
+            callback()
+
+
+def test_requests_are_coalesced_while_an_estimate_runs():
+    rng = random.Random(0)
+    game = Game(create_random_tiles(rng), rng)
+    game.add_player("Ann")
+    game.add_player("Bob")
+    widget = Widget()
+    answers = []
+    odds = OddsEstimator(widget, answers.append, n_games=200)
+    try:
+        # Autoplay at full speed: many turns before the worker answers once
+        for _ in range(40):
+            game.step()
+            odds.request(game)
+        assert odds.sent == 1 and odds.in_flight
+
+        deadline = time.monotonic() + 30
+        while odds.wanted is not None and time.monotonic() < deadline:
+            time.sleep(0.01)
+            widget.run_pending()
+        assert odds.wanted is None
+        # Only the state the game stopped in is shown
+        assert answers == [estimate(state_key(game), 200)]
+        assert odds.sent <= 2
+        assert not widget.callbacks
+
+        odds.request(game)
+        assert odds.stats()['cache_hits'] == 1 and len(answers) == 2
+    finally:
+        odds.close()
+    assert odds.process is None
+
+
+@pytest.mark.parametrize("timeout", [0.5, 0])
+def test_close_stops_a_busy_worker(timeout):
+    rng = random.Random(1)
+    game = Game(create_random_tiles(rng), rng)
+    game.add_player("Ann")
+    odds = OddsEstimator(Widget(), lambda chances: None, n_games=10 ** 7)
+    odds.request(game)
+    process = odds.process
+    assert odds.in_flight and process.is_alive()
+    # With no timeout the worker is terminated rather than left to exit
+    odds.close(timeout)
+    assert odds.process is None
+    assert not process.is_alive()
@@ -0,0 +1,116 @@
+import asyncio
+import json
+
+import pytest
+
+from monopoly_server import GameServer, encode
+
+MALFORMED = [
+    {'op': []},
+    {'op': {}},
+    {'op': "state", 'table': [1]},
+    {'op': "state", 'table': True},
+    {'op': "create", 'players': 5},
+    {'op': "create", 'players': ["ann", 7]},
+    {'op': "create", 'players': ["ann"], 'seed': [1]},
+    {'op': "edit", 'table': 1, 'tile': 2, 'color': 5},
+    {'op': "edit", 'table': 1, 'tile': 2, 'text': None},
+    {'op': "edit", 'table': 1, 'tile': 2, 'hyperlink': {}},
+    {'op': "edit", 'table': 1, 'tile': 2, 'value': 99999999999},
+    {'op': "edit", 'table': 1, 'tile': 2, 'value': True},
+    {'op': "edit", 'table': 1, 'tile': "2", 'value': 5},
+    {'op': "roll", 'table': 1, 'seat': "0"},
+]
+
+
+async def exchange(requests):
+    """Send requests to a fresh server one line at a time, return the replies"""
+    server = GameServer(seed=0)
+    listener = await server.start(port=0)
+    port = listener.sockets[0].getsockname()[1]
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    replies = []
+    try:
+        for request in requests:
+            writer.write(encode(request))
+            await writer.drain()
+            replies.append(json.loads(await reader.readline()))
+    finally:
+        writer.close()
+        listener.close()
+        await listener.wait_closed()
+    return replies
+
+
+@pytest.mark.parametrize("request_", MALFORMED, ids=json.dumps)
+def test_malformed_request_gets_error_reply(request_):
+    created, reply, state = asyncio.run(exchange([
+        {'op': "create", 'players': ["ann", "bob"], 'seed': 1},
+        dict(request_, id=9),
+        {'op': "state", 'table': 1},
+    ]))
+    assert created['ok']
+    assert reply['ok'] is False and reply['id'] == 9
+    assert reply['error']
+    # The connection and the table survive the bad request
+    assert state['ok'] and state['turns'] == 0
+
+
+def test_valid_edit_and_roll():
+    created, edited, rolled = asyncio.run(exchange([
+        {'op': "create", 'players': ["ann"], 'seed': "fixed"},
+        {'op': "edit", 'table': 1, 'tile': 2, 'value': -5, 'color': "#ff0000"},
+        {'op': "roll", 'table': 1, 'seat': 0},
+    ]))
+    assert created['ok'] and edited['ok'] and rolled['ok']
+    assert edited['value'] == -5 and edited['color'] == "#ff0000"
+    assert rolled['seat'] == 0
+
+
+async def abandon(watch):
+    """Create a table, optionally watch it from a second connection, then
+    disconnect the creator; return the tables left after each disconnect"""
+    server = GameServer(seed=0)
+    listener = await server.start(port=0)
+    port = listener.sockets[0].getsockname()[1]
+    left = []
+
+    async def disconnect(writer):
+        connected = server.connections
+        writer.close()
+        await writer.wait_closed()
+        # Let the server notice the closed connection
+        for _ in range(100):
+            if server.connections < connected:
+                break
+            await asyncio.sleep(0.01)
+        left.append(len(server.tables))
+
+    try:
+        reader, creator = await asyncio.open_connection("127.0.0.1", port)
+        creator.write(encode({'op': "create", 'players': ["ann"]}))
+        await reader.readline()
+        spectator = None
+        if watch:
+            reader, spectator = await asyncio.open_connection("127.0.0.1", port)
+            spectator.write(encode({'op': "watch", 'table': 1}))
+            await reader.readline()
+        await disconnect(creator)
+        if spectator is not None:
+            await disconnect(spectator)
+    finally:
+        listener.close()
+        await listener.wait_closed()
+    return left, server.op_stats({}, None)
+
+
+def test_abandoned_table_is_dropped():
+    left, stats = asyncio.run(abandon(watch=False))
+    assert left == [0]
+    assert stats['abandoned'] == 1
+
+
+def test_watched_table_outlives_its_creator():
+    left, stats = asyncio.run(abandon(watch=True))
+    assert left == [1, 0]
+    assert stats['abandoned'] == 1
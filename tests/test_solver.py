@@ -0,0 +1,109 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from monopoly_solver import _propagate, _tables, solve, solve_chain
+
+
+def brute_force(n_tiles, n_players, eps=1e-14):
+    """Expected turns and per-seat landings from a plain dict Markov chain"""
+    full = (1 << n_tiles) - 1
+    states = {(0, (-1,) * n_players): 1.0}
+    landing = [[0.0] * n_tiles for _ in range(n_players)]
+    expected_turns = 0.0
+    turn = 0
+    while states:
+        seat = turn % n_players
+        turn += 1
+        following = {}
+        for (visited, positions), p in states.items():
+            for roll in range(1, 7):
+                pos = positions[seat]
+                mask = visited
+                if pos < 0:
+                    if roll == 1:
+                        pos, mask = 1, mask | 3
+                else:
+                    pos = (pos + roll) % n_tiles
+                    mask |= 1 << pos
+                    landing[seat][pos] += p / 6
+                if mask == full:
+                    expected_turns += turn * p / 6
+                    continue
+                key = (mask, positions[:seat] + (pos,) + positions[seat + 1:])
+                following[key] = following.get(key, 0.0) + p / 6
+        states = {key: p for key, p in following.items() if p >= eps}
+    return expected_turns, np.array(landing)
+
+
+def board(n_tiles):
+    return [{'value': 10 * idx + 5} for idx in range(n_tiles)]
+
+
+def test_single_player_matches_brute_force():
+    turns, landing = brute_force(8, 1)
+    result = solve(board(8), eps=1e-14)
+    assert result['exact']
+    assert result['expected_turns'] == pytest.approx(turns, abs=1e-8)
+    assert np.allclose(result['landing_frequency'], landing, atol=1e-8)
+
+
+@pytest.mark.parametrize("n_tiles, n_players", [(7, 2), (6, 3)])
+def test_joint_chain_matches_brute_force(n_tiles, n_players):
+    turns, landing = brute_force(n_tiles, n_players)
+    values = np.array([tile['value'] for tile in board(n_tiles)])
+    result = solve(board(n_tiles), n_players, eps=1e-14, initial_scores=list(range(n_players)))
+    assert result['exact']
+    assert result['expected_turns'] == pytest.approx(turns, abs=1e-8)
+    assert np.allclose(result['landing_frequency'], landing, atol=1e-8)
+    assert result['expected_scores'] == pytest.approx(landing @ values + np.arange(n_players))
+
+
+@pytest.mark.parametrize("n_tiles, turns_bound, scores_bound", [(8, 0.08, 0.16), (10, 0.06, 0.11)])
+def test_composed_players_stay_close_to_exact(n_tiles, turns_bound, scores_bound):
+    """Composition overestimates, by less as the board grows"""
+    turns, landing = brute_force(n_tiles, 2)
+    scores = landing @ np.array([tile['value'] for tile in board(n_tiles)])
+    result = solve(board(n_tiles), 2, max_states=0)
+    assert not result['exact']
+    assert turns < result['expected_turns'] < turns * (1 + turns_bound)
+    assert np.all(scores < result['expected_scores'])
+    assert np.all(result['expected_scores'] < scores * (1 + scores_bound))
+    assert result['turn_distribution'].sum() + result['pruned_mass'] == pytest.approx(1)
+
+
+def reachable_states(n_tiles):
+    """Relative visited masks a single player can reach before covering the board"""
+    full = (1 << n_tiles) - 1
+    start = 1 | 1 << (n_tiles - 1)
+    seen = {start}
+    todo = [start]
+    while todo:
+        mask = todo.pop()
+        for roll in range(1, 7):
+            moved = mask | 1 << roll
+            target = ((moved >> roll) | (moved << (n_tiles - roll))) & full
+            if target != full and target not in seen:
+                seen.add(target)
+                todo.append(target)
+    return len(seen)
+
+
+@pytest.mark.parametrize("n_frequencies, state_bytes", [(0, 8), (1, 4 + 16), (2, 4 + 32)])
+def test_pass_tables_have_fixed_sizes(n_frequencies, state_bytes):
+    prob, phase = _tables(16, n_frequencies)
+    assert prob.nbytes + phase.nbytes == (1 << 15) * state_bytes
+
+
+@pytest.mark.parametrize("n_tiles", [6, 8, 10])
+def test_live_states_stay_within_the_reachable_ones(n_tiles):
+    reachable = reachable_states(n_tiles)
+    assert reachable < 1 << (n_tiles - 1)
+    for frequencies in ((), (1,)):
+        assert _propagate(n_tiles, 1e-12, frequencies)[3] <= reachable
+
+
+def test_chain_landings_count_every_move():
+    turns, frequencies, _ = solve_chain.__wrapped__(12, 1e-12, True)
+    # Every move after the start lands somewhere; the start takes 6 turns on average
+    assert frequencies.sum() == pytest.approx((np.arange(len(turns)) * turns).sum() - 6, rel=1e-6)